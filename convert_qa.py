@@ -1,6 +1,29 @@
 import re
-import json
 import os
+import sys
+import argparse
+import importlib.util
+
+
+def _load_script(name):
+    # Load scripts/<name>.py by path (as js_to_txt_converter does for run_metrics)
+    # so scripts/ is not put on sys.path, where its modules would shadow the importer's own.
+    module = sys.modules.get(name)
+    if module is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts', f'{name}.py')
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+_qa_output = _load_script('qa_output')
+_run_metrics = _load_script('run_metrics')
+print_size_report = _qa_output.print_size_report
+write_qa_json = _qa_output.write_qa_json
+add_metrics_arguments = _run_metrics.add_metrics_arguments
+metrics_from_args = _run_metrics.metrics_from_args
 
 def add_blanks(text):
     # Heuristic to add {{}} to key terms
@@ -116,6 +139,13 @@ def parse_file(filepath, subcategory_id):
     return questions
 
 def main():
+    parser = argparse.ArgumentParser(description="行政法の一問一答テキストをJSONに変換する")
+    parser.add_argument("--compact", action="store_true",
+                        help="キー順を揃えた最小化JSONと .gz / .br を書き出す")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    metrics = metrics_from_args('convert_qa', args)
+
     file1 = "c:\\Users\\PC_User\\Desktop\\Atashinchi-study\\temp_1.1-86.txt"
     file2 = "c:\\Users\\PC_User\\Desktop\\Atashinchi-study\\temp_2.1-50.txt"
     
@@ -123,13 +153,19 @@ def main():
     
     # Parse file 1 (Subcategory 1)
     if os.path.exists(file1):
-        q1 = parse_file(file1, "1")
+        with metrics.stage('parse'):
+            q1 = parse_file(file1, "1")
         all_questions.update(q1)
+        metrics.count('files')
+        metrics.count('bytes_in', os.path.getsize(file1))
     
     # Parse file 2 (Subcategory 2)
     if os.path.exists(file2):
-        q2 = parse_file(file2, "2")
+        with metrics.stage('parse'):
+            q2 = parse_file(file2, "2")
         all_questions.update(q2)
+        metrics.count('files')
+        metrics.count('bytes_in', os.path.getsize(file2))
         
     output_data = {
         "subject": "行政法",
@@ -147,10 +183,15 @@ def main():
     # Ensure directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    with metrics.stage('write'):
+        record = write_qa_json(output_data, output_path, args.compact)
+    metrics.count('questions', len(all_questions))
+    metrics.count('bytes_out', record['written'])
         
     print(f"Successfully created {output_path} with {len(all_questions)} questions.")
+    print_size_report([record])
+    if metrics.enabled:
+        metrics.finish(args.metrics_out)
 
 if __name__ == "__main__":
     main()
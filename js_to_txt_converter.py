@@ -1,9 +1,36 @@
 import os
 import sys
 import re
-import tkinter as tk
-from tkinter import filedialog, messagebox
-import windnd
+import glob
+import time
+import argparse
+import hashlib
+import json
+import queue
+import threading
+import importlib.util
+from functools import partial
+from itertools import islice
+
+
+def _load_run_metrics():
+    # Load scripts/run_metrics.py by path so importing the converter does not
+    # put scripts/ on sys.path (its modules would shadow the importer's own).
+    module = sys.modules.get('run_metrics')
+    if module is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts', 'run_metrics.py')
+        spec = importlib.util.spec_from_file_location('run_metrics', path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['run_metrics'] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+_run_metrics = _load_run_metrics()
+NULL_METRICS = _run_metrics.NULL_METRICS
+RunMetrics = _run_metrics.RunMetrics
+add_metrics_arguments = _run_metrics.add_metrics_arguments
+metrics_from_args = _run_metrics.metrics_from_args
 
 
 def find_matching_delimiter(s, start_idx, open_ch, close_ch):
@@ -100,7 +127,9 @@ def extract_object(content, key):
     # Extract object content robustly
     return extract_block(content, key, open_ch='{', close_ch='}')
 
-def parse_js_module(js_content):
+def parse_js_module_regex(js_content):
+    """Previous regex-based extractor. parse_js_module falls back to it when
+    the object-literal parser cannot make sense of a module."""
     data = {}
     
     # Title
@@ -258,185 +287,948 @@ def parse_js_module(js_content):
     
     return data
 
-def format_to_txt(data):
-    txt = ""
-    
+# --- Object-literal tokenizer / parser -------------------------------------
+#
+# Case modules are `export default { ... }` object literals. Instead of
+# re-searching the source once per key, tokenize it in a single pass and build
+# a tree of JSNode values that parse_js_module reads fields from.
+
+class JSParseError(ValueError):
+    pass
+
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<template>`(?:[^`\\]|\\.)*`)
+  | (?P<punct>[{}\[\]:,])
+  | (?P<literal>[^\s{}\[\]:,'"`/]+|/)
+  | (?P<error>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Same stop set the regex extractor used for unquoted values
+_UNQUOTED_VALUE_RE = re.compile(r'[^,}\n]+')
+
+
+class JSNode:
+    """A value in the parsed tree.
+
+    kind is 'object', 'array', 'string', 'template' or 'literal'. Objects hold
+    a dict of key -> JSNode, arrays a list of JSNode. Strings and templates
+    hold the raw text between the quotes (escapes are kept as written, as the
+    regex extractor did); literals hold the bare token text."""
+    __slots__ = ('kind', 'value', 'start')
+
+    def __init__(self, kind, value, start):
+        self.kind = kind
+        self.value = value
+        self.start = start
+
+
+def tokenize_js(source):
+    """Split source into (kind, text, start) tokens, dropping whitespace and comments."""
+    tokens = []
+    append = tokens.append
+    for m in _TOKEN_RE.finditer(source):
+        kind = m.lastgroup
+        if kind == 'ws' or kind == 'comment':
+            continue
+        if kind == 'error':
+            raise JSParseError(f'Unexpected character {m.group()!r} at {m.start()}')
+        append((kind, m.group(), m.start()))
+    return tokens
+
+
+def _parse_value(tokens, i):
+    kind, text, start = tokens[i]
+    if kind == 'punct':
+        if text == '{':
+            return _parse_object(tokens, i)
+        if text == '[':
+            return _parse_array(tokens, i)
+        raise JSParseError(f'Unexpected {text!r} at {start}')
+    if kind == 'string' or kind == 'template':
+        return JSNode(kind, text[1:-1], start), i + 1
+    return JSNode('literal', text, start), i + 1
+
+
+def _parse_object(tokens, i):
+    start = tokens[i][2]
+    items = {}
+    i += 1
+    while True:
+        kind, text, pos = tokens[i]
+        if text == '}' and kind == 'punct':
+            return JSNode('object', items, start), i + 1
+        if kind == 'string' or kind == 'template':
+            key = text[1:-1]
+        elif kind == 'literal':
+            key = text
+        else:
+            raise JSParseError(f'Expected key at {pos}, got {text!r}')
+        if tokens[i + 1][1] != ':':
+            raise JSParseError(f'Expected ":" after key {key!r} at {pos}')
+        value, i = _parse_value(tokens, i + 2)
+        # First occurrence wins, matching the old first-match lookups
+        items.setdefault(key, value)
+        kind, text, pos = tokens[i]
+        if text == ',' and kind == 'punct':
+            i += 1
+        elif not (text == '}' and kind == 'punct'):
+            raise JSParseError(f'Expected "," or "}}" at {pos}, got {text!r}')
+
+
+def _parse_array(tokens, i):
+    start = tokens[i][2]
+    items = []
+    i += 1
+    while True:
+        kind, text, pos = tokens[i]
+        if kind == 'punct' and text == ']':
+            return JSNode('array', items, start), i + 1
+        if kind == 'punct' and text == ',':
+            # hole / trailing comma
+            i += 1
+            continue
+        value, i = _parse_value(tokens, i)
+        items.append(value)
+        kind, text, pos = tokens[i]
+        if kind == 'punct' and text == ',':
+            i += 1
+        elif not (kind == 'punct' and text == ']'):
+            raise JSParseError(f'Expected "," or "]" at {pos}, got {text!r}')
+
+
+def _parse_module_object(js_content):
+    """Parse the module object and return (JSNode, offset just past its closing brace)."""
+    tokens = tokenize_js(js_content)
+    root = None
+    for i in range(len(tokens) - 2):
+        if tokens[i][1] == 'export' and tokens[i + 1][1] == 'default' and tokens[i + 2][1] == '{':
+            root = i + 2
+            break
+    if root is None:
+        root = next((i for i, t in enumerate(tokens) if t[0] == 'punct' and t[1] == '{'), None)
+        if root is None:
+            raise JSParseError('No object literal found')
+    # Sentinel so an unterminated literal fails cleanly instead of IndexError
+    tokens.append(('eof', '', len(js_content)))
+    try:
+        node, i = _parse_object(tokens, root)
+    except IndexError:
+        raise JSParseError('Unexpected end of input')
+    end = i - 1
+    # Anything but a closing ";" after the object means it ended early
+    # (e.g. a half-overwritten module with stray fragments)
+    kind, text, pos = tokens[i]
+    if text == ';':
+        kind, text, pos = tokens[i + 1]
+    if kind != 'eof':
+        raise JSParseError(f'Unexpected {text!r} after module object at {pos}')
+    return node, tokens[end][2] + 1
+
+
+def parse_js_tree(js_content):
+    """Parse the module's `export default {...}` object (or the first object
+    literal in the file) and return it as a JSNode."""
+    return _parse_module_object(js_content)[0]
+
+
+def module_object_source(js_content):
+    """Source text of the module object, from its opening to its closing brace
+    (used to bundle several case modules into one)."""
+    node, end = _parse_module_object(js_content)
+    return js_content[node.start:end]
+
+
+def parse_js_export(js_content, name):
+    """Parse `export const <name> = <object or array>` (e.g. the character list
+    in public/data/characters.js) and return it as a JSNode, or None when the
+    module has no such export."""
+    tokens = tokenize_js(js_content)
+    tokens.append(('eof', '', len(js_content)))
+    for i in range(len(tokens) - 4):
+        if (tokens[i][1] == 'export' and tokens[i + 1][1] in ('const', 'let', 'var')
+                and tokens[i + 2][1] == name and tokens[i + 3][1] == '='):
+            try:
+                return _parse_value(tokens, i + 4)[0]
+            except IndexError:
+                raise JSParseError('Unexpected end of input')
+    return None
+
+
+def node_text(node, source):
+    """Text of a field the way extract_value reported it."""
+    if node is None:
+        return ''
+    if node.kind == 'string' or node.kind == 'template':
+        return node.value
+    if node.kind == 'literal':
+        return node.value.strip().strip("'\"")
+    m = _UNQUOTED_VALUE_RE.match(source, node.start)
+    return m.group().strip().strip("'\"") if m else ''
+
+
+def _field(obj, key, source):
+    return node_text(obj.value.get(key), source)
+
+
+def _text_list(obj, key, source):
+    node = obj.value.get(key)
+    if node is None or node.kind != 'array':
+        return []
+    return [node_text(item, source) for item in node.value]
+
+
+def _object_items(obj, key):
+    node = obj.value.get(key)
+    if node is None or node.kind != 'array':
+        return []
+    return [item for item in node.value if item.kind == 'object']
+
+
+def _split_records(obj, key):
+    # questionsAndAnswers / studyRecords were split on "}, {" so an array
+    # without objects still produced one blank record; keep that shape.
+    node = obj.value.get(key)
+    if node is None or node.kind != 'array':
+        return []
+    items = [item for item in node.value if item.kind == 'object']
+    return items or [JSNode('object', {}, node.start)]
+
+
+def parse_js_module(js_content):
+    try:
+        root = parse_js_tree(js_content)
+    except JSParseError:
+        return parse_js_module_regex(js_content)
+
+    src = js_content
+    data = {}
+
+    data['title'] = _field(root, 'title', src)
+    data['citation'] = _field(root, 'citation', src)
+    data['rank'] = _field(root, 'rank', src)
+    data['tags'] = _text_list(root, 'tags', src)
+    data['rightSideCharacters'] = _text_list(root, 'rightSideCharacters', src)
+
+    qas = []
+    for item in _split_records(root, 'questionsAndAnswers'):
+        qa = {}
+        for key in ('id', 'rank', 'question', 'answer', 'status', 'check'):
+            qa[key] = _field(item, key, src)
+        qas.append(qa)
+    data['questionsAndAnswers'] = qas
+
+    story = []
+    for item in _object_items(root, 'story'):
+        s = {}
+        for key in ('type', 'text', 'speaker', 'expression', 'dialogue',
+                    'title', 'description', 'content', 'format'):
+            s[key] = _field(item, key, src)
+        story.append(s)
+    data['story'] = story
+
+    explanation = root.value.get('explanation')
+    data['explanation'] = explanation.value if explanation is not None and explanation.kind == 'template' else ""
+
+    quizzes = []
+    for item in _object_items(root, 'quiz'):
+        q = {}
+        q['title'] = _field(item, 'title', src)
+        q['rank'] = _field(item, 'rank', src)
+        q['background'] = _field(item, 'background', src)
+        subs = []
+        for sub_item in _object_items(item, 'subProblems'):
+            sub = {}
+            sub['title'] = _field(sub_item, 'title', src)
+            sub['rank'] = _field(sub_item, 'rank', src)
+            sub['relatedQAs'] = [int(x) for x in _text_list(sub_item, 'relatedQAs', src) if x.strip()]
+            sub['problem'] = _field(sub_item, 'problem', src)
+            sub['hint'] = _field(sub_item, 'hint', src)
+            sub['modelAnswer'] = _field(sub_item, 'modelAnswer', src)
+            sub['points'] = _text_list(sub_item, 'points', src)
+            subs.append(sub)
+        q['subProblems'] = subs
+        quizzes.append(q)
+    data['quiz'] = quizzes
+
+    records = []
+    for item in _split_records(root, 'studyRecords'):
+        records.append({'date': _field(item, 'date', src), 'timestamp': _field(item, 'timestamp', src)})
+    data['studyRecords'] = records
+
+    return data
+
+def iter_txt(data):
+    """Yield the TXT rendering of a parsed module section by section.
+
+    ''.join(iter_txt(data)) is exactly format_to_txt(data); write_txt streams
+    the same pieces to a file without building the whole document."""
     # Title
-    txt += f"タイトル: {data.get('title', '')}\n\n"
-    
+    yield f"タイトル: {data.get('title', '')}\n\n"
+
     # Citation
-    txt += f"引用: {data.get('citation', '')}\n\n"
-    
+    yield f"引用: {data.get('citation', '')}\n\n"
+
     # Rank
-    txt += f"ランク: {data.get('rank', '')}\n\n"
-    
+    yield f"ランク: {data.get('rank', '')}\n\n"
+
     # Tags
     tags = data.get('tags', [])
-    txt += f"タグ: {', '.join(tags)}\n\n"
-    
+    yield f"タグ: {', '.join(tags)}\n\n"
+
     # Right Side Characters
     characters = data.get('rightSideCharacters', [])
-    txt += f"右側キャラクター: {', '.join(characters)}\n\n"
-    
+    yield f"右側キャラクター: {', '.join(characters)}\n\n"
+
     # Questions and Answers
-    txt += "=== Q&A ===\n\n"
+    yield "=== Q&A ===\n\n"
     qas = data.get('questionsAndAnswers', [])
     for qa in qas:
-        txt += f"ID: {qa.get('id', '')}\n"
-        txt += f"ランク: {qa.get('rank', '')}\n"
-        txt += f"質問: {qa.get('question', '')}\n"
-        txt += f"回答: {qa.get('answer', '')}\n\n"
-    
+        yield (f"ID: {qa.get('id', '')}\n"
+               f"ランク: {qa.get('rank', '')}\n"
+               f"質問: {qa.get('question', '')}\n"
+               f"回答: {qa.get('answer', '')}\n\n")
+
     # Story
-    txt += "=== ストーリー ===\n\n"
+    yield "=== ストーリー ===\n\n"
     story = data.get('story', [])
     for item in story:
         if item.get('type') == 'scene':
-            txt += f"シーン: {item.get('text', '')}\n"
+            yield f"シーン: {item.get('text', '')}\n"
         elif item.get('type') == 'narration':
-            txt += f"ナレーション: {item.get('text', '')}\n"
+            yield f"ナレーション: {item.get('text', '')}\n"
         elif item.get('type') == 'dialogue':
             speaker = item.get('speaker', '')
             expression = item.get('expression', '')
             dialogue = item.get('dialogue', '')
-            txt += f"{speaker} ({expression}): {dialogue}\n"
+            yield f"{speaker} ({expression}): {dialogue}\n"
         elif item.get('type') == 'embed':
             title = item.get('title', '')
             description = item.get('description', '')
             content = item.get('content', '')
             # Unescape common sequences like \n and \t for readability
             content = content.replace('\\n', '\n').replace('\\t', '\t')
-            txt += f"埋め込み: {title}\n"
+            yield f"埋め込み: {title}\n"
             if description:
-                txt += f"説明: {description}\n"
+                yield f"説明: {description}\n"
             if content:
-                txt += f"--- 埋め込み内容開始 ---\n{content}\n--- 埋め込み内容終了 ---\n"
-        txt += "\n"
-    
+                yield f"--- 埋め込み内容開始 ---\n{content}\n--- 埋め込み内容終了 ---\n"
+        yield "\n"
+
     # Explanation
-    txt += "=== 判旨と解説 ===\n\n"
+    yield "=== 判旨と解説 ===\n\n"
     explanation = data.get('explanation', '')
     # Remove HTML tags roughly
     explanation = re.sub(r'<[^>]+>', '', explanation)
-    txt += explanation + "\n\n"
-    
+    yield explanation + "\n\n"
+
     # Quiz: always include when quiz array exists
     quizzes = data.get('quiz', [])
     if quizzes:
-        txt += "=== クイズ演習 ===\n\n"
+        yield "=== クイズ演習 ===\n\n"
         for quiz in quizzes:
-            txt += f"タイトル: {quiz.get('title', '')}\n"
-            txt += f"ランク: {quiz.get('rank', '')}\n"
-            txt += f"背景: {quiz.get('background', '')}\n"
+            yield (f"タイトル: {quiz.get('title', '')}\n"
+                   f"ランク: {quiz.get('rank', '')}\n"
+                   f"背景: {quiz.get('background', '')}\n")
             # If there are subProblems, print all their fields
             sub_problems = quiz.get('subProblems', [])
             for sub in sub_problems:
-                txt += f"サブタイトル: {sub.get('title', '')}\n"
-                txt += f"ランク: {sub.get('rank', '')}\n"
-                txt += f"関連Q&A: {', '.join(str(x) for x in sub.get('relatedQAs', []) if x) }\n" if sub.get('relatedQAs') else ""
-                txt += f"問題: {sub.get('problem', '')}\n"
-                txt += f"ヒント: {sub.get('hint', '')}\n"
-                txt += f"モデル回答: {sub.get('modelAnswer', '')}\n"
+                yield f"サブタイトル: {sub.get('title', '')}\n"
+                yield f"ランク: {sub.get('rank', '')}\n"
+                if sub.get('relatedQAs'):
+                    yield f"関連Q&A: {', '.join(str(x) for x in sub.get('relatedQAs', []) if x) }\n"
+                yield (f"問題: {sub.get('problem', '')}\n"
+                       f"ヒント: {sub.get('hint', '')}\n"
+                       f"モデル回答: {sub.get('modelAnswer', '')}\n")
                 points = sub.get('points', [])
                 if points:
-                    txt += "ポイント:\n"
+                    yield "ポイント:\n"
                     for point in points:
-                        txt += f"- {point}\n"
-                    txt += "\n"
-    
+                        yield f"- {point}\n"
+                    yield "\n"
+
     # 学習記録は出力しない（ユーザー指定）
-    
-    return txt
 
-def process_file(js_file_path):
-    if not os.path.exists(js_file_path):
-        print(f"File not found: {js_file_path}")
-        return False
 
-    try:
-        with open(js_file_path, 'r', encoding='utf-8') as f:
-            js_content = f.read()
-    except Exception as e:
-        print(f"Failed to read file: {e}")
-        return False
+def write_txt(data, fp, batch=1024):
+    """Stream the TXT rendering of data to the text file object fp.
 
-    data = parse_js_module(js_content)
-    txt_content = format_to_txt(data)
+    Pieces are joined in batches of `batch` and written once per batch, so
+    memory stays bounded regardless of the module size and the per-piece cost
+    is a list append (no per-piece write or length bookkeeping)."""
+    pieces = iter_txt(data)
+    while True:
+        chunk = list(islice(pieces, batch))
+        if not chunk:
+            return
+        fp.write(''.join(chunk))
 
+
+def format_to_txt(data):
+    return ''.join(iter_txt(data))
+
+
+def txt_path_for(js_file_path):
     # Output file path: same directory, same name with .txt extension
     dir_path = os.path.dirname(js_file_path)
     base_name = os.path.splitext(os.path.basename(js_file_path))[0]
-    txt_file_path = os.path.join(dir_path, base_name + '.txt')
+    return os.path.join(dir_path, base_name + '.txt')
+
+
+def _convert_file(js_file_path, metrics=NULL_METRICS):
+    """Convert one module without printing.
+
+    Returns (ok, message, record) where record holds the source/output
+    digests for the manifest (None on failure). Stage timings and byte
+    counts go to metrics."""
+    if not os.path.exists(js_file_path):
+        return False, f"File not found: {js_file_path}", None
 
     try:
-        with open(txt_file_path, 'w', encoding='utf-8') as f:
-            f.write(txt_content)
+        with metrics.stage('read'):
+            with open(js_file_path, 'rb') as f:
+                raw = f.read()
+            js_content = raw.decode('utf-8')
     except Exception as e:
-        print(f"Failed to write TXT file: {e}")
+        return False, f"Failed to read file: {e}", None
+
+    try:
+        with metrics.stage('parse'):
+            data = parse_js_module(js_content)
+    except Exception as e:
+        return False, f"Failed to parse {js_file_path}: {e}", None
+
+    txt_file_path = txt_path_for(js_file_path)
+    try:
+        with metrics.stage('write'):
+            with open(txt_file_path, 'w', encoding='utf-8') as f:
+                write_txt(data, f)
+    except Exception as e:
+        return False, f"Failed to write TXT file: {e}", None
+
+    with metrics.stage('hash'):
+        record = {
+            'sha256': hashlib.sha256(raw).hexdigest(),
+            'output_sha256': _file_sha256(txt_file_path),
+        }
+    if metrics.enabled:
+        metrics.count('files')
+        metrics.count('bytes_in', len(raw))
+        metrics.count('bytes_out', os.path.getsize(txt_file_path))
+    return True, f"TXT file created: {txt_file_path}", record
+
+
+def convert_file(js_file_path):
+    """Convert one module without printing. Returns (ok, message)."""
+    ok, message, _ = _convert_file(js_file_path)
+    return ok, message
+
+
+def process_file(js_file_path, metrics=NULL_METRICS):
+    ok, message, _ = _convert_file(js_file_path, metrics)
+    print(message)
+    return ok
+
+
+def expand_inputs(args):
+    """Expand CLI arguments (files, directories, glob patterns) into a sorted,
+    de-duplicated list of .js paths. Directories are searched recursively and
+    the generated case index (index.js) is skipped."""
+    found = []
+    seen = set()
+
+    def add(path):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen:
+            seen.add(key)
+            found.append(path)
+
+    for arg in args:
+        if os.path.isdir(arg):
+            matches = []
+            for dir_path, dir_names, file_names in os.walk(arg):
+                dir_names.sort()
+                for name in file_names:
+                    if name.lower().endswith('.js') and name != 'index.js':
+                        matches.append(os.path.join(dir_path, name))
+            for path in sorted(matches):
+                add(path)
+        elif glob.has_magic(arg):
+            for path in sorted(glob.glob(arg, recursive=True)):
+                if os.path.isfile(path) and path.lower().endswith('.js'):
+                    add(path)
+        else:
+            # Plain paths are passed through so missing files are reported
+            add(arg)
+    return found
+
+
+def _convert_worker(js_file_path, detailed=False):
+    metrics = RunMetrics('worker') if detailed else NULL_METRICS
+    return js_file_path, _convert_file(js_file_path, metrics), metrics.snapshot()
+
+
+# --- Incremental conversion manifest ---------------------------------------
+#
+# Batch runs record, per source module, its size/mtime, content hash and the
+# hash of the TXT written for it, together with CONVERTER_VERSION. A module is
+# skipped when its stat (or, failing that, its content hash) and its output
+# are unchanged and it was converted by the same converter version.
+
+# Bump whenever parse_js_module / format_to_txt output changes.
+CONVERTER_VERSION = '2'
+MANIFEST_FORMAT = 1
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.js_to_txt_manifest.json')
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('format') != MANIFEST_FORMAT:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(manifest_path, files):
+    """Write the manifest atomically, dropping entries whose source is gone."""
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    pruned = {key: entry for key, entry in files.items()
+              if os.path.exists(os.path.join(base, key))}
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'format': MANIFEST_FORMAT, 'files': dict(sorted(pruned.items()))},
+                  f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, manifest_path)
+    return len(files) - len(pruned)
+
+
+def _manifest_key(path, base):
+    return os.path.relpath(os.path.abspath(path), base).replace(os.sep, '/')
+
+
+def _is_unchanged(path, entry):
+    """True when path and its TXT still match a manifest entry."""
+    if not entry or entry.get('converter') != CONVERTER_VERSION:
+        return False
+    output_stat = _stat_key(txt_path_for(path))
+    if output_stat is None or list(output_stat) != entry.get('output_stat'):
         return False
+    source_stat = _stat_key(path)
+    if source_stat is None:
+        return False
+    if list(source_stat) == entry.get('stat'):
+        return True
+    # Touched but possibly identical (checkout, copy): fall back to the hash
+    if source_stat[0] == entry['stat'][0] and _file_sha256(path) == entry.get('sha256'):
+        entry['stat'] = list(source_stat)
+        return True
+    return False
+
+
+def run_batch(paths, jobs=None, manifest_path=None, force=False, metrics=NULL_METRICS):
+    """Convert paths across a pool of worker processes.
+
+    With manifest_path, modules whose source, output and converter version
+    are unchanged since the last run are skipped (unless force). Results are
+    printed in input order once each is available. Returns the list of
+    (path, ok, message) tuples for the files actually converted. Workers
+    time their stages separately and the totals are merged into metrics."""
+    start = time.perf_counter()
+    with metrics.stage('manifest'):
+        files = load_manifest(manifest_path) if manifest_path else {}
+        base = os.path.dirname(os.path.abspath(manifest_path)) if manifest_path else None
+
+        todo = []
+        skipped = 0
+        for path in paths:
+            if manifest_path and not force and _is_unchanged(path, files.get(_manifest_key(path, base))):
+                skipped += 1
+            else:
+                todo.append(path)
+    metrics.count('skipped', skipped)
+
+    jobs = jobs or os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(todo)))
+    results = []
+
+    if jobs == 1:
+        # In-process, so --profile sees the conversion stages too
+        outcomes = ((path, _convert_file(path, metrics), None) for path in todo)
+        pool = None
+    else:
+        # Imported here: multiprocessing is a large share of the module's import time
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        # Larger chunks keep IPC overhead low on big trees; ordering is kept by map()
+        chunksize = max(1, len(todo) // (jobs * 8))
+        outcomes = pool.map(partial(_convert_worker, detailed=metrics.enabled), todo, chunksize=chunksize)
+
+    try:
+        for path, (ok, message, record), snapshot in outcomes:
+            metrics.merge(snapshot)
+            print(message if ok else f"ERROR: {message}")
+            results.append((path, ok, message))
+            if manifest_path and record:
+                record['converter'] = CONVERTER_VERSION
+                record['stat'] = list(_stat_key(path))
+                record['output_stat'] = list(_stat_key(txt_path_for(path)))
+                files[_manifest_key(path, base)] = record
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    with metrics.stage('manifest'):
+        pruned = save_manifest(manifest_path, files) if manifest_path else 0
 
-    print(f"TXT file created: {txt_file_path}")
-    return True
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if not r[1]]
+    rate = len(paths) / elapsed if elapsed > 0 else 0.0
+    print(f"\n{len(results) - len(failed)} converted, {skipped} unchanged, {len(failed)} failed "
+          f"({len(paths)} files, {jobs} workers, {elapsed:.2f}s, {rate:.0f} files/s)")
+    if pruned:
+        print(f"Pruned {pruned} manifest entries for deleted sources")
+    for path, _, message in failed:
+        print(f"  FAILED: {path}: {message}")
+    return results
+
+
+# --- Background conversion for the GUI -------------------------------------
+#
+# The GUI must never convert on the Tk thread. Dropped paths are expanded on a
+# helper thread and each module is submitted to a process pool; completion
+# callbacks only put events on a queue, which the Tk thread drains with
+# poll() from an after() timer. All counters are touched by the Tk thread
+# only, so no locking is needed for them.
+
+class BackgroundBatch:
+    """Queue of conversions running in a worker pool, polled by the GUI."""
+
+    def __init__(self, jobs=None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.events = queue.Queue()
+        self._pool = None
+        self._futures = set()
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._reset()
+
+    def _reset(self):
+        self.total = 0
+        self.converted = 0
+        self.cancelled = 0
+        self.failed = []
+        self.invalid = []
+        self.bytes_done = 0
+        self.started = None
+        self._expanding = 0
+
+    @property
+    def finished_count(self):
+        return self.converted + len(self.failed) + self.cancelled
+
+    @property
+    def busy(self):
+        return self._expanding > 0 or self.finished_count < self.total
+
+    def submit(self, paths):
+        """Queue files and folders (searched recursively). Returns immediately."""
+        if not self.busy:
+            self._reset()
+            self._cancel.clear()
+        if self.started is None:
+            self.started = time.perf_counter()
+        self._expanding += 1
+        threading.Thread(target=self._expand_and_submit, args=(list(paths),), daemon=True).start()
+
+    def _expand_and_submit(self, paths):
+        todo = []
+        invalid = []
+        for path in paths:
+            if os.path.isdir(path):
+                todo.extend(expand_inputs([path]))
+            elif os.path.isfile(path) and path.lower().endswith('.js'):
+                todo.append(path)
+            else:
+                invalid.append(path)
+        sized = []
+        for path in todo:
+            st = _stat_key(path)
+            sized.append((path, st[0] if st else 0))
+        # Announce the totals before any result can arrive
+        self.events.put(('queued', len(sized), invalid))
+        for path, size in sized:
+            if self._cancel.is_set():
+                self.events.put(('cancelled', path, size))
+                continue
+            with self._lock:
+                if self._pool is None:
+                    from concurrent.futures import ProcessPoolExecutor
+                    self._pool = ProcessPoolExecutor(max_workers=self.jobs)
+                future = self._pool.submit(_convert_worker, path)
+                self._futures.add(future)
+            future.add_done_callback(partial(self._on_done, path, size))
+        self.events.put(('expanded',))
+
+    def _on_done(self, path, size, future):
+        with self._lock:
+            self._futures.discard(future)
+        if future.cancelled():
+            self.events.put(('cancelled', path, size))
+            return
+        try:
+            _, (ok, message, _), _ = future.result()
+        except Exception as e:
+            ok, message = False, f"Worker failed on {path}: {e}"
+        self.events.put(('done', path, ok, message, size))
+
+    def cancel(self):
+        """Drop everything not yet started; running conversions still finish."""
+        self._cancel.set()
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+
+    def poll(self):
+        """Apply queued events on the calling (Tk) thread. Returns True if anything changed."""
+        changed = False
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return changed
+            changed = True
+            kind = event[0]
+            if kind == 'queued':
+                self.total += event[1]
+                self.invalid.extend(event[2])
+            elif kind == 'expanded':
+                self._expanding -= 1
+            elif kind == 'cancelled':
+                self.cancelled += 1
+            else:
+                _, path, ok, message, size = event
+                print(message if ok else f"ERROR: {message}")
+                self.bytes_done += size
+                if ok:
+                    self.converted += 1
+                else:
+                    self.failed.append((path, message))
+
+    def elapsed(self):
+        return time.perf_counter() - self.started if self.started is not None else 0.0
+
+    def status_text(self):
+        elapsed = self.elapsed()
+        done = self.converted + len(self.failed)
+        rate = done / elapsed if elapsed > 0 else 0.0
+        mb_rate = self.bytes_done / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+        text = f'{self.finished_count}/{self.total} 件  {rate:.1f} 件/秒  {mb_rate:.2f} MB/秒'
+        remaining = self.total - self.finished_count
+        if self.busy and rate > 0 and not self._cancel.is_set():
+            text += f'  残り約 {remaining / rate:.0f} 秒'
+        if self._cancel.is_set() and self.busy:
+            text += '  (中止中…)'
+        return text
+
+    def summary(self, limit=10):
+        elapsed = self.elapsed()
+        rate = (self.converted + len(self.failed)) / elapsed if elapsed > 0 else 0.0
+        lines = [f'変換 {self.converted}件 / 失敗 {len(self.failed)}件 / 中止 {self.cancelled}件'
+                 f' / 対象外 {len(self.invalid)}件',
+                 f'{elapsed:.1f}秒 ({rate:.1f} 件/秒)']
+        if self.failed:
+            lines.append('\n失敗:')
+            lines.extend(f'  {path}: {message}' for path, message in self.failed[:limit])
+            if len(self.failed) > limit:
+                lines.append(f'  ...ほか {len(self.failed) - limit}件')
+        if self.invalid:
+            lines.append('\nJSファイルではないため無視:')
+            lines.extend(f'  {path}' for path in self.invalid[:limit])
+            if len(self.invalid) > limit:
+                lines.append(f'  ...ほか {len(self.invalid) - limit}件')
+        return '\n'.join(lines)
+
+    def close(self):
+        self.cancel()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Convert case modules (.js) to TXT. Without arguments the drag-and-drop GUI starts.')
+    parser.add_argument('paths', nargs='*', help='.js files, directories (recursive) or glob patterns')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes for batch conversion (default: CPU count)')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST,
+                        help='manifest used to skip unchanged modules in batch mode (default: %(default)s)')
+    parser.add_argument('--no-manifest', action='store_true', help='convert everything and do not record a manifest')
+    parser.add_argument('--force', action='store_true', help='reconvert every module and refresh the manifest')
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
 
 
 def main():
-    # CLI mode: if path passed as argument, process and exit
+    # CLI mode: if paths are passed as arguments, process and exit
     if len(sys.argv) > 1:
-        js_file_path = sys.argv[1]
-        process_file(js_file_path)
-        return
+        args = parse_args(sys.argv[1:])
+        metrics = metrics_from_args('js_to_txt_converter', args)
+        paths = expand_inputs(args.paths)
+        if not paths:
+            print("No .js files matched.")
+            return 1
+        if len(paths) == 1 and not os.path.isdir(args.paths[0]):
+            ok = process_file(paths[0], metrics)
+        else:
+            jobs = args.jobs
+            if args.profile and jobs != 1:
+                # cProfile only sees this process
+                print("--profile: running with -j 1")
+                jobs = 1
+            manifest_path = None if args.no_manifest else args.manifest
+            results = run_batch(paths, jobs, manifest_path, args.force, metrics)
+            ok = all(ok for _, ok, _ in results)
+        if metrics.enabled:
+            metrics.finish(args.metrics_out)
+        return 0 if ok else 1
+
+    return run_gui()
+
+
+def _decode_drop_path(raw):
+    """windnd hands over bytes paths (UTF-8 or the ANSI code page)."""
+    try:
+        path = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        path = raw.decode('mbcs')
+    return path.strip('\x00')
+
+
+GUI_POLL_MS = 100
+
+
+def run_gui():
+    """Drag-and-drop window. Tk and windnd are imported here so the parsing
+    API and the CLI never pay for them (and work where they are missing).
+    Conversions run in a BackgroundBatch, so the window stays responsive and
+    reports once per drop instead of once per file."""
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
+    try:
+        import windnd
+    except ImportError:
+        windnd = None
+
+    batch = BackgroundBatch()
 
-    # GUI mode with drag-and-drop
     root = tk.Tk()
     root.title('JS → TXT Converter (ドラッグ＆ドロップ)')
-    root.geometry('480x200')
+    root.geometry('520x260')
 
     frame = tk.Frame(root, relief='ridge', bd=2)
     frame.pack(fill='both', expand=True, padx=12, pady=12)
 
-    label = tk.Label(frame, text='ここにJSファイルをドラッグ＆ドロップしてください\nまたはボタンで選択', justify='center')
+    label = tk.Label(frame, text='ここにJSファイル・フォルダをドラッグ＆ドロップしてください\nまたはボタンで選択', justify='center')
     label.pack(fill='both', expand=True, padx=8, pady=8)
 
+    progress = ttk.Progressbar(root, mode='determinate')
+    progress.pack(fill='x', padx=12)
+    status = tk.Label(root, text='待機中', anchor='w')
+    status.pack(fill='x', padx=12)
+
+    polling = [False]
+
+    def tick():
+        batch.poll()
+        progress['maximum'] = max(batch.total, 1)
+        progress['value'] = batch.finished_count
+        status['text'] = batch.status_text()
+        if batch.busy:
+            root.after(GUI_POLL_MS, tick)
+            return
+        polling[0] = False
+        cancel_btn['state'] = 'disabled'
+        summary = batch.summary()
+        print(f"\n{summary}")
+        if batch.failed:
+            messagebox.showwarning('完了（失敗あり）', summary)
+        else:
+            messagebox.showinfo('完了', summary)
+
+    def start(paths):
+        if not paths:
+            return
+        batch.submit(paths)
+        cancel_btn['state'] = 'normal'
+        if not polling[0]:
+            polling[0] = True
+            root.after(GUI_POLL_MS, tick)
+
     def on_drop(files):
-        # files is a list of bytes paths
+        paths = []
         for f in files:
             try:
-                try:
-                    path = f.decode('utf-8')
-                except Exception:
-                    path = f.decode('mbcs')
-                path = path.strip('\x00')
+                paths.append(_decode_drop_path(f))
             except Exception:
                 continue
-            if os.path.isfile(path) and path.lower().endswith('.js'):
-                ok = process_file(path)
-                if ok:
-                    messagebox.showinfo('完了', f'TXT作成しました:\n{os.path.splitext(path)[0]}.txt')
-                else:
-                    messagebox.showerror('エラー', f'ファイルの処理に失敗しました:\n{path}')
-            else:
-                messagebox.showwarning('無効', f'JSファイルを指定してください:\n{path}')
+        start(paths)
 
     # hook drop
-    try:
-        windnd.hook_dropfiles(frame, func=on_drop)
-    except Exception as e:
-        print('ドラッグ＆ドロップの初期化に失敗しました:', e)
-
-    def select_file():
-        file_path = filedialog.askopenfilename(filetypes=[('JavaScript files', '*.js')])
-        if file_path:
-            ok = process_file(file_path)
-            if ok:
-                messagebox.showinfo('完了', f'TXT作成しました:\n{os.path.splitext(file_path)[0]}.txt')
-            else:
-                messagebox.showerror('エラー', 'ファイルの処理に失敗しました。')
+    if windnd is None:
+        print('windnd が無いためドラッグ＆ドロップは使えません（ボタンから選択してください）')
+    else:
+        try:
+            windnd.hook_dropfiles(frame, func=on_drop)
+        except Exception as e:
+            print('ドラッグ＆ドロップの初期化に失敗しました:', e)
+
+    def select_files():
+        start(list(filedialog.askopenfilenames(filetypes=[('JavaScript files', '*.js')])))
+
+    def select_folder():
+        folder = filedialog.askdirectory()
+        if folder:
+            start([folder])
+
+    def on_close():
+        batch.close()
+        root.destroy()
 
-    btn = tk.Button(root, text='ファイルを選択', command=select_file)
-    btn.pack(pady=(0,12))
+    buttons = tk.Frame(root)
+    buttons.pack(pady=(6, 12))
+    tk.Button(buttons, text='ファイルを選択', command=select_files).pack(side='left', padx=4)
+    tk.Button(buttons, text='フォルダを選択', command=select_folder).pack(side='left', padx=4)
+    cancel_btn = tk.Button(buttons, text='中止', command=batch.cancel, state='disabled')
+    cancel_btn.pack(side='left', padx=4)
 
+    root.protocol('WM_DELETE_WINDOW', on_close)
     root.mainloop()
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
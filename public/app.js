@@ -7,6 +7,8 @@ import { ApiService } from './apiService.js';
 import { testArticleDetection, forceProcessArticleButtons } from './articleProcessor.js';
 import { qaFillDrillSystem } from './qaFillDrillSystem.js';
 import * as qaLoader from './qaLoader.js';  // Q&Aローダー（新形式対応）
+import { installCaseCatalogue } from './caseCatalogue.js';  // ケースを科目チャンクから読み込む
+import { loadAssetManifest } from './assetManifest.js';  // 画像・音声を内容ハッシュ付きのURLで読む
 
 // --- グローバル変数の定義 ---
 let SUPPORTED_LAWS = [];
@@ -36,7 +38,14 @@ async function initializeApp() {
         // 5. 法令selectを更新
         updateLawSelectOptions(SUPPORTED_LAWS);
         
-        // 6. ルーターを初期化
+        // 6. アセットマニフェストがあれば画像・音声を内容ハッシュ付きのURLで読む
+        //    （待たない。読み込む前に作った画像は元のパスのまま表示される）
+        loadAssetManifest();
+
+        // 7. ケース目録があれば caseLoaders を科目チャンクからの読み込みに差し替え
+        await installCaseCatalogue();
+        
+        // 8. ルーターを初期化
         initializeRouter();
         
         console.log('✅ アプリ初期化完了');
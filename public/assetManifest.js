@@ -0,0 +1,36 @@
+// assetManifest.js - scripts/build_asset_manifest.py が作ったアセットマニフェストの読み込み
+
+const ASSET_BASE = '/assets/';
+
+let manifestPromise = null;
+// 論理名（images/xxx.png）→ 内容ハッシュ付きのURL
+let assetFiles = new Map();
+
+/**
+ * マニフェスト (manifest.json) を1回だけ取得し、論理名との対応を覚える。
+ * 作っていなければサーバーは空のマニフェストを返し、assetUrl は元のパスをそのまま返す
+ */
+export function loadAssetManifest() {
+    if (!manifestPromise) {
+        manifestPromise = fetch(`${ASSET_BASE}manifest.json`, { cache: 'no-cache' })
+            .then(response => (response.ok ? response.json() : null))
+            .catch(() => null)
+            .then(manifest => {
+                const assets = manifest?.assets || {};
+                assetFiles = new Map(Object.entries(assets).map(([name, file]) => [name, `/${file}`]));
+                if (assetFiles.size > 0) {
+                    console.log(`🖼️ アセットマニフェスト: ${assetFiles.size}件`);
+                }
+                return manifest;
+            });
+    }
+    return manifestPromise;
+}
+
+/**
+ * /images/... や /sounds/... のパスを内容ハッシュ付きのURLにする。
+ * マニフェストに無いもの（まだ読んでいない・存在しない画像など）は元のパスを返す
+ */
+export function assetUrl(path) {
+    return assetFiles.get(path.replace(/^\//, '')) || path;
+}
@@ -0,0 +1,58 @@
+// caseCatalogue.js - scripts/build_case_catalogue.py が作ったケース目録と科目チャンクの読み込み
+
+import { caseSummaries, caseLoaders } from './cases/index.js';
+
+const BUNDLE_BASE = '/case-bundle/';
+
+let cataloguePromise = null;
+const chunkPromises = {};
+
+/**
+ * 目録 (catalogue.json) を1回だけ取得する。無ければ null
+ */
+export function loadCaseCatalogue() {
+    if (!cataloguePromise) {
+        cataloguePromise = fetch(`${BUNDLE_BASE}catalogue.json`, { cache: 'no-cache' })
+            .then(response => (response.ok ? response.json() : null))
+            .catch(() => null);
+    }
+    return cataloguePromise;
+}
+
+function loadChunk(fileName) {
+    if (!chunkPromises[fileName]) {
+        chunkPromises[fileName] = import(`${BUNDLE_BASE}${fileName}`).then(module => module.default);
+        // 失敗したら次回やり直せるようにする
+        chunkPromises[fileName].catch(() => delete chunkPromises[fileName]);
+    }
+    return chunkPromises[fileName];
+}
+
+/**
+ * 目録にあるケースの caseLoaders を、科目チャンクから読むものに差し替える。
+ * index.js の lastModified と目録の lastModified が違うケース（チャンクを作った後に編集されたもの）は
+ * 従来どおり個別のモジュールを読む。差し替えた件数を返す
+ */
+export async function installCaseCatalogue() {
+    const catalogue = await loadCaseCatalogue();
+    // 目録を作っていなければサーバーは空の目録を返す
+    if (!catalogue || !catalogue.cases || catalogue.cases.length === 0) {
+        return 0;
+    }
+    const summaries = window.caseSummaries || caseSummaries;
+    const lastModified = new Map(summaries.map(summary => [summary.id, summary.lastModified]));
+    const loaders = { ...(window.caseLoaders || caseLoaders) };
+    let installed = 0;
+    for (const entry of catalogue.cases) {
+        const fileName = entry.chunk && catalogue.chunks[entry.chunk];
+        if (!fileName || lastModified.get(entry.id) !== entry.lastModified) {
+            continue;
+        }
+        // 呼び出し側が default を書き換えるので、毎回コピーを返す（従来の ?v= 付き import と同じ）
+        loaders[entry.id] = () => loadChunk(fileName).then(chunk => ({ default: structuredClone(chunk[entry.id]) }));
+        installed++;
+    }
+    window.caseLoaders = loaders;
+    console.log(`📦 ケースチャンク: ${installed}/${catalogue.cases.length}件をチャンクから読み込みます`);
+    return installed;
+}
@@ -5,6 +5,7 @@ import { characters, generateLocationNarration, getGlobalRulesAsText, getGlobalH
 import { generateInitialPrompt, generateCharacterPersonaPrompt } from './data/prompts.js';
 import { startInlineSpeedQuiz, stopInlineSpeedQuiz } from './inlineSpeedQuiz.js';
 import { caseLoaders } from './cases/index.js';
+import { assetUrl } from './assetManifest.js';
 
 // ★★★ ヘルパー関数 ★★★
 function sleep(ms) {
@@ -671,8 +672,8 @@ function displayIntoDialogueLine(line, sessionId) {
         const finalExpression = character.availableExpressions && character.availableExpressions.includes(expression)
             ? expression
             : 'normal';
-        const iconSrc = `/images/${character.baseName}_${finalExpression}.png`;
-        const fallbackSrc = `/images/${character.baseName}_normal.png`;
+        const iconSrc = assetUrl(`/images/${character.baseName}_${finalExpression}.png`);
+        const fallbackSrc = assetUrl(`/images/${character.baseName}_normal.png`);
         const onErrorAttr = `this.src='${fallbackSrc}'; this.onerror=null;`;
         const imageStyle = "width: 80px; height: 80px; border-radius: 50%; object-fit: cover; border: 2px solid #e5e7eb; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);";
         isRightSide = rightSideCharacters.includes(character.name);
@@ -970,8 +971,8 @@ function displaySingleDialogue(dialogue, sessionId, skipNarration = false) {
     }
 
     const finalExpression = character.availableExpressions && character.availableExpressions.includes(expression) ? expression : 'normal';
-    const iconSrc = `/images/${character.baseName}_${finalExpression}.png`;
-    const fallbackSrc = `/images/${character.baseName}_normal.png`;
+    const iconSrc = assetUrl(`/images/${character.baseName}_${finalExpression}.png`);
+    const fallbackSrc = assetUrl(`/images/${character.baseName}_normal.png`);
     const onErrorAttribute = `this.src='${fallbackSrc}'; this.onerror=null;`;
     
     // 現在のケースのrightSideCharacters設定を参照
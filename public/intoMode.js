@@ -11,6 +11,7 @@
  */
 
 import { characters } from './data/characters.js';
+import { assetUrl } from './assetManifest.js';
 
 // ═══════════════════════════════════════════════════════════════════════════
 // グローバル状態
@@ -838,10 +839,10 @@ function getCharacterImagePath(baseName, expression = 'normal') {
     // 表情のバリエーションを試す
     const expressionVariants = [expression, 'normal'];
     for (const expr of expressionVariants) {
-        const path = `/images/${baseName}_${expr}.png`;
+        const path = assetUrl(`/images/${baseName}_${expr}.png`);
         return path;
     }
-    return `/images/${baseName}_normal.png`;
+    return assetUrl(`/images/${baseName}_normal.png`);
 }
 
 /**
@@ -1187,7 +1188,7 @@ function playBgm(path) {
     }
 
     // 共通BGMフォルダからパスを構築
-    const bgmPath = `/sounds/bgm/${path}`;
+    const bgmPath = assetUrl(`/sounds/bgm/${path}`);
     console.log('🎵 BGMパス:', bgmPath);
 
     const audio = new Audio(bgmPath);
@@ -1234,7 +1235,7 @@ function setBackground(path) {
     }
 
     // 共通背景フォルダからパスを構築
-    const bgPath = `/images/background/${path}`;
+    const bgPath = assetUrl(`/images/background/${path}`);
     console.log('🖼️ 背景パス:', bgPath);
 
     bgEl.style.backgroundImage = `url('${bgPath}')`;
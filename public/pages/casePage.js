@@ -2,6 +2,7 @@
 
 import { caseLoaders } from '../cases/index.js';
 import { characters } from '../data/characters.js';
+import { assetUrl } from '../assetManifest.js';
 import { processArticleReferences, processAllReferences, setupArticleRefButtons, processBoldText, processBlankFillText } from '../articleProcessor.js?v=1002';
 import { showArticlePanel } from '../articlePanel.js';
 import { ApiService } from '../apiService.js';
@@ -622,8 +623,8 @@ function buildStoryHtml(storyData) {
 
         const requestedExpression = item.expression ?? 'normal';
         const finalExpression = character.availableExpressions.includes(requestedExpression) ? requestedExpression : 'normal';
-        const iconSrc = `/images/${character.baseName}_${finalExpression}.png`;
-        const fallbackSrc = `/images/${character.baseName}_normal.png`;
+        const iconSrc = assetUrl(`/images/${character.baseName}_${finalExpression}.png`);
+        const fallbackSrc = assetUrl(`/images/${character.baseName}_normal.png`);
         const onErrorAttribute = `this.src='${fallbackSrc}'; this.onerror=null;`;
 
         const imageStyle = "width: 80px; height: 80px; border-radius: 50%; object-fit: cover; border: 2px solid #e5e7eb; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1); transition: all 0.4s cubic-bezier(0.25, 0.46, 0.45, 0.94);";
@@ -699,7 +700,7 @@ function buildCharacterGallery(storyCharacters) {
     }
 
     const characterItems = storyCharacters.map(character => {
-        const iconSrc = `/images/${character.baseName}_normal.png`;
+        const iconSrc = assetUrl(`/images/${character.baseName}_normal.png`);
         return `
             <div class="character-gallery-item text-center">
                 <img 
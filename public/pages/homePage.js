@@ -803,6 +803,7 @@ import { QAStatusSystem } from '../qaStatusSystem.js';
 import { getAllLatestStudyRecords } from './casePage.js';
 import { getLatestStudyRecord } from './casePage.js';
 import { applyFolderColorsToMultipleBadges } from '../utils/folderColorUtils.js';
+import { assetUrl } from '../assetManifest.js';
 
 // 法令設定が利用可能になるまで待機
 function waitForLawSettings() {
@@ -1601,7 +1602,7 @@ function buildModuleCharacterGallery(storyCharacters) {
     console.log(`🚀 キャラクターギャラリー生成:`, storyCharacters.map(c => c.name));
 
     const characterItems = storyCharacters.map(character => {
-        const iconSrc = `/images/${character.baseName}_normal.png`;
+        const iconSrc = assetUrl(`/images/${character.baseName}_normal.png`);
         return `
             <img 
                 src="${iconSrc}" 
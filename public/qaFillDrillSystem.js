@@ -1,6 +1,7 @@
 import { ApiService } from './apiService.js';
 import { caseLoaders } from './cases/index.js';
 import { characters } from './data/characters.js';
+import { assetUrl } from './assetManifest.js';
 import { processArticleReferences, processQAReferences, setupArticleRefButtons } from './articleProcessor.js';
 
 const LEVEL_PRESETS = {
@@ -456,8 +457,8 @@ function buildCharacterAvatar({ speaker = '', expression = 'normal', size = 'md'
             : 'qa-character-avatar--md';
     let markup = '';
     if (baseName) {
-        const primarySrc = `/images/${baseName}_${normalizedExpression}.png`;
-        const fallbackSrc = normalizedExpression === 'normal' ? '' : `/images/${baseName}_normal.png`;
+        const primarySrc = assetUrl(`/images/${baseName}_${normalizedExpression}.png`);
+        const fallbackSrc = normalizedExpression === 'normal' ? '' : assetUrl(`/images/${baseName}_normal.png`);
         const altText = `${displayName} (${normalizedExpression})`;
         const fallbackAttr = fallbackSrc ? ` data-fallback="${fallbackSrc}"` : '';
         markup = `
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+変換スクリプト一式のベンチマーク
+
+bench_corpus.py の合成データ（現在のデータ量の 1倍 / 10倍 / 100倍 / 1000倍）に対して
+    js_to_txt_converter.parse_js_module / format_to_txt
+    convert_qa_files.detect_and_read_file / parse_qa_content / add_blanks_to_answer_disabled
+    merge_qa_files.merge_qa_files
+の処理時間（繰り返しの最小値）・スループット・ピークメモリ (tracemalloc) を計測し、JSON に書き出す。
+
+--baseline の結果と比べ、処理時間かピークメモリが --threshold（既定 20%）を超えて
+悪化した項目があれば終了コード 1 を返す。
+
+使い方:
+    python scripts/bench_converters.py                              # 1倍・10倍・100倍を計測
+    python scripts/bench_converters.py --scales 1,10,100,1000 --repeat 1
+    python scripts/bench_converters.py --save-baseline              # 結果を基準として保存する
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import js_to_txt_converter as js_conv  # noqa: E402
+import convert_qa_files as qa_conv  # noqa: E402
+from bench_corpus import DEFAULT_SEED, write_corpus  # noqa: E402
+from merge_qa_files import merge_qa_files  # noqa: E402
+from qa_output import write_qa_json  # noqa: E402
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+RESULTS_FORMAT = 1
+BENCH_DIR = ROOT / "data" / "bench"
+RESULTS_PATH = BENCH_DIR / "results.json"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+
+
+def measure(func, repeat, memory=True):
+    """func を repeat 回実行して (最小秒数, 中央値, ピークメモリ) を返す
+
+    ピークメモリは tracemalloc を有効にした別の1回で測る（時間の計測には含めない）"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return min(times), statistics.median(times), peak
+
+
+def prepare_corpus(corpus_dir, scale, seed):
+    """合成データを作り（同じ scale と seed で作成済みなら再利用し）、計測の入力を返す"""
+    corpus_dir = Path(corpus_dir)
+    stamp = corpus_dir / "corpus.json"
+    stats = None
+    if stamp.exists():
+        with open(stamp, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+        if stats.get('scale') != scale or stats.get('seed') != seed:
+            stats = None
+    if stats is None:
+        stats = write_corpus(corpus_dir, scale, seed)
+        with open(stamp, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+
+    case_paths = sorted((corpus_dir / "cases").rglob("*.js"))
+    qa_paths = sorted((corpus_dir / "qa-source").rglob("*.txt"))
+    cases = [path.read_text(encoding='utf-8') for path in case_paths]
+    texts = [(qa_conv.get_subcategory_num_from_filename(path.name), qa_conv.detect_and_read_file(path)[0])
+             for path in qa_paths]
+
+    # merge_qa_files の入力（convert_qa_files の出力と同じ 科目_N.json）
+    qa_dir = corpus_dir / "qa"
+    qa_dir.mkdir(exist_ok=True)
+    subjects = {}
+    for path, (number, text) in zip(qa_paths, texts):
+        subjects.setdefault(path.parent.parent.name, {})[number] = qa_conv.parse_qa_content(text, number)
+    bank_bytes = 0
+    for subject, subcategory_questions in subjects.items():
+        outputs = qa_conv.build_subject_outputs(subject, subcategory_questions, "2024-04-01")
+        for name, data in outputs.items():
+            record = write_qa_json(data, qa_dir / name)
+            bank_bytes += record['written']
+
+    return {
+        "stats": stats,
+        "case_paths": case_paths,
+        "cases": cases,
+        "qa_paths": qa_paths,
+        "texts": texts,
+        "qa_dir": qa_dir,
+        "bank_bytes": bank_bytes,
+    }
+
+
+def define_benchmarks(corpus):
+    """(名前, 関数, 件数, 入力バイト数) のリストを返す"""
+    stats = corpus['stats']
+    cases = corpus['cases']
+    texts = corpus['texts']
+    parsed_cases = [js_conv.parse_js_module(content) for content in cases]
+    questions = [qa for number, text in texts for qa in qa_conv.parse_qa_content(text, number).values()]
+    answer_bytes = sum(len(qa['answer'].encode('utf-8')) for qa in questions)
+    # 用語辞書の読み込みは計測に含めない
+    qa_conv.get_blank_automaton()
+
+    def read_files():
+        for path in corpus['qa_paths']:
+            qa_conv.detect_and_read_file(path)
+
+    def parse_qa():
+        for number, text in texts:
+            qa_conv.parse_qa_content(text, number)
+
+    def add_blanks():
+        for qa in questions:
+            qa_conv.add_blanks_to_answer_disabled(qa['answer'], qa['question'])
+
+    def parse_cases():
+        for content in cases:
+            js_conv.parse_js_module(content)
+
+    def format_cases():
+        for data in parsed_cases:
+            js_conv.format_to_txt(data)
+
+    def merge():
+        with contextlib.redirect_stdout(io.StringIO()):
+            merge_qa_files(corpus['qa_dir'])
+
+    return [
+        ("detect_and_read_file", read_files, stats['qa_files'], stats['qa_bytes']),
+        ("parse_qa_content", parse_qa, stats['questions'], stats['qa_bytes']),
+        ("add_blanks_to_answer_disabled", add_blanks, len(questions), answer_bytes),
+        ("parse_js_module", parse_cases, stats['cases'], stats['case_bytes']),
+        ("format_to_txt", format_cases, stats['cases'], stats['case_bytes']),
+        ("merge_qa_files", merge, stats['questions'], corpus['bank_bytes']),
+    ]
+
+
+def run_scale(corpus_dir, scale, seed, repeat, memory, only=None):
+    print(f"\n📂 scale {scale}: 合成データを準備中...")
+    start = time.perf_counter()
+    corpus = prepare_corpus(corpus_dir, scale, seed)
+    stats = corpus['stats']
+    print(f"  ケース {stats['cases']}件 ({stats['case_bytes'] / 1024:.1f} KB), "
+          f"一問一答 {stats['questions']}問 ({stats['qa_bytes'] / 1024:.1f} KB) "
+          f"({time.perf_counter() - start:.1f}s)")
+
+    results = []
+    for name, func, items, nbytes in define_benchmarks(corpus):
+        if only and name not in only:
+            continue
+        best, median, peak = measure(func, repeat, memory)
+        result = {
+            "name": name,
+            "scale": scale,
+            "seconds": best,
+            "median_seconds": median,
+            "items": items,
+            "bytes": nbytes,
+            "items_per_s": items / best if best else None,
+            "mb_per_s": nbytes / (1024 * 1024) / best if best else None,
+            "peak_bytes": peak,
+        }
+        results.append(result)
+        memory_text = f"  ピーク {peak / (1024 * 1024):8.2f} MB" if peak is not None else ""
+        print(f"  {name:<30} {best * 1000:10.2f} ms  {result['mb_per_s']:8.2f} MB/s  "
+              f"{result['items_per_s']:12.0f} 件/s{memory_text}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """基準より threshold を超えて悪化した項目のメッセージのリストを返す"""
+    base = {(r['name'], r['scale']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        old = base.get((result['name'], result['scale']))
+        if old is None:
+            continue
+        for key, label in (("seconds", "処理時間"), ("peak_bytes", "ピークメモリ")):
+            before, after = old.get(key), result.get(key)
+            if not before or after is None:
+                continue
+            ratio = after / before
+            if ratio > 1 + threshold:
+                regressions.append(f"{result['name']} (scale {result['scale']}): "
+                                   f"{label} {ratio:.2f}倍 ({before:.4g} → {after:.4g})")
+    return regressions
+
+
+def _write_json(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="変換スクリプトのベンチマーク")
+    parser.add_argument("--scales", default=','.join(map(str, DEFAULT_SCALES)),
+                        help="計測する倍率（カンマ区切り、既定: 1,10,100）")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="繰り返し回数（最小値を採る）")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="合成データの乱数の種")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="計測する項目を絞る")
+    parser.add_argument("--no-memory", action="store_true", help="ピークメモリを計測しない")
+    parser.add_argument("--corpus-dir", help="合成データの置き場所（指定すると次回以降も再利用する）")
+    parser.add_argument("--out", default=RESULTS_PATH, help="結果の JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="比較する基準の JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="悪化とみなす割合（既定: 0.2 = 20%%）")
+    parser.add_argument("--save-baseline", action="store_true", help="結果を基準としても保存する")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+
+    results = []
+    with contextlib.ExitStack() as stack:
+        base_dir = args.corpus_dir or stack.enter_context(tempfile.TemporaryDirectory(prefix="bench-"))
+        for scale in scales:
+            results.extend(run_scale(Path(base_dir) / f"scale-{scale}", scale, args.seed,
+                                     max(1, args.repeat), not args.no_memory, args.only))
+
+    report = {
+        "format": RESULTS_FORMAT,
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    _write_json(args.out, report)
+    print(f"\n📝 結果: {args.out}")
+
+    failed = False
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists() and not args.save_baseline:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print(f"\n🔍 基準 ({baseline_path}, {baseline.get('created', '?')}) と比較 "
+              f"(しきい値 {args.threshold * 100:.0f}%)")
+        for message in regressions:
+            print(f"  ⚠️ {message}")
+        if not regressions:
+            print("  ✅ 悪化なし")
+        failed = bool(regressions)
+
+    if args.save_baseline:
+        _write_json(baseline_path, report)
+        print(f"📝 基準を保存: {baseline_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク用の合成データ生成
+
+ケースモジュール (public/cases/**/*.js と同じ書式) と一問一答テキスト
+(convert_qa_files.py の入力と同じ書式) を、乱数の種を固定して生成する。
+同じ scale と seed からは常に同じバイト列ができる。
+
+scale=1 が現在のデータ量（ケース 8件・一問一答 2030問）に相当し、
+10 / 100 / 1000 はその件数倍になる。1問・1ケースの大きさは実データの平均に近づけてある。
+
+使い方:
+    python scripts/bench_corpus.py 出力先 [scale]
+    python scripts/bench_corpus.py 出力先 100 --seed 1
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+# 現在のデータ量（scale=1）
+REAL_CASES = 8
+REAL_QUESTIONS = 2030
+
+DEFAULT_SEED = 20240401
+
+SUBJECTS = {
+    "刑事訴訟法": "一問一答刑事訴訟法",
+    "民法": "一問一答民法",
+    "刑法": "一問一答刑法",
+    "民事訴訟法": "一問一答民事訴訟法",
+    "商法": "一問一答商法",
+    "行政法": "一問一答行政法",
+}
+SUBCATEGORIES_PER_SUBJECT = 4
+
+# 一問一答ファイルの半分は Shift_JIS で書き、文字コード判定も計測対象にする
+SJIS_EVERY = 2
+
+TERMS = [
+    "構成要件", "故意", "過失", "違法性", "責任能力", "共同正犯", "教唆", "幇助",
+    "抵当権", "物上代位", "債権譲渡", "差押え", "第三債務者", "対抗要件", "登記",
+    "既判力", "訴訟物", "弁論主義", "処分権主義", "当事者適格", "訴えの利益",
+    "取締役", "株主総会", "代表訴訟", "新株発行", "善管注意義務",
+    "行政処分", "処分性", "原告適格", "裁量権", "比例原則", "信頼保護",
+    "令状主義", "伝聞法則", "自白法則", "公訴事実", "訴因変更",
+]
+CONNECTIVES = [
+    "とは", "について", "の要件として", "が認められる場合には", "を欠くときは",
+    "との関係で", "に関する判例は", "の趣旨は", "を根拠として",
+]
+ENDINGS = [
+    "と解すべきである。", "が認められる。", "は否定される。", "を要する。",
+    "と考えるのが判例である。", "と区別される。", "が問題となる。",
+]
+SPEAKERS = ["みかん", "ゆかりん", "吉岡", "村上先生", "ユズヒコ"]
+EXPRESSIONS = ["normal", "thinking", "nervous", "serious", "happy", "surprised"]
+RANKS = "ABC"
+
+
+def _sentence(rng, blanks=False):
+    parts = []
+    for _ in range(rng.randint(1, 3)):
+        term = rng.choice(TERMS)
+        parts.append(f"{{{{{term}}}}}" if blanks and rng.random() < 0.3 else term)
+        parts.append(rng.choice(CONNECTIVES))
+    parts.append(rng.choice(TERMS))
+    parts.append(rng.choice(ENDINGS))
+    return ''.join(parts)
+
+
+def _paragraph(rng, sentences, blanks=False):
+    return ''.join(_sentence(rng, blanks) for _ in range(sentences))
+
+
+def _js_string(text):
+    return json.dumps(text, ensure_ascii=False)
+
+
+# ---------------------------------------------------------------------------
+# ケースモジュール
+# ---------------------------------------------------------------------------
+
+def generate_case_module(rng, index):
+    """1ケース分のモジュールのソースを返す（約10KB。実データの平均は約8KB）"""
+    subject = list(SUBJECTS)[index % len(SUBJECTS)]
+    lines = [
+        "export default {",
+        f"  id: '{index}.1-10',",
+        f"  category: '{subject}',",
+        f"  subcategory: '{index % SUBCATEGORIES_PER_SUBJECT + 1}',",
+        f"  title: {_js_string(_sentence(rng)[:30])},",
+        f"  citation: {_js_string(_sentence(rng)[:20])},",
+        f"  rank: '{rng.choice(RANKS)}',",
+        f"  tags: [{', '.join(_js_string(t) for t in rng.sample(TERMS, 4))}],",
+        f"  rightSideCharacters: [{_js_string(rng.choice(SPEAKERS))}],",
+        "",
+        "  questionsAndAnswers: [",
+        f"    '{subject}.1.〔1.10〕'",
+        "  ],",
+        "",
+        "  story: [",
+        "    { type: 'scene', text: " + _js_string(_paragraph(rng, 1)) + " },",
+    ]
+    for i in range(rng.randint(15, 30)):
+        if i % 8 == 7:
+            content = '\\n'.join(f"【{n}】{_sentence(rng, blanks=True)}" for n in range(1, 5))
+            lines.append(f"    {{ type: 'embed', format: 'board', title: {_js_string(rng.choice(TERMS))}, "
+                         f"description: {_js_string(_sentence(rng))}, content: \"{content}\" }},")
+        else:
+            lines.append(f"    {{ type: 'dialogue', speaker: {_js_string(rng.choice(SPEAKERS))}, "
+                         f"expression: '{rng.choice(EXPRESSIONS)}', "
+                         f"dialogue: {_js_string(_paragraph(rng, rng.randint(1, 2), blanks=True))} }},")
+    lines.append("  ],")
+    lines.append("")
+    explanation = ''.join(f"<p>{_paragraph(rng, 2)}</p>" for _ in range(rng.randint(3, 6)))
+    lines.append(f"  explanation: `{explanation}`,")
+    lines.append("")
+    lines.append("  quiz: [")
+    for q in range(rng.randint(1, 2)):
+        lines.append(f"    {{ title: {_js_string(rng.choice(TERMS))}, rank: '{rng.choice(RANKS)}', "
+                     f"background: {_js_string(_paragraph(rng, 2))}, subProblems: [")
+        for s in range(rng.randint(1, 3)):
+            related = ', '.join(str(n) for n in sorted(rng.sample(range(1, 11), 2)))
+            points = ', '.join(_js_string(t) for t in rng.sample(TERMS, 3))
+            lines.append(f"      {{ title: '小問{s + 1}', rank: '{rng.choice(RANKS)}', relatedQAs: [{related}], "
+                         f"problem: {_js_string(_sentence(rng))}, hint: {_js_string(_sentence(rng))}, "
+                         f"modelAnswer: {_js_string(_paragraph(rng, 4))}, points: [{points}] }},")
+        lines.append("    ] },")
+    lines.append("  ],")
+    lines.append("};")
+    return '\n'.join(lines) + '\n'
+
+
+# ---------------------------------------------------------------------------
+# 一問一答テキスト
+# ---------------------------------------------------------------------------
+
+def generate_qa_text(rng, count, start=1):
+    """一問一答テキストを返す（1問 = 問題行 + 回答1〜3行で約240文字。実データの平均は約210文字）"""
+    out = []
+    for num in range(start, start + count):
+        out.append(f"{num}. {rng.choice(RANKS)}　{_paragraph(rng, 2)}")
+        for _ in range(rng.randint(1, 3)):
+            out.append(_paragraph(rng, rng.randint(2, 4)))
+        out.append("")
+    return '\n'.join(out)
+
+
+def _split_evenly(total, parts):
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+def write_corpus(out_dir, scale=1, seed=DEFAULT_SEED):
+    """out_dir に cases/ と qa-source/ を書き出し、件数とバイト数を返す
+
+    qa-source は convert_qa_files の SOURCE_BASE と同じ 科目/一問一答科目/N.txt の構成"""
+    out_dir = Path(out_dir)
+    rng = random.Random(f"{seed}:{scale}")
+    stats = {"scale": scale, "seed": seed, "cases": 0, "case_bytes": 0,
+             "questions": 0, "qa_files": 0, "qa_bytes": 0}
+
+    cases_dir = out_dir / "cases"
+    for index in range(REAL_CASES * scale):
+        subject = list(SUBJECTS)[index % len(SUBJECTS)]
+        path = cases_dir / subject / f"{index:06d}.js"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = generate_case_module(rng, index).encode('utf-8')
+        path.write_bytes(data)
+        stats['cases'] += 1
+        stats['case_bytes'] += len(data)
+
+    per_subject = _split_evenly(REAL_QUESTIONS * scale, len(SUBJECTS))
+    file_number = 0
+    for (subject, folder), subject_count in zip(SUBJECTS.items(), per_subject):
+        folder_path = out_dir / "qa-source" / subject / folder
+        folder_path.mkdir(parents=True, exist_ok=True)
+        for sub, count in enumerate(_split_evenly(subject_count, SUBCATEGORIES_PER_SUBJECT), 1):
+            text = generate_qa_text(rng, count)
+            encoding = 'cp932' if file_number % SJIS_EVERY else 'utf-8'
+            data = text.replace('\n', '\r\n').encode(encoding)
+            (folder_path / f"{sub}.1-{count}.txt").write_bytes(data)
+            file_number += 1
+            stats['questions'] += count
+            stats['qa_files'] += 1
+            stats['qa_bytes'] += len(data)
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ベンチマーク用の合成データを生成する")
+    parser.add_argument("out_dir", help="出力先フォルダ")
+    parser.add_argument("scale", nargs="?", type=int, default=1, help="現在のデータ量の何倍か（既定: 1）")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="乱数の種")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    stats = write_corpus(args.out_dir, args.scale, args.seed)
+    print(f"✅ scale {args.scale}: ケース {stats['cases']}件 ({stats['case_bytes'] / 1024:.1f} KB), "
+          f"一問一答 {stats['questions']}問 / {stats['qa_files']}ファイル ({stats['qa_bytes'] / 1024:.1f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
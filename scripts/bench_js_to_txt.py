@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+js_to_txt_converter.parse_js_module のベンチマーク
+
+public/cases と data/case-backups の既存ケースモジュールに対して、
+旧来の正規表現版 (parse_js_module_regex) と一括パース版 (parse_js_module) の
+処理時間を比較する。あわせて、ストーリー数万件の合成データで
+format_to_txt (文字列生成) と write_txt (ストリーム書き出し) の
+処理時間・ピークメモリを計測する。
+
+使い方:
+    python scripts/bench_js_to_txt.py [繰り返し回数] [ストーリー件数]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import js_to_txt_converter as conv  # noqa: E402
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+CASE_DIRS = [ROOT / "public" / "cases", ROOT / "data" / "case-backups"]
+
+
+def load_cases():
+    """ケースモジュール (index.js を除く) を読み込む"""
+    cases = []
+    for base in CASE_DIRS:
+        for path in sorted(base.rglob("*.js")):
+            if path.name == "index.js":
+                continue
+            content = path.read_text(encoding='utf-8')
+            if content.strip():
+                cases.append((path, content))
+    return cases
+
+
+def bench(func, cases, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, content in cases:
+            func(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def synthetic_module_data(story_count):
+    """ストーリー件数を指定した parse_js_module 形式の合成データ"""
+    story = []
+    for i in range(story_count):
+        if i % 10 == 0:
+            story.append({'type': 'embed', 'title': f'図{i}', 'description': '板書',
+                          'content': '1. 要件\\n2. 効果\\n' * 5})
+        else:
+            story.append({'type': 'dialogue', 'speaker': 'ユズヒコ', 'expression': 'normal',
+                          'dialogue': f'台詞{i}：物上代位の要件は払渡し又は引渡し前の差押えである。'})
+    return {'title': '合成ケース', 'citation': '', 'rank': 'A', 'tags': ['民法'],
+            'rightSideCharacters': [], 'questionsAndAnswers': [], 'story': story,
+            'explanation': '<p>解説</p>' * 100, 'quiz': [], 'studyRecords': []}
+
+
+def measure(func, repeat=5):
+    """(最短の処理時間, ピークメモリ) を返す。tracemalloc は確保のたびに時間がかかるので、
+    時間は tracemalloc なしで計り、メモリは別の1回で計る"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def bench_format(story_count):
+    data = synthetic_module_data(story_count)
+    print(f"\nformat_to_txt / write_txt (ストーリー {story_count} 件)")
+
+    def to_string():
+        with open(os.devnull, 'w', encoding='utf-8') as f:
+            f.write(conv.format_to_txt(data))
+
+    def to_stream():
+        with open(os.devnull, 'w', encoding='utf-8') as f:
+            conv.write_txt(data, f)
+
+    for label, func in (("format_to_txt", to_string), ("write_txt   ", to_stream)):
+        elapsed, peak = measure(func)
+        print(f"{label}: {elapsed * 1000:8.2f} ms  ピークメモリ {peak / (1024 * 1024):7.2f} MB")
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    story_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    cases = load_cases()
+    total_bytes = sum(len(c.encode('utf-8')) for _, c in cases)
+    print(f"ケース数: {len(cases)}  合計: {total_bytes / 1024:.1f} KB  繰り返し: {repeat}")
+
+    mismatched = [p for p, c in cases if conv.parse_js_module(c) != conv.parse_js_module_regex(c)]
+    for path in mismatched:
+        print(f"  出力差分あり: {path.relative_to(ROOT)}")
+
+    old = bench(conv.parse_js_module_regex, cases, repeat)
+    new = bench(conv.parse_js_module, cases, repeat)
+    mb = total_bytes / (1024 * 1024)
+    print(f"regex版 : {old * 1000:8.2f} ms  ({mb / old:6.2f} MB/s)")
+    print(f"一括パース: {new * 1000:8.2f} ms  ({mb / new:6.2f} MB/s)")
+    print(f"速度比  : x{old / new:.1f}")
+
+    bench_format(story_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+画像・音声のアセットマニフェストを作るスクリプト
+
+public/images と public/sounds の全ファイルを SHA-256 でハッシュし、
+    public/assets/<元のフォルダ>/<名前>.<ハッシュ10桁>.<拡張子>
+に内容ハッシュ付きの名前で配置して（ハードリンク、できなければコピー）、
+論理名 → 配置先の対応だけを public/assets/manifest.json に書き出す
+（{"format": 1, "assets": {"images/x.png": "assets/images/x.<ハッシュ>.png"}, "variants": {...}}）。
+名前が内容で決まるので、/assets 以下は長期キャッシュできる（server.js で immutable を付ける）。
+ブラウザ側は public/assetManifest.js の assetUrl() が /images/... や /sounds/... のパスを
+マニフェストの配置先に置き換える（マニフェストに無いものは元のパスのまま読む）。
+ハッシュ・サイズ・更新時刻と照合の結果はブラウザには要らないので、
+ビルド用のキャッシュ（data/asset-manifest-cache.json）に分けて置く。
+
+・バイト列が同じファイルは1つにまとめ、どの論理名も同じ配置先を指す（重複の一覧も出力する）
+・前回のキャッシュとサイズ・更新時刻が同じファイルはハッシュし直さない
+・--recompress を付けると PNG の IDAT を zlib の最大圧縮で詰め直し（画素は変わらない）、
+  小さくなったものはそれを配置する。Pillow があれば WebP 版も作る。サイズの一覧を表示する
+
+あわせて、ケースモジュール（js_to_txt_converter.parse_js_module）のストーリーの
+speaker / expression を public/data/characters.js のキャラクター（name / aliases → baseName）に
+当てはめ、画面が参照する images/<baseName>_<expression>.png と照合して、
+    存在しない画像（画面は _normal にフォールバックする）・登録されていない話者・
+    どのケースからも使われていないキャラクター画像
+を報告する。キャラクター画像以外で、public のソースに名前が出てこないファイルも一覧にする。
+
+使い方:
+    python scripts/build_asset_manifest.py               # マニフェストを作って照合する
+    python scripts/build_asset_manifest.py --recompress  # PNG を詰め直してサイズを比べる
+    python scripts/build_asset_manifest.py --check-only  # 照合だけする（何も書き出さない）
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import struct
+import sys
+import time
+import zlib
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from js_to_txt_converter import node_text, parse_js_export, parse_js_module  # noqa: E402
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow が無ければ WebP 版は作らない
+    Image = None
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+PUBLIC_DIR = ROOT / "public"
+ASSET_DIRS = ("images", "sounds")
+OUTPUT_DIR = PUBLIC_DIR / "assets"
+MANIFEST_NAME = "manifest.json"
+# ハッシュし直すかの判定に使う情報と照合の結果（ブラウザには要らないのでマニフェストとは別に置く）
+CACHE_PATH = ROOT / "data" / "asset-manifest-cache.json"
+CASES_DIR = PUBLIC_DIR / "cases"
+CHARACTERS_PATH = PUBLIC_DIR / "data" / "characters.js"
+
+MANIFEST_FORMAT = 1
+HASH_LENGTH = 10
+# public のソースのうち、アセットのファイル名を探すもの
+SOURCE_SUFFIXES = ('.js', '.html', '.css')
+WEBP_QUALITY = 85
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# 詰め直すときに捨てる付加情報のチャンク
+_PNG_DROP = {b'tEXt', b'zTXt', b'iTXt', b'tIME'}
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def scan_assets(public_dir=None, previous=None):
+    """{論理名: {sha256, bytes, stat}} を返す（論理名は public からの相対パス）"""
+    public_dir = Path(public_dir or PUBLIC_DIR)
+    previous = previous or {}
+    assets = {}
+    hashed = 0
+    for folder in ASSET_DIRS:
+        for path in sorted((public_dir / folder).rglob("*")):
+            if not path.is_file():
+                continue
+            name = path.relative_to(public_dir).as_posix()
+            st = path.stat()
+            stat = [st.st_size, st.st_mtime_ns]
+            old = previous.get(name)
+            if old and old.get('stat') == stat:
+                sha = old['sha256']
+            else:
+                sha = _file_sha256(path)
+                hashed += 1
+            assets[name] = {"sha256": sha, "bytes": st.st_size, "stat": stat}
+    return assets, hashed
+
+
+def fingerprinted_name(name, sha):
+    path = Path(name)
+    return (Path(OUTPUT_DIR.name) / path.parent / f"{path.stem}.{sha[:HASH_LENGTH]}{path.suffix}").as_posix()
+
+
+def group_duplicates(assets):
+    """同じ内容の論理名のリスト（2件以上のもの）"""
+    by_hash = defaultdict(list)
+    for name, entry in assets.items():
+        by_hash[entry['sha256']].append(name)
+    return [sorted(names) for names in by_hash.values() if len(names) > 1]
+
+
+# ---------------------------------------------------------------------------
+# PNG の詰め直し
+# ---------------------------------------------------------------------------
+
+def _png_chunks(data):
+    pos = len(_PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, = struct.unpack('>I', data[pos:pos + 4])
+        kind = data[pos + 4:pos + 8]
+        yield kind, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+def _png_chunk(kind, payload):
+    return struct.pack('>I', len(payload)) + kind + payload + struct.pack('>I', zlib.crc32(kind + payload))
+
+
+def repack_png(data):
+    """IDAT をまとめて最大圧縮で詰め直した PNG を返す（PNG でない・APNG・小さくならないときは None）"""
+    if not data.startswith(_PNG_SIGNATURE):
+        return None
+    chunks = list(_png_chunks(data))
+    if any(kind == b'acTL' for kind, _ in chunks):
+        return None
+    idat = b''.join(payload for kind, payload in chunks if kind == b'IDAT')
+    if not idat:
+        return None
+    raw = zlib.decompress(idat)
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9)
+    packed = compressor.compress(raw) + compressor.flush()
+    out = [_PNG_SIGNATURE]
+    wrote_idat = False
+    for kind, payload in chunks:
+        if kind == b'IDAT':
+            if not wrote_idat:
+                out.append(_png_chunk(b'IDAT', packed))
+                wrote_idat = True
+        elif kind not in _PNG_DROP:
+            out.append(_png_chunk(kind, payload))
+    result = b''.join(out)
+    return result if len(result) < len(data) else None
+
+
+def write_webp(src_path, dst_path):
+    with Image.open(src_path) as image:
+        image.save(dst_path, 'WEBP', quality=WEBP_QUALITY, method=6)
+
+
+# ---------------------------------------------------------------------------
+# 配置
+# ---------------------------------------------------------------------------
+
+def _place(src, dst):
+    """src を dst にハードリンクする（できなければコピー）"""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def emit_assets(assets, public_dir, out_dir, recompress=False, previous=None):
+    """内容ハッシュ付きの名前で配置し、マニフェストの assets を返す。使われなくなったファイルは消す"""
+    public_dir = Path(public_dir)
+    out_dir = Path(out_dir)
+    previous = previous or {}
+    canonical = {}
+    for name in sorted(assets):
+        canonical.setdefault(assets[name]['sha256'], name)
+
+    entries = {}
+    keep = set()
+    for name, entry in assets.items():
+        sha = entry['sha256']
+        first = canonical[sha]
+        file_name = fingerprinted_name(first, sha)
+        result = {"file": file_name, "sha256": sha, "bytes": entry['bytes'], "stat": entry['stat']}
+        if first != name:
+            result['duplicate_of'] = first
+        dst = public_dir / file_name
+        keep.add(dst)
+        old = previous.get(first, {})
+        if first == name:
+            src = public_dir / name
+            same = old.get('sha256') == sha and dst.exists()
+            if recompress and name.lower().endswith('.png'):
+                if same and 'optimized_bytes' in old:
+                    result['optimized_bytes'] = old['optimized_bytes']
+                else:
+                    packed = repack_png(src.read_bytes())
+                    if dst.exists():
+                        dst.unlink()
+                    if packed is None:
+                        _place(src, dst)
+                        result['optimized_bytes'] = entry['bytes']
+                    else:
+                        dst.parent.mkdir(parents=True, exist_ok=True)
+                        dst.write_bytes(packed)
+                        result['optimized_bytes'] = len(packed)
+                if Image is not None:
+                    webp = dst.with_suffix('.webp')
+                    if not webp.exists():
+                        write_webp(src, webp)
+                    result['variants'] = {"webp": webp.relative_to(public_dir).as_posix()}
+                    result['webp_bytes'] = webp.stat().st_size
+                    keep.add(webp)
+            elif not same or ('optimized_bytes' in old and not recompress):
+                if dst.exists():
+                    dst.unlink()
+                _place(src, dst)
+        entries[name] = result
+
+    # 重複のエントリーに、まとめた先の圧縮結果を写す
+    for name, result in entries.items():
+        first = result.get('duplicate_of')
+        if first:
+            for key in ('optimized_bytes', 'variants', 'webp_bytes'):
+                if key in entries[first]:
+                    result[key] = entries[first][key]
+
+    removed = 0
+    if out_dir.exists():
+        for path in out_dir.rglob("*"):
+            if path.is_file() and path.name != MANIFEST_NAME and path not in keep:
+                path.unlink()
+                removed += 1
+    return entries, removed
+
+
+# ---------------------------------------------------------------------------
+# ケースとの照合
+# ---------------------------------------------------------------------------
+
+def load_characters(characters_path=None):
+    """({名前・別名: (baseName, 表情の集合)}, {baseName の集合}) を返す"""
+    source = Path(characters_path or CHARACTERS_PATH).read_text(encoding='utf-8')
+    common = parse_js_export(source, 'COMMON_EXPRESSIONS')
+    common_expressions = {node_text(item, source) for item in common.value} if common else set()
+    lookup = {}
+    base_names = set()
+    for item in parse_js_export(source, 'characters').value:
+        if item.kind != 'object':
+            continue
+        fields = item.value
+        base = node_text(fields.get('baseName'), source)
+        if not base:
+            continue
+        base_names.add(base)
+        node = fields.get('availableExpressions')
+        if node is not None and node.kind == 'array':
+            expressions = {node_text(x, source) for x in node.value}
+        else:
+            expressions = common_expressions
+        names = [node_text(fields.get('name'), source)]
+        aliases = fields.get('aliases')
+        if aliases is not None and aliases.kind == 'array':
+            names.extend(node_text(x, source) for x in aliases.value)
+        for name in names:
+            if name:
+                lookup.setdefault(name, (base, expressions))
+    return lookup, base_names
+
+
+def collect_speakers(cases_dir=None):
+    """{(話者, 表情): [ケース, ...]} と読めなかったケースの数を返す"""
+    cases_dir = Path(cases_dir or CASES_DIR)
+    uses = defaultdict(list)
+    failed = 0
+    for path in sorted(cases_dir.rglob("*.js")):
+        if path.name == "index.js":
+            continue
+        try:
+            data = parse_js_module(path.read_text(encoding='utf-8'))
+        except Exception:
+            failed += 1
+            continue
+        case = path.relative_to(cases_dir).with_suffix('').as_posix()
+        for item in data['story']:
+            speaker = item.get('speaker', '').strip()
+            if speaker:
+                uses[(speaker, item.get('expression', '').strip() or 'normal')].append(case)
+    return uses, failed
+
+
+def cross_check(assets, public_dir=None, cases_dir=None, characters_path=None):
+    """ケースのストーリーと画像を照合した結果を返す"""
+    public_dir = Path(public_dir or PUBLIC_DIR)
+    lookup, base_names = load_characters(characters_path)
+    uses, failed = collect_speakers(cases_dir)
+
+    referenced = Counter()
+    missing = defaultdict(set)
+    unknown = Counter()
+    for (speaker, expression), cases in uses.items():
+        character = lookup.get(speaker)
+        if character is None:
+            unknown[speaker] += len(cases)
+            continue
+        base, expressions = character
+        # 画面と同じく、登録されていない表情は normal で表示される
+        image = f"images/{base}_{expression if expression in expressions else 'normal'}.png"
+        referenced[image] += len(cases)
+        if image not in assets:
+            missing[image].update(cases)
+
+    character_images = {name for name in assets
+                        if name.startswith("images/") and name.count('/') == 1
+                        and name[len("images/"):].split('_', 1)[0] in base_names}
+    unused = sorted(character_images - set(referenced))
+
+    # キャラクター画像以外は、public のソースにファイル名が出てくるかで判断する
+    sources = []
+    for path in public_dir.rglob("*"):
+        if (path.suffix in SOURCE_SUFFIXES and path.is_file()
+                and not path.is_relative_to(public_dir / "cases") and not path.is_relative_to(OUTPUT_DIR)):
+            sources.append(path.read_text(encoding='utf-8', errors='replace'))
+    text = '\n'.join(sources)
+    unreferenced = sorted(name for name in assets
+                          if name not in character_images and Path(name).name not in text)
+
+    return {
+        "cases_failed": failed,
+        "referenced": dict(sorted(referenced.items())),
+        "missing": {image: sorted(cases) for image, cases in sorted(missing.items())},
+        "unknown_speakers": dict(unknown.most_common()),
+        "unused_character_images": unused,
+        "unreferenced_assets": unreferenced,
+    }
+
+
+# ---------------------------------------------------------------------------
+# 表示
+# ---------------------------------------------------------------------------
+
+def _mb(n):
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+def print_size_report(entries, duplicates):
+    print("\n📦 サイズ")
+    for folder in ASSET_DIRS:
+        items = {name: e for name, e in entries.items() if name.startswith(folder + '/')}
+        if not items:
+            continue
+        total = sum(e['bytes'] for e in items.values())
+        unique = sum(e['bytes'] for e in items.values() if 'duplicate_of' not in e)
+        line = f"  {folder:<7} {len(items):4d}ファイル {_mb(total):>9} → 重複を除いて {_mb(unique):>9}"
+        optimized = [e for e in items.values() if 'duplicate_of' not in e and 'optimized_bytes' in e]
+        if optimized:
+            before = sum(e['bytes'] for e in optimized)
+            after = sum(e['optimized_bytes'] for e in optimized)
+            line += f", PNG 詰め直し {_mb(before)} → {_mb(after)} ({(1 - after / before) * 100:.1f}%減)"
+        webp = [e for e in items.values() if 'duplicate_of' not in e and 'webp_bytes' in e]
+        if webp:
+            line += f", WebP {_mb(sum(e['webp_bytes'] for e in webp))}"
+        print(line)
+    if duplicates:
+        print(f"\n♻️ 同じ内容のファイル {len(duplicates)}組")
+        for names in duplicates:
+            print(f"  {' = '.join(names)}")
+
+
+def print_check(check):
+    print("\n🔍 ケースのストーリーとの照合")
+    if check['cases_failed']:
+        print(f"  ⚠️ 読めなかったケース {check['cases_failed']}件")
+    print(f"  参照されている画像 {len(check['referenced'])}種")
+    for image, cases in check['missing'].items():
+        print(f"  ❌ 画像がありません: {image}（{len(cases)}ケース, 例: {cases[0]}）")
+    for speaker, count in check['unknown_speakers'].items():
+        print(f"  ❓ characters.js に無い話者: {speaker}（{count}回）")
+    unused = check['unused_character_images']
+    if unused:
+        print(f"  💤 どのケースからも使われていないキャラクター画像 {len(unused)}件 "
+              f"(チャット・INTOモードでは使われることがあります)")
+    unreferenced = check['unreferenced_assets']
+    if unreferenced:
+        print(f"  🗑️ ソースに名前が出てこないファイル {len(unreferenced)}件")
+        for name in unreferenced:
+            print(f"     {name}")
+
+
+def default_cache_path(out_dir):
+    """出力先が既定なら data/ のキャッシュ、別の出力先ならその隣（<出力先>-cache.json）"""
+    out_dir = Path(out_dir)
+    if out_dir.resolve() == OUTPUT_DIR.resolve():
+        return CACHE_PATH
+    return out_dir.with_name(f"{out_dir.name}-cache.json")
+
+
+def load_manifest(path):
+    """前回のキャッシュの assets（無いか形式が違えば空）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('format') != MANIFEST_FORMAT:
+        return {}
+    return data.get('assets', {})
+
+
+def browser_manifest(entries):
+    """ブラウザに渡すマニフェスト（論理名 → 配置先と、あれば WebP 版）"""
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "assets": {name: entry['file'] for name, entry in sorted(entries.items())},
+    }
+    variants = {name: entry['variants'] for name, entry in sorted(entries.items()) if 'variants' in entry}
+    if variants:
+        manifest['variants'] = variants
+    return manifest
+
+
+def _write_json(data, path, indent=None):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent, separators=None if indent else (',', ':'))
+    os.replace(tmp_path, path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="画像・音声のアセットマニフェストを作る")
+    parser.add_argument("--public-dir", default=PUBLIC_DIR, help="public フォルダ")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="内容ハッシュ付きのファイルとマニフェストの出力先")
+    parser.add_argument("--recompress", action="store_true",
+                        help="PNG を詰め直し（Pillow があれば WebP も作り）サイズを比べる")
+    parser.add_argument("--check-only", action="store_true", help="ケースとの照合だけ行い、何も書き出さない")
+    parser.add_argument("--cache", help="ハッシュと照合結果のキャッシュ（既定は data/asset-manifest-cache.json、"
+                                        "--out を変えたときは <出力先>-cache.json）")
+    parser.add_argument("--force", action="store_true", help="前回のキャッシュを使わず全ファイルをハッシュし直す")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    public_dir = Path(args.public_dir)
+    out_dir = Path(args.out)
+    manifest_path = out_dir / MANIFEST_NAME
+    cache_path = Path(args.cache) if args.cache else default_cache_path(out_dir)
+    start = time.perf_counter()
+
+    previous = {} if args.force else load_manifest(cache_path)
+    assets, hashed = scan_assets(public_dir, previous)
+    duplicates = group_duplicates(assets)
+    print(f"📂 {len(assets)}ファイル（ハッシュ {hashed}件, 前回から再利用 {len(assets) - hashed}件） "
+          f"({time.perf_counter() - start:.2f}s)")
+
+    check = cross_check(assets, public_dir)
+    if args.check_only:
+        print_check(check)
+        return 1 if check['missing'] else 0
+
+    if args.recompress and Image is None:
+        print("  ※ Pillow が無いため WebP 版は作成していません (pip install pillow)")
+    entries, removed = emit_assets(assets, public_dir, out_dir, args.recompress, previous)
+    print_size_report(entries, duplicates)
+    print_check(check)
+
+    _write_json({
+        "format": MANIFEST_FORMAT,
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "assets": dict(sorted(entries.items())),
+        "duplicates": duplicates,
+        "check": check,
+    }, cache_path, indent=1)
+    _write_json(browser_manifest(entries), manifest_path)
+    print(f"\n📝 {manifest_path} ({manifest_path.stat().st_size / 1024:.1f} KB)"
+          + (f"（古いファイル {removed}件を削除）" if removed else "")
+          + f" ({time.perf_counter() - start:.2f}s)")
+    print(f"📝 {cache_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
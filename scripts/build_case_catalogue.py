@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+ケースの目録と科目ごとのチャンクを作るスクリプト
+
+public/cases/<科目>/<章>/<範囲>.js を js_to_txt_converter.parse_js_module で読み、
+    public/case-bundle/catalogue.json   一覧表示用の小さな目録（id, category, subcategory, title,
+                                        citation, rank, tags, lastModified, chunk）
+    public/case-bundle/<科目>.<ハッシュ10桁>.js
+                                        その科目の全ケースの本体を1つにまとめたモジュール
+                                        （export default { ケースID: ケースのオブジェクト, ... }）
+を書き出す。一覧は目録1回の取得で表示でき、本体は開いたときに科目のチャンクを1回読むだけで済む。
+チャンクの名前は内容で決まるので長期キャッシュできる（server.js で immutable を付ける）。
+
+前回の目録とサイズ・更新時刻（data/case-bundle-cache.json に記録する。--out を変えたときは
+<出力先>-cache.json）が同じケースは読み直さず、変わったケースがある科目のチャンクだけを作り直す。
+保存の途中などで読めないケースがあれば、そのケースは前回の内容のまま次の変更を待ち、
+読めないケースを含む科目はチャンクに入れない（ブラウザは個別に読む）。--watch を付けると public/cases を監視し、保存のたびにその分だけ作り直す。
+
+ブラウザ側は public/caseCatalogue.js の installCaseCatalogue() が、cases/index.js の
+lastModified と目録の lastModified が一致するケースだけ caseLoaders をチャンクからの読み込みに
+差し替える（チャンクを作った後に編集されたケースは従来どおり個別に読む）。
+
+使い方:
+    python scripts/build_case_catalogue.py           # 変わった科目だけ作り直す
+    python scripts/build_case_catalogue.py --force   # 全件作り直す
+    python scripts/build_case_catalogue.py --watch   # 監視して作り直し続ける（Ctrl+C で終了）
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from js_to_txt_converter import JSParseError, module_object_source, parse_js_module  # noqa: E402
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+CASES_DIR = ROOT / "public" / "cases"
+OUTPUT_DIR = ROOT / "public" / "case-bundle"
+CATALOGUE_NAME = "catalogue.json"
+# 差分の判定に使うサイズ・更新時刻（ブラウザには要らないので目録とは別に置く）
+CACHE_PATH = ROOT / "data" / "case-bundle-cache.json"
+CATALOGUE_FORMAT = 1
+HASH_LENGTH = 10
+
+# --watch: public/cases をポーリングする間隔と、保存が続く間は待つ秒数
+WATCH_INTERVAL = 0.2
+WATCH_DEBOUNCE = 0.3
+
+
+def scan_cases(cases_dir=None):
+    """{ケースID: (パス, [サイズ, 更新時刻ns])} を返す（ID は index.js と同じ 科目/章/範囲）"""
+    cases_dir = Path(cases_dir or CASES_DIR)
+    found = {}
+    for path in sorted(cases_dir.rglob("*.js")):
+        if path.name == "index.js":
+            continue
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        case_id = path.relative_to(cases_dir).with_suffix('').as_posix()
+        found[case_id] = (path, [st.st_size, st.st_mtime_ns])
+    return found
+
+
+def iso_mtime(mtime_ns):
+    """caseIndexGenerator.js の stats.mtime.toISOString() と同じ形式"""
+    ms = mtime_ns // 1_000_000
+    stamp = datetime.fromtimestamp(ms // 1000, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+    return f"{stamp}.{ms % 1000:03d}Z"
+
+
+def catalogue_entry(case_id, path, stat):
+    """目録の1件分（本体をチャンクに入れられなければ chunk は None）"""
+    content = path.read_text(encoding='utf-8')
+    data = parse_js_module(content)
+    parts = case_id.split('/')
+    try:
+        module_object_source(content)
+        chunk = parts[0]
+    except JSParseError:
+        chunk = None
+    return {
+        "id": case_id,
+        "category": parts[0],
+        "subcategory": parts[1] if len(parts) > 2 else "",
+        "title": data['title'],
+        "citation": data['citation'],
+        "rank": data['rank'],
+        "tags": data['tags'],
+        "lastModified": iso_mtime(stat[1]),
+        "chunk": chunk,
+    }
+
+
+def build_chunk(subject, entries, found):
+    """科目のチャンクの中身を返す"""
+    lines = ["// このファイルは scripts/build_case_catalogue.py によって自動生成されました。",
+             "// 手動で編集しないでください。",
+             "export default {"]
+    for entry in entries:
+        source = module_object_source(found[entry['id']][0].read_text(encoding='utf-8'))
+        lines.append(f"{json.dumps(entry['id'], ensure_ascii=False)}: {source},")
+    lines.append("};")
+    return '\n'.join(lines) + '\n'
+
+
+def default_cache_path(out_dir):
+    """出力先が既定なら data/ のキャッシュ、別の出力先ならその隣（<出力先>-cache.json）"""
+    out_dir = Path(out_dir)
+    if out_dir.resolve() == OUTPUT_DIR.resolve():
+        return CACHE_PATH
+    return out_dir.with_name(f"{out_dir.name}-cache.json")
+
+
+def _load_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if data.get('format') == CATALOGUE_FORMAT else {}
+
+
+def _write_json(data, path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_previous(out_dir, cache_path=None):
+    """前回の目録に、キャッシュのサイズ・更新時刻 (stats) を加えたもの（どちらかが無ければ空）"""
+    catalogue = _load_json(Path(out_dir) / CATALOGUE_NAME)
+    cache = _load_json(cache_path or default_cache_path(out_dir))
+    if not catalogue or not cache:
+        return {}
+    return {**catalogue, "stats": cache.get('stats', {})}
+
+
+def build_catalogue(cases_dir=None, out_dir=None, previous=None, cache_path=None):
+    """目録とチャンクとキャッシュを書き出し、(次回の previous, 読み直したケース数, 作り直したチャンク) を返す"""
+    out_dir = Path(out_dir or OUTPUT_DIR)
+    previous = previous or {}
+    old_entries = {entry['id']: entry for entry in previous.get('cases', [])}
+    old_stats = previous.get('stats', {})
+    old_chunks = previous.get('chunks', {})
+
+    found = scan_cases(cases_dir)
+    entries = []
+    stats = {}
+    parsed = 0
+    dirty = set()
+    for case_id, (path, stat) in found.items():
+        old = old_entries.get(case_id)
+        if old and old_stats.get(case_id) == stat:
+            entries.append(old)
+            stats[case_id] = stat
+            continue
+        try:
+            entry = catalogue_entry(case_id, path, stat)
+        except (OSError, UnicodeDecodeError, JSParseError) as e:
+            # 保存の途中などで読めない場合は前回の内容（とチャンク）を使い、次の変更を待つ
+            print(f"  ⚠️ 読み込めません: {case_id} ({e})")
+            if old is not None:
+                entries.append(old)
+                stats[case_id] = None
+            continue
+        parsed += 1
+        entries.append(entry)
+        stats[case_id] = stat
+        dirty.add(case_id.split('/')[0])
+    # 削除されたケースの科目も作り直す
+    dirty.update(case_id.split('/')[0] for case_id in old_entries.keys() - found.keys())
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    chunks = {}
+    rebuilt = []
+    for subject in sorted({entry['chunk'] for entry in entries if entry['chunk']}):
+        old_file = old_chunks.get(subject)
+        if subject not in dirty and old_file and (out_dir / old_file).exists():
+            chunks[subject] = old_file
+            continue
+        subject_entries = [entry for entry in entries if entry['chunk'] == subject]
+        try:
+            content = build_chunk(subject, subject_entries, found)
+        except (OSError, UnicodeDecodeError, JSParseError) as e:
+            # 同じ科目の別のケースが読めない。この科目はチャンクに入れず（ブラウザは個別に読む）、次回作り直す
+            print(f"  ⚠️ チャンクを作れません: {subject} ({e})")
+            for entry in subject_entries:
+                stats[entry['id']] = None
+            continue
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+        file_name = f"{subject}.{digest}.js"
+        chunk_path = out_dir / file_name
+        if not chunk_path.exists():
+            tmp_path = f"{chunk_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, chunk_path)
+        chunks[subject] = file_name
+        rebuilt.append(file_name)
+
+    catalogue = {
+        "format": CATALOGUE_FORMAT,
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "chunks": chunks,
+        "cases": entries,
+    }
+    _write_json(catalogue, out_dir / CATALOGUE_NAME)
+    cache_path = Path(cache_path or default_cache_path(out_dir))
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_json({"format": CATALOGUE_FORMAT, "stats": stats}, cache_path)
+
+    # 使われなくなった古いチャンクを消す
+    keep = set(chunks.values())
+    for path in out_dir.glob("*.js"):
+        if path.name not in keep:
+            path.unlink()
+    return {**catalogue, "stats": stats}, parsed, rebuilt
+
+
+def print_result(catalogue, parsed, rebuilt, out_dir, elapsed):
+    cases = catalogue['cases']
+    unbundled = [entry['id'] for entry in cases if not entry['chunk']]
+    print(f"✅ {len(cases)}ケース: 読み直し {parsed}, 再利用 {len(cases) - parsed}")
+    for file_name in rebuilt:
+        print(f"  📦 {file_name} ({(Path(out_dir) / file_name).stat().st_size / 1024:.1f} KB)")
+    for case_id in unbundled:
+        print(f"  ⚠️ オブジェクトとして読めないためチャンクに入れていません（個別に読み込まれます）: {case_id}")
+    size = (Path(out_dir) / CATALOGUE_NAME).stat().st_size
+    print(f"📝 {Path(out_dir) / CATALOGUE_NAME}: {size / 1024:.1f} KB, チャンク {len(catalogue['chunks'])}個 "
+          f"({elapsed:.2f}s)")
+
+
+def watch_cases(cases_dir, out_dir, catalogue, cache_path=None, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE):
+    """public/cases を監視し、保存が debounce 秒途切れたら作り直す（Ctrl+C で終了）"""
+    def snapshot():
+        return {case_id: stat for case_id, (_, stat) in scan_cases(cases_dir).items()}
+
+    print(f"\n👀 監視中: {cases_dir} (Ctrl+C で終了)")
+    current = snapshot()
+    last_change = None
+    try:
+        while True:
+            time.sleep(interval)
+            latest = snapshot()
+            if latest != current:
+                current = latest
+                last_change = time.perf_counter()
+                continue
+            if last_change is not None and time.perf_counter() - last_change >= debounce:
+                start = time.perf_counter()
+                catalogue, parsed, rebuilt = build_catalogue(cases_dir, out_dir, catalogue, cache_path)
+                print("\n🔄 変更を検出")
+                print_result(catalogue, parsed, rebuilt, out_dir, time.perf_counter() - start)
+                last_change = None
+    except KeyboardInterrupt:
+        print("\n監視を終了しました")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ケースの目録と科目ごとのチャンクを作る")
+    parser.add_argument("--cases-dir", default=CASES_DIR, help="ケースモジュールのフォルダ")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="目録とチャンクの出力先フォルダ")
+    parser.add_argument("--cache", help="サイズ・更新時刻のキャッシュ（既定は data/case-bundle-cache.json、"
+                                        "--out を変えたときは <出力先>-cache.json）")
+    parser.add_argument("--force", action="store_true", help="前回の目録を使わず全件作り直す")
+    parser.add_argument("--watch", action="store_true", help="ケースの変更を監視して作り直し続ける")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    out_dir = Path(args.out)
+    cache_path = Path(args.cache) if args.cache else default_cache_path(out_dir)
+    previous = {} if args.force else load_previous(out_dir, cache_path)
+    catalogue, parsed, rebuilt = build_catalogue(args.cases_dir, out_dir, previous, cache_path)
+    print_result(catalogue, parsed, rebuilt, out_dir, time.perf_counter() - start)
+    if args.watch:
+        watch_cases(args.cases_dir, out_dir, catalogue, cache_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
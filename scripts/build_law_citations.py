@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Q&A・ケース本文の条文引用を抽出し、条文との相互参照表を作るスクリプト
+
+「【民法709条】」「刑訴法197条1項」「民法第七百九条」「同法12条1項」などの引用を、
+法令名の略称表と漢数字の変換で正規化して
+    Q&A（またはケース） → 条文
+    条文 → Q&A（またはケース）
+の両方向の索引 data/law-citations.json を書き出す。
+
+あわせて、laws-article-list/{法令名（URLエンコード）}-stats.json の各条文に
+qaCount / qaRefs / caseRefs を書き込む。既存の学習記録（attempts など）はそのまま残す。
+条番号は lawLoader.js と同じ "548_2" 形式、項の指定が無い引用は 1項 として数える。
+
+使い方:
+    python scripts/build_law_citations.py
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import quote
+
+from search_index import CASES_DIR, QA_DIR, ROOT, iter_case_documents, iter_qa_documents
+
+LAWS_DIR = ROOT / "laws"
+STATS_DIR = ROOT / "laws-article-list"
+OUTPUT_PATH = ROOT / "data" / "law-citations.json"
+
+# 略称 → 正式名称（laws/ のファイル名・server.js の対応法令名に合わせる）
+LAW_ALIASES = {
+    "日本国憲法": "憲法",
+    "刑訴法": "刑事訴訟法",
+    "刑訴": "刑事訴訟法",
+    "刑訴規則": "刑事訴訟規則",
+    "刑訴規": "刑事訴訟規則",
+    "民訴法": "民事訴訟法",
+    "民訴": "民事訴訟法",
+    "民訴規則": "民事訴訟規則",
+    "民訴規": "民事訴訟規則",
+    "民執法": "民事執行法",
+    "民保法": "民事保全法",
+    "行訴法": "行政事件訴訟法",
+    "行訴": "行政事件訴訟法",
+    "行手法": "行政手続法",
+    "行審法": "行政不服審査法",
+    "代執行法": "行政代執行法",
+    "情報公開法": "行政機関の保有する情報の公開に関する法律",
+    "国賠法": "国家賠償法",
+    "警職法": "警察官職務執行法",
+    "自治法": "地方自治法",
+    "地自法": "地方自治法",
+    "一般法人法": "一般社団法人及び一般財団法人に関する法律",
+    "会社規則": "会社法施行規則",
+    "施行規則": "会社法施行規則",
+    "計算規則": "会社計算規則",
+    "振替法": "社債、株式等の振替に関する法律",
+    "区分所有法": "建物の区分所有等に関する法律",
+    "不登法": "不動産登記法",
+    "消契法": "消費者契約法",
+    "特商法": "特定商取引に関する法律",
+    "自賠法": "自動車損害賠償保障法",
+    "PL法": "製造物責任法",
+    "通信傍受法": "犯罪捜査のための通信傍受に関する法律",
+    "裁判員法": "裁判員の参加する刑事裁判に関する法律",
+    "自動車運転処罰法": "自動車の運転により人を死傷させる行為等の処罰に関する法律",
+    "破防法": "破壊活動防止法",
+}
+
+# laws/ に無くても正式名称として扱う法令
+EXTRA_LAW_NAMES = ["憲法", "刑事訴訟規則", "民事訴訟規則", "破壊活動防止法"]
+
+_KANJI_DIGITS = {'〇': 0, '一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+_KANJI_UNITS = {'十': 10, '百': 100, '千': 1000}
+_FULLWIDTH = str.maketrans('０１２３４５６７８９', '0123456789')
+
+# encodeURIComponent がエスケープしない記号
+_URI_COMPONENT_SAFE = "-_.!~*'()"
+
+_NUM = r'[0-9０-９]+|[〇一二三四五六七八九十百千]+'
+# 連続する引用の間に入ってよい文字（「709条、710条」「709条と710条」「【民法709条】【同法710条】」など）
+_CONNECTOR = re.compile(r'^(?:[\s、，,・】【()（）]|及び|並びに|又は|若しくは|ないし|から|まで|と)*$')
+
+
+def kanji_to_int(text):
+    """漢数字（「七百九」「二〇」など）と全角・半角数字を整数にする"""
+    text = text.translate(_FULLWIDTH)
+    if text.isdigit():
+        return int(text)
+    if not any(ch in _KANJI_UNITS for ch in text):
+        return int(''.join(str(_KANJI_DIGITS[ch]) for ch in text))
+    total = 0
+    digit = 0
+    for ch in text:
+        if ch in _KANJI_DIGITS:
+            digit = _KANJI_DIGITS[ch]
+        else:
+            total += (digit or 1) * _KANJI_UNITS[ch]
+            digit = 0
+    return total + digit
+
+
+def load_law_names(laws_dir=None):
+    """正式名称 → 正式名称 と 略称 → 正式名称 の対応表"""
+    names = {name: name for name in EXTRA_LAW_NAMES}
+    for path in Path(laws_dir or LAWS_DIR).glob("*.xml"):
+        name = path.stem.rsplit('-', 1)[0] if '-' in path.stem else path.stem
+        names[name] = name
+    names.update(LAW_ALIASES)
+    return names
+
+
+def build_citation_pattern(law_names):
+    # 長い名前から並べ、「刑事訴訟法」を「刑法」より先に試す
+    laws = '|'.join(re.escape(name) for name in sorted(law_names, key=len, reverse=True))
+    return re.compile(
+        r'(?:(?P<law>' + laws + r')|(?P<same_law>同法)|【(?P<bracket_law>[^【】\d０-９第同]{2,40}?(?:法|規則|令)))?'
+        r'(?:(?P<same_article>同条)|第?(?P<article>' + _NUM + r')条(?:の(?P<branch>' + _NUM + r'))?)'
+        r'(?:第?(?P<paragraph>' + _NUM + r')項)?'
+        r'(?:第?(?P<item>' + _NUM + r')号)?'
+    )
+
+
+def extract_citations(text, pattern, law_names):
+    """text 中の引用を (法令名, 条番号, 項, 号) のリストで返す（項・号は無ければ None）"""
+    citations = []
+    current_law = None
+    current_article = None
+    last_end = None
+    for m in pattern.finditer(text):
+        if m.group('same_article') and m.group('paragraph') is None:
+            continue
+
+        if m.group('law'):
+            law = law_names[m.group('law')]
+        elif m.group('bracket_law'):
+            law = law_names.get(m.group('bracket_law'), m.group('bracket_law'))
+        elif m.group('same_law') or m.group('same_article'):
+            law = current_law
+        elif last_end is not None and _CONNECTOR.match(text[last_end:m.start()]):
+            # 「民法709条、710条」の 710条 のような、法令名を省略した続きの引用
+            law = current_law
+        else:
+            law = None
+        if law is None:
+            continue
+
+        if m.group('same_article'):
+            if current_article is None:
+                continue
+            article = current_article
+        else:
+            article = str(kanji_to_int(m.group('article')))
+            if m.group('branch'):
+                article += f"_{kanji_to_int(m.group('branch'))}"
+
+        paragraph = str(kanji_to_int(m.group('paragraph'))) if m.group('paragraph') else None
+        item = str(kanji_to_int(m.group('item'))) if m.group('item') else None
+        citations.append((law, article, paragraph, item))
+        current_law = law
+        current_article = article
+        last_end = m.end()
+    return citations
+
+
+def build_cross_reference(documents, law_names):
+    """{"byDocument": {参照ID: [[法令, 条, 項, 号], ...]}, "byArticle": {法令: {条: {...}}}} を返す"""
+    pattern = build_citation_pattern(law_names)
+    by_document = {}
+    refs = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))  # 法令 -> 条 -> 項 -> 参照ID
+    for kind, ref, _, text in documents:
+        ref = ref if kind == 'qa' else f"case:{ref}"
+        citations = extract_citations(text, pattern, law_names)
+        if not citations:
+            continue
+        unique = list(dict.fromkeys(citations))
+        by_document[ref] = [list(c) for c in unique]
+        for law, article, paragraph, _ in unique:
+            refs[law][article][paragraph or '1'].add(ref)
+
+    by_article = {}
+    for law in sorted(refs):
+        articles = {}
+        for article in sorted(refs[law], key=_article_sort_key):
+            paragraphs = refs[law][article]
+            all_refs = set().union(*paragraphs.values())
+            articles[article] = {
+                "count": len(all_refs),
+                "paragraphs": {p: sorted(paragraphs[p]) for p in sorted(paragraphs, key=int)},
+            }
+        by_article[law] = articles
+    return {"byDocument": by_document, "byArticle": by_article}
+
+
+def _article_sort_key(article):
+    return tuple(int(part) for part in article.split('_'))
+
+
+def format_article(article):
+    """条番号 "548_2" を "548条の2" と表示する"""
+    number, _, branch = article.partition('_')
+    return f"{number}条の{branch}" if branch else f"{number}条"
+
+
+def stats_path(stats_dir, law):
+    """server.js と同じ `${encodeURIComponent(lawName)}-stats.json`"""
+    return Path(stats_dir) / f"{quote(law, safe=_URI_COMPONENT_SAFE)}-stats.json"
+
+
+def merge_stats(by_article, stats_dir=None):
+    """条文ごとの引用数を *-stats.json に書き込み、更新したファイル名のリストを返す
+
+    書き込むのは、条文リスト ({法令名}.json) か統計ファイルが既にある法令だけ"""
+    stats_dir = Path(stats_dir or STATS_DIR)
+    updated = []
+    for law, articles in by_article.items():
+        path = stats_path(stats_dir, law)
+        if not path.exists() and not (stats_dir / f"{law}.json").exists():
+            continue
+        data = []
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+        # (条, 項) -> 参照IDのリスト
+        cited = {}
+        for article, info in articles.items():
+            for paragraph, refs in info['paragraphs'].items():
+                cited[(article, paragraph)] = refs
+
+        seen = set()
+        for entry in data:
+            key = (entry.get('articleNumber'), entry.get('paragraph'))
+            seen.add(key)
+            for field in ('qaCount', 'qaRefs', 'caseRefs'):
+                entry.pop(field, None)
+            if key in cited:
+                entry.update(_citation_fields(cited[key]))
+        for key in sorted(cited.keys() - seen, key=lambda k: (_article_sort_key(k[0]), int(k[1]))):
+            data.append({"articleNumber": key[0], "paragraph": key[1], **_citation_fields(cited[key])})
+
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        updated.append(path.name)
+    return updated
+
+
+def _citation_fields(refs):
+    qa_refs = [r for r in refs if not r.startswith('case:')]
+    case_refs = [r[len('case:'):] for r in refs if r.startswith('case:')]
+    fields = {"qaCount": len(qa_refs), "qaRefs": qa_refs}
+    if case_refs:
+        fields["caseRefs"] = case_refs
+    return fields
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Q&A・ケース本文の条文引用から相互参照表を作る")
+    parser.add_argument("--qa-dir", default=QA_DIR, help="Q&A JSONのフォルダ")
+    parser.add_argument("--cases-dir", default=CASES_DIR, help="ケースモジュールのフォルダ")
+    parser.add_argument("--laws-dir", default=LAWS_DIR, help="法令XMLのフォルダ（正式名称の一覧に使う）")
+    parser.add_argument("--out", default=OUTPUT_PATH, help="相互参照表の出力先")
+    parser.add_argument("--stats-dir", default=STATS_DIR, help="*-stats.json のフォルダ")
+    parser.add_argument("--no-stats", action="store_true", help="*-stats.json を更新しない")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    law_names = load_law_names(args.laws_dir)
+
+    def documents():
+        yield from iter_qa_documents(args.qa_dir)
+        yield from iter_case_documents(args.cases_dir)
+
+    table = build_cross_reference(documents(), law_names)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump({"format": 1, **table}, f, ensure_ascii=False, separators=(',', ':'))
+
+    citations = sum(len(c) for c in table['byDocument'].values())
+    print(f"✅ 相互参照表を作成: {out}")
+    print(f"  引用のある文書 {len(table['byDocument'])}件, 引用 {citations}件, "
+          f"法令 {len(table['byArticle'])}個, 条文 {sum(len(a) for a in table['byArticle'].values())}条")
+    for law, articles in sorted(table['byArticle'].items(), key=lambda kv: -len(kv[1]))[:10]:
+        top = sorted(articles.items(), key=lambda kv: -kv[1]['count'])[:3]
+        print(f"  📖 {law}: {len(articles)}条 (多い順: "
+              + ', '.join(f"{format_article(a)}×{info['count']}" for a, info in top) + ")")
+
+    if not args.no_stats:
+        for name in merge_stats(table['byArticle'], args.stats_dir):
+            print(f"  📝 更新: {name}")
+
+
+if __name__ == "__main__":
+    main()
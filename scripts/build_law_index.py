@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+e-Gov 法令XMLから条文ごとの索引を作るスクリプト
+
+laws/民法-129AC0000000089.xml → data/law-index/129AC0000000089.articles.xml
+                               + data/law-index/129AC0000000089.json
+
+XMLは iterparse で先頭から読み進め、読み終えた要素はその場で親から外すので、
+会社法のような数MBの法令でもメモリに載るのは処理中の1条分だけになる。
+
+.articles.xml には <Article> 要素をインデントを除いて1条1行で並べる。
+lawLoader.js の formatArticleNode にそのまま渡せる形なので、サーバーは
+索引の (オフセット, バイト長) で1条分を読み、その断片だけをパースすればよい。
+索引は LawId と LawTitle の両方から引けるよう index.json にまとめる。
+
+同じ条番号が複数ある場合（附則など）は、lawLoader.js の findArticleNode と同じく
+文書中で最初のもの（本則）を採る。
+
+失火ノ責任ニ関スル法律のように本則に <Article> が無く <Paragraph> だけの法令は、
+<MainProvision> 要素全体を "MainProvision" という1件として索引に入れる
+（索引の mainProvision が true になり、read_article はどの条番号でもそれを返す）。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+ROOT = Path(__file__).resolve().parent.parent
+LAWS_DIR = ROOT / "laws"
+OUTPUT_DIR = ROOT / "data" / "law-index"
+
+INDEX_FORMAT = 1
+# 条が無い法令の本則を入れるキー
+MAIN_PROVISION_KEY = "MainProvision"
+
+
+def _strip_layout(elem):
+    """インデント用の空白（改行を含む空白だけのテキスト）を除く"""
+    for node in elem.iter():
+        if node.text and '\n' in node.text and not node.text.strip(' \t\r\n'):
+            node.text = None
+        if node.tail and '\n' in node.tail and not node.tail.strip(' \t\r\n'):
+            node.tail = None
+
+
+def _text(elem):
+    return ''.join(elem.itertext()).strip()
+
+
+def build_law(xml_path, output_dir):
+    """1法令分の条文ファイルと索引を書き出し、索引の内容を返す
+
+    法令XMLでないファイルは ET.ParseError / ValueError になる"""
+    output_dir = Path(output_dir)
+    law_id = None
+    law_title = None
+    law_num = None
+    articles = {}
+    order = []
+    duplicates = 0
+    largest = 0
+
+    stack = []
+    in_article = 0
+    in_main = 0
+    main_start = 0
+    tmp_path = output_dir / f"{xml_path.stem}.articles.xml.tmp"
+    offset = 0
+    try:
+        with open(tmp_path, 'wb') as out:
+            for event, elem in ET.iterparse(xml_path, events=('start', 'end')):
+                if event == 'start':
+                    stack.append(elem)
+                    if elem.tag == 'Article':
+                        in_article += 1
+                    elif elem.tag == 'MainProvision' and not in_article:
+                        in_main += 1
+                        main_start = len(articles)
+                    continue
+
+                stack.pop()
+                if elem.tag == 'Article':
+                    in_article -= 1
+                    if in_article:
+                        # 改正規定などで条文の中に引用された条文
+                        continue
+                    num = elem.get('Num')
+                    if num in articles:
+                        duplicates += 1
+                    elif num:
+                        _strip_layout(elem)
+                        elem.tail = None
+                        data = ET.tostring(elem, encoding='utf-8', xml_declaration=False) + b'\n'
+                        out.write(data)
+                        articles[num] = [offset, len(data) - 1]
+                        order.append(num)
+                        offset += len(data)
+                        largest = max(largest, len(data))
+                elif in_article:
+                    # 条文の途中の要素は、条文全体を書き出すまで残しておく
+                    continue
+                elif elem.tag == 'MainProvision' and in_main:
+                    in_main -= 1
+                    # 条が1つも無く項だけの本則は、本則全体を1件にする
+                    if len(articles) == main_start and elem.find('Paragraph') is not None \
+                            and MAIN_PROVISION_KEY not in articles:
+                        _strip_layout(elem)
+                        elem.tail = None
+                        data = ET.tostring(elem, encoding='utf-8', xml_declaration=False) + b'\n'
+                        out.write(data)
+                        articles[MAIN_PROVISION_KEY] = [offset, len(data) - 1]
+                        order.append(MAIN_PROVISION_KEY)
+                        offset += len(data)
+                        largest = max(largest, len(data))
+                elif in_main:
+                    # 本則の項は本則の終わりまで残す（条は書き出した時点で外れるので、
+                    # 通常の法令で残るのは章・節の見出しだけ）
+                    continue
+                elif elem.tag == 'LawId' and law_id is None:
+                    law_id = _text(elem)
+                elif elem.tag == 'LawTitle' and law_title is None:
+                    law_title = _text(elem)
+                elif elem.tag == 'LawNum' and law_num is None and _text(elem):
+                    law_num = _text(elem)
+
+                # 読み終えた要素は親から外してメモリを解放する
+                if stack:
+                    stack[-1].remove(elem)
+                else:
+                    elem.clear()
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    if not law_title or not articles:
+        os.remove(tmp_path)
+        raise ValueError("LawTitle または Article / MainProvision の項がありません")
+
+    # 古いファイル名の XML には LawId が無いので、ファイル名の末尾を使う
+    if not law_id:
+        law_id = xml_path.stem.rsplit('-', 1)[-1]
+    articles_name = f"{law_id}.articles.xml"
+    os.replace(tmp_path, output_dir / articles_name)
+
+    index = {
+        "format": INDEX_FORMAT,
+        "lawId": law_id,
+        "lawTitle": law_title,
+        "lawNum": law_num,
+        "source": xml_path.name,
+        "articlesFile": articles_name,
+        "order": order,
+        "articles": articles,
+        "mainProvision": order == [MAIN_PROVISION_KEY],
+    }
+    with open(output_dir / f"{law_id}.json", 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    index['duplicates'] = duplicates
+    index['largest'] = largest
+    index['bytes'] = offset
+    return index
+
+
+def read_article(output_dir, law, num):
+    """索引から1条分の XML 断片を読む（law は LawId か LawTitle）"""
+    output_dir = Path(output_dir)
+    with open(output_dir / "index.json", 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    law_id = law if law in catalog['byId'] else catalog['byTitle'].get(law)
+    if law_id is None:
+        return None
+    with open(output_dir / f"{law_id}.json", 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    # 条番号は "548_2" と "548の2" のどちらでも引けるようにする
+    for key in (num, num.replace('の', '_'), num.replace('_', 'の')):
+        entry = index['articles'].get(key)
+        if entry is not None:
+            break
+    else:
+        if not index.get('mainProvision'):
+            return None
+        entry = index['articles'][MAIN_PROVISION_KEY]
+    offset, length = entry
+    with open(output_dir / index['articlesFile'], 'rb') as f:
+        f.seek(offset)
+        return f.read(length).decode('utf-8')
+
+
+def build_all(laws_dir=None, output_dir=None):
+    laws_dir = Path(laws_dir or LAWS_DIR)
+    output_dir = Path(output_dir or OUTPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    catalog = {"format": INDEX_FORMAT, "byId": {}, "byTitle": {}}
+    skipped = []
+    for xml_path in sorted(laws_dir.glob("*.xml")):
+        start = time.perf_counter()
+        try:
+            index = build_law(xml_path, output_dir)
+        except (ET.ParseError, ValueError) as e:
+            skipped.append((xml_path.name, str(e)))
+            continue
+        law_id = index['lawId']
+        catalog['byId'][law_id] = {"lawTitle": index['lawTitle'], "articles": len(index['order'])}
+        catalog['byTitle'].setdefault(index['lawTitle'], law_id)
+        extra = f", 重複 {index['duplicates']}件を除外" if index['duplicates'] else ""
+        print(f"  ✅ {index['lawTitle']} ({law_id}): {len(index['order'])}条, "
+              f"{index['bytes'] / 1024:.1f} KB, 最大 {index['largest'] / 1024:.1f} KB/条{extra} "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    with open(output_dir / "index.json", 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=2)
+
+    for name, message in skipped:
+        print(f"  ⚠️ スキップ: {name} ({message})")
+    return catalog
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="e-Gov 法令XMLから条文ごとの索引を作る")
+    parser.add_argument("--laws-dir", default=LAWS_DIR, help="法令XMLのフォルダ")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="索引の出力先フォルダ")
+    parser.add_argument("--show", nargs=2, metavar=("LAW", "NUM"),
+                        help="索引から条文を1つ表示する（例: --show 民法 548の2）")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if args.show:
+        fragment = read_article(args.out, *args.show)
+        print(fragment if fragment is not None else "❌ 条文が見つかりません")
+        return 0 if fragment is not None else 1
+
+    start = time.perf_counter()
+    catalog = build_all(args.laws_dir, args.out)
+    print(f"\n✅ {len(catalog['byId'])}法令の索引を作成 ({time.perf_counter() - start:.2f}s): {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,19 @@
 """
 
 import os
-import json
 import re
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import sys
 
+from encoding_detect import iter_lines, read_text, sniff_file_encoding
+from keyword_automaton import KeywordAutomaton
+from qa_output import print_size_report, write_qa_json
+from run_metrics import NULL_METRICS, RunMetrics, add_metrics_arguments, metrics_from_args
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 # ソースフォルダと出力先の設定
@@ -61,24 +68,10 @@ SUBCATEGORIES = {
 
 
 def detect_and_read_file(file_path):
-    """ファイルの内容を適切なエンコーディングで読み取る"""
-    # まずutf-8を試す
-    encodings = ['utf-8', 'utf-8-sig', 'cp932', 'shift_jis']
-    
-    for enc in encodings:
-        try:
-            with open(file_path, 'r', encoding=enc) as f:
-                content = f.read()
-            # 正常に読めたらチェック（日本語が含まれているか確認）
-            if any(ord(c) > 127 for c in content[:100]):
-                return content, enc
-        except (UnicodeDecodeError, UnicodeError):
-            continue
-    
-    # 最後の手段としてcp932でエラーを置換して読む
-    with open(file_path, 'rb') as f:
-        raw_data = f.read()
-    return raw_data.decode('cp932', errors='replace'), 'cp932-replace'
+    """ファイルの内容を適切なエンコーディングで読み取る
+
+    バイト列を1回だけ読み込み、encoding_detect で判定した文字コードで1回だけデコードする"""
+    return read_text(file_path)
 
 
 def add_blanks_to_answer(answer, question_text):
@@ -90,106 +83,102 @@ def add_blanks_to_answer(answer, question_text):
     return answer
 
 
-def add_blanks_to_answer_disabled(answer, question_text):
-    """回答に{{}}の空欄を追加する（司法試験知識の理解に重要な箇所に）- 無効化"""
+# 空欄候補の用語辞書（ファイル名順が優先順位。1行1語、# 以降はコメント）
+BLANK_TERMS_DIR = Path(__file__).resolve().parent.parent / "data" / "blank-terms"
+
+# 用語辞書より優先するカギ括弧内のテキスト、最後に回す要件・効果の番号付き項目
+BRACKET_PATTERN = re.compile(r'「([^」]{3,30})」')
+NUMBERED_PATTERNS = [
+    re.compile(r'(①[^②③④⑤\n]{5,40})'),
+    re.compile(r'(②[^①③④⑤\n]{5,40})'),
+    re.compile(r'(③[^①②④⑤\n]{5,40})'),
+]
+# max_numbered_length を指定したときの番号付き項目の区切り（読点・句点・括弧・空白の手前まで）
+NUMBERED_CLAUSE_END = re.compile(r'[、。，．（(【「\s]')
+
+_blank_automaton = None
+
+
+def load_blank_terms(terms_dir=None):
+    """用語辞書を読み込み、(用語, 優先順位) のリストを返す"""
+    terms = []
+    for priority, path in enumerate(sorted(Path(terms_dir or BLANK_TERMS_DIR).glob("*.txt")), start=1):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                term = line.split('#', 1)[0].strip()
+                if term:
+                    terms.append((term, priority))
+    return terms
+
+
+def get_blank_automaton():
+    """用語辞書から作ったオートマトン（プロセスごとに一度だけ構築）"""
+    global _blank_automaton
+    if _blank_automaton is None:
+        _blank_automaton = KeywordAutomaton(load_blank_terms())
+    return _blank_automaton
+
+
+def add_blanks_to_answer_disabled(answer, question_text, max_blanks=5, exclude=None, max_numbered_length=None):
+    """回答に{{}}の空欄を追加する（司法試験知識の理解に重要な箇所に）- 無効化
+
+    カギ括弧内のテキスト → 用語辞書（ファイル順） → 番号付き項目の優先順で、
+    重ならない候補を最大 max_blanks 箇所選び、出力を一度で組み立てる。
+    同じ語は最初の出現だけを空欄にする。exclude（正規表現）に一致する語は空欄にしない。
+    max_numbered_length を指定すると、番号付き項目は番号を除いて最初の読点・句点・括弧の手前までとし、
+    それより長いものは空欄にしない"""
     if not answer or not answer.strip():
         return answer
-    
+
     # 既に{{}}がある場合は処理しない
     if '{{' in answer:
         return answer
-    
-    result = answer
-    blanks_added = 0
-    max_blanks = 5  # 最大5箇所まで
-    
-    # 重要度順のパターン
-    patterns = [
-        # 1. カギ括弧内のテキスト（重要な法律用語）
-        (r'「([^」]{3,30})」', 2),
-        
-        # 2. 学説・判例名
-        (r'((?:通説|有力説|判例|多数説|少数説|反対説))', 1),
-        
-        # 3. 刑事訴訟法関連
-        (r'((?:令状主義|任意捜査|強制捜査|比例原則|逮捕|勾留|捜索|差押え|現行犯|準現行犯|緊急逮捕|通常逮捕|'
-         r'公訴事実|訴因|一事不再理|起訴便宜主義|職権主義|当事者主義|弁論主義|処分権主義|審判対象|訴訟物|既判力|'
-         r'公判手続|証拠法則|自白法則|違法収集証拠排除法則|挙証責任|証明責任|推定無罪|黙秘権|接見交通権|'
-         r'被疑者|被告人|検察官|弁護人|裁判官|捜査機関|警察官|'
-         r'公訴権|訴追裁量|起訴状一本主義|予断排除|冒頭陳述|論告|弁論|'
-         r'証拠能力|証明力|自由心証主義|補強法則|伝聞法則|供述証拠|非供述証拠|'
-         r'別件逮捕|違法収集証拠|毒樹の果実|排除法則|相当性|必要性|緊急性|'
-         r'意思制圧|権利侵害|プライバシー|住居|財産|身体|自由))', 1),
-        
-        # 4. 民法関連
-        (r'((?:善意|悪意|過失|無過失|有過失|故意|重過失|軽過失|'
-         r'物権|債権|所有権|占有権|抵当権|質権|留置権|先取特権|'
-         r'契約|不法行為|事務管理|不当利得|相続|遺言|'
-         r'意思表示|法律行為|代理|無効|取消|詐欺|強迫|錯誤|'
-         r'時効|消滅時効|取得時効|履行|債務不履行|損害賠償|'
-         r'連帯債務|保証|担保|対抗要件|公示|登記|引渡し))', 1),
-        
-        # 5. 刑法関連
-        (r'((?:構成要件|違法性|責任|故意|過失|因果関係|実行行為|結果|'
-         r'正当防衛|緊急避難|正当行為|被害者の承諾|'
-         r'責任能力|心神喪失|心神耗弱|違法性の意識|期待可能性|'
-         r'共同正犯|教唆犯|幇助犯|間接正犯|共謀共同正犯|'
-         r'未遂|予備|中止犯|不能犯|'
-         r'罪刑法定主義|類推解釈|拡張解釈|法益|保護法益))', 1),
-        
-        # 6. 行政法関連
-        (r'((?:処分|行政行為|行政処分|公定力|不可争力|不可変更力|執行力|'
-         r'取消訴訟|義務付け訴訟|差止訴訟|当事者訴訟|国家賠償|損失補償|'
-         r'原告適格|訴えの利益|処分性|裁量|裁量権|逸脱濫用|'
-         r'行政指導|行政契約|行政計画|行政立法|通達|告示|'
-         r'法律の留保|侵害留保|全部留保|権力留保))', 1),
-        
-        # 7. 要件・効果の内容
-        (r'(①[^②③④⑤\n]{5,40})', 1),
-        (r'(②[^①③④⑤\n]{5,40})', 1),
-        (r'(③[^①②④⑤\n]{5,40})', 1),
-    ]
-    
-    for pattern, priority in patterns:
-        if blanks_added >= max_blanks:
+
+    # 候補: (優先順位, 開始, -長さ, 終了, 語)
+    candidates = []
+    for m in BRACKET_PATTERN.finditer(answer):
+        candidates.append((0, m.start(1), -len(m.group(1)), m.end(1), m.group(1)))
+    for start, end, priority in get_blank_automaton().find_all(answer):
+        candidates.append((priority, start, start - end, end, answer[start:end]))
+    for pattern in NUMBERED_PATTERNS:
+        for m in pattern.finditer(answer):
+            start, word = m.start(1), m.group(1)
+            if max_numbered_length is not None:
+                start += 1
+                word = NUMBERED_CLAUSE_END.split(word[1:], 1)[0]
+                if len(word) > max_numbered_length:
+                    continue
+            candidates.append((sys.maxsize, start, -len(word), start + len(word), word))
+    candidates.sort()
+
+    chosen = []
+    used_words = set()
+    for _, start, _, end, word in candidates:
+        if len(chosen) >= max_blanks:
             break
-        
-        matches = list(re.finditer(pattern, result))
-        for match in matches:
-            if blanks_added >= max_blanks:
-                break
-            
-            keyword = match.group(1)
-            # 既に{{}}で囲まれていないか確認
-            start = match.start()
-            if start >= 2 and result[start-2:start] == '{{':
-                continue
-            
-            # 短すぎるものは除外
-            if len(keyword) < 2:
-                continue
-            
-            # カギ括弧内テキストの場合
-            if pattern.startswith(r'「'):
-                old_text = f'「{keyword}」'
-                new_text = f'「{{{{{keyword}}}}}」'
-            else:
-                old_text = keyword
-                new_text = '{{' + keyword + '}}'
-            
-            # 置換（最初の出現のみ）
-            old_result = result
-            result = result.replace(old_text, new_text, 1)
-            if result != old_result:
-                blanks_added += 1
-    
-    # 二重括弧を単一括弧に修正
-    while '{{{{' in result:
-        result = result.replace('{{{{', '{{')
-    while '}}}}' in result:
-        result = result.replace('}}}}', '}}')
-    
-    return result
+        # 短すぎるもの・既出の語・選択済みの箇所と重なるものは除外
+        if len(word) < 2 or word in used_words:
+            continue
+        if exclude is not None and exclude.search(word):
+            continue
+        if any(start < c_end and c_start < end for c_start, c_end in chosen):
+            continue
+        chosen.append((start, end))
+        used_words.add(word)
+
+    if not chosen:
+        return answer
+
+    parts = []
+    pos = 0
+    for start, end in sorted(chosen):
+        parts.append(answer[pos:start])
+        parts.append('{{')
+        parts.append(answer[start:end])
+        parts.append('}}')
+        pos = end
+    parts.append(answer[pos:])
+    return ''.join(parts)
 
 
 def get_subcategory_num_from_filename(filename):
@@ -200,146 +189,418 @@ def get_subcategory_num_from_filename(filename):
     return None
 
 
-def parse_qa_content(content, subcategory_num):
-    """テキスト内容をQ&A形式にパース"""
-    questions = {}
-    
-    # 行に分割（\r\rも考慮）
-    content = content.replace('\r\r\n', '\n').replace('\r\n', '\n').replace('\r', '\n')
-    lines = content.split('\n')
-    
+# 問題行の形式（1つのパターンで両方に対応）:
+# "123. A　質問文" / "123. A 質問文" (刑事訴訟法など)
+# "123.A　質問文" / "123.A 質問文" (行政法など)
+QUESTION_LINE_PATTERN = re.compile(r'^(\d+)\.\s*([ABC])[　\s]+(.+)$')
+
+
+def iter_qa_records(lines, subcategory_num, with_blanks=False, metrics=NULL_METRICS):
+    """行の反復からQ&Aを1問ずつ (question_id, record) で返す
+
+    lines は改行を含まない行の反復（リストでもファイルでもよい）で、
+    1問分の回答行だけを保持しながら進むので、入力全体をメモリに載せない。
+    metrics には行の読み出し (decode) と空欄の追加 (blanks) の時間を数える"""
+    blank_func = add_blanks_to_answer_disabled if with_blanks else add_blanks_to_answer
+    blank_func = metrics.timed_call(blank_func, 'blanks')
+    lines = metrics.timed_iter(lines, 'decode')
+    match_question = QUESTION_LINE_PATTERN.match
+
     current_num = None
     current_rank = None
     current_question = None
     current_answer_lines = []
-    
-    # 2つのパターンに対応:
-    # パターン1: "123. A　質問文" または "123. A 質問文" (刑事訴訟法など)
-    # パターン2: "123.A　質問文" または "123.A 質問文" (行政法など)
-    pattern1 = re.compile(r'^(\d+)\.\s*([ABC])[　\s]+(.+)$')  # スペースあり
-    pattern2 = re.compile(r'^(\d+)\.([ABC])[　\s]+(.+)$')      # スペースなし
-    
+
     for line in lines:
         line = line.strip()
-        
-        match = pattern1.match(line) or pattern2.match(line)
+
+        match = match_question(line) if line[:1].isdigit() else None
         if match:
-            # 前の問題を保存
+            # 前の問題を返す
             if current_num is not None and current_question:
                 answer_text = '\n'.join(current_answer_lines).strip()
-                answer = add_blanks_to_answer(answer_text, current_question)
-                question_id = f"{subcategory_num}-{current_num}"
-                questions[question_id] = {
+                yield f"{subcategory_num}-{current_num}", {
                     "rank": current_rank,
                     "question": current_question,
-                    "answer": answer
+                    "answer": blank_func(answer_text, current_question)
                 }
-            
+
             # 新しい問題を開始
-            current_num = match.group(1)
-            current_rank = match.group(2)
-            current_question = match.group(3)
+            current_num, current_rank, current_question = match.groups()
             current_answer_lines = []
         elif current_num is not None and line:
             # 答えの一部として追加（空行以外）
             current_answer_lines.append(line)
-    
-    # 最後の問題を保存
+
+    # 最後の問題を返す
     if current_num is not None and current_question:
         answer_text = '\n'.join(current_answer_lines).strip()
-        answer = add_blanks_to_answer(answer_text, current_question)
-        question_id = f"{subcategory_num}-{current_num}"
-        questions[question_id] = {
+        yield f"{subcategory_num}-{current_num}", {
             "rank": current_rank,
             "question": current_question,
-            "answer": answer
+            "answer": blank_func(answer_text, current_question)
         }
-    
-    return questions
 
 
-def process_subject(subject_name, qa_folder_name):
-    """科目を処理してJSONファイルを生成"""
-    qa_folder_path = os.path.join(SOURCE_BASE, subject_name, qa_folder_name)
-    
+def iter_qa_file(file_path, subcategory_num, with_blanks=False, encoding=None, metrics=NULL_METRICS, status=None):
+    """ファイルをメモリマップで文字コード判定し、少しずつデコードしながら
+    Q&Aを1問ずつ (question_id, record) で返す（status は encoding_detect.iter_lines に渡す）"""
+    return iter_qa_records(iter_lines(file_path, encoding, status), subcategory_num, with_blanks, metrics)
+
+
+def parse_qa_content(content, subcategory_num, with_blanks=False):
+    """テキスト内容をQ&A形式にパース（with_blanks=True で回答に空欄を追加）"""
+    # 行に分割（\r\rも考慮）
+    content = content.replace('\r\r\n', '\n').replace('\r\n', '\n').replace('\r', '\n')
+    return dict(iter_qa_records(content.split('\n'), subcategory_num, with_blanks))
+
+
+# 科目ごとの一問一答フォルダ名
+SUBJECT_FOLDERS = {
+    "刑事訴訟法": "一問一答刑事訴訟法",
+    "民法": "一問一答民法",
+    "刑法": "一問一答刑法",
+    "民事訴訟法": "一問一答民事訴訟法",
+    "商法": "一問一答商法",
+    "行政法": "一問一答行政法",
+}
+
+
+def list_subject_files(subject_name, qa_folder_name, source_base=None):
+    """科目フォルダ内の一問一答ファイルを (サブカテゴリ番号, ファイル名, パス) のリストで返す
+
+    並列実行でも出力順が変わらないようファイル名順に並べる。フォルダがなければ None"""
+    qa_folder_path = os.path.join(source_base or SOURCE_BASE, subject_name, qa_folder_name)
+
     if not os.path.exists(qa_folder_path):
         print(f"Folder not found: {qa_folder_path}")
-        return
-    
-    print(f"\nProcessing: {subject_name}")
-    
-    # サブカテゴリごとにファイルを処理
-    subcategory_questions = {}
-    
-    for filename in os.listdir(qa_folder_path):
+        return None
+
+    files = []
+    for filename in sorted(os.listdir(qa_folder_path)):
         if not filename.endswith('.txt'):
             continue
-        
+
         subcategory_num = get_subcategory_num_from_filename(filename)
         if not subcategory_num:
             continue
-        
-        print(f"  Reading: {filename}")
-        file_path = os.path.join(qa_folder_path, filename)
-        content, enc = detect_and_read_file(file_path)
-        
-        if content is None:
-            continue
-        
-        print(f"    Encoding: {enc}")
-        questions = parse_qa_content(content, subcategory_num)
-        
-        if subcategory_num not in subcategory_questions:
-            subcategory_questions[subcategory_num] = {}
-        subcategory_questions[subcategory_num].update(questions)
-        print(f"    Parsed {len(questions)} questions")
-    
-    # サブカテゴリごとにJSONファイルを出力
+
+        files.append((subcategory_num, filename, os.path.join(qa_folder_path, filename)))
+    return files
+
+
+def parse_qa_file(file_path, subcategory_num, with_blanks=False, detailed=False):
+    """1ファイルを読み込んでパースする（ワーカープロセスからも呼ばれる）
+
+    (questions, encoding, 処理秒数, メトリクス) を返す。メトリクスは detailed のときだけ
+    ステージごとの時間を記録した RunMetrics.snapshot()、それ以外は None"""
+    metrics = RunMetrics('parse_qa_file') if detailed else NULL_METRICS
+    start = time.perf_counter()
+    with metrics.stage('detect'):
+        enc = sniff_file_encoding(file_path)
+    status = {}
+    with metrics.stage('parse'):
+        questions = dict(iter_qa_file(file_path, subcategory_num, with_blanks, enc, metrics, status))
+    # 判定に使わなかった部分に別の文字コードの行があれば 'mixed' / '-replace' になる
+    return questions, status['encoding'], time.perf_counter() - start, metrics.snapshot()
+
+
+def _parse_qa_task(task):
+    return parse_qa_file(*task)
+
+
+def build_subject_outputs(subject_name, subcategory_questions, last_updated):
+    """サブカテゴリごとの出力データを {出力ファイル名: データ} で返す"""
+    outputs = {}
     for subcategory_num, questions in subcategory_questions.items():
         if not questions:
             continue
-        
+
         subcategory_name = SUBCATEGORIES.get(subject_name, {}).get(subcategory_num, f"カテゴリ{subcategory_num}")
-        
-        output_data = {
+
+        outputs[f"{subject_name}_{subcategory_num}.json"] = {
             "subject": subject_name,
             "version": "1.0",
-            "lastUpdated": datetime.now().strftime("%Y-%m-%d"),
+            "lastUpdated": last_updated,
             "subcategories": {
                 subcategory_num: subcategory_name
             },
             "questions": questions
         }
-        
-        output_filename = f"{subject_name}_{subcategory_num}.json"
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"  Created: {output_filename} ({len(questions)} questions)")
+    return outputs
+
+
+def convert_subjects(subject_folders, jobs=1, source_base=None, output_dir=None, timings=None,
+                     with_blanks=False, compact=False, size_records=None, metrics=NULL_METRICS,
+                     file_cache=None):
+    """複数科目をまとめて変換する
+
+    ファイル単位の読み込み・パースは jobs 個のプロセスに分散し、結果は親プロセスで
+    ファイル名順にマージするので、出力は逐次実行と同一になる。
+    timings にリストを渡すと (科目, ファイル名, 問題数, 秒数) を追記する。
+    compact=True なら最小化JSONと .gz / .br を書き出す。size_records にリストを渡すと
+    qa_output のサイズ記録を追記する。metrics にはステージごとの時間と件数を記録する。
+    file_cache に辞書を渡すと {ソースのパス: そのファイルの問題} を記録する（--watch 用）。
+    {出力ファイル名: データ} を返す"""
+    output_dir = output_dir or OUTPUT_DIR
+    last_updated = datetime.now().strftime("%Y-%m-%d")
+
+    plan = []
+    for subject_name, qa_folder_name in subject_folders.items():
+        files = list_subject_files(subject_name, qa_folder_name, source_base)
+        if files is not None:
+            plan.append((subject_name, files))
+
+    tasks = [(file_path, subcategory_num, with_blanks, metrics.enabled)
+             for _, files in plan for subcategory_num, _, file_path in files]
+    # ワーカーの中の detect / decode / parse / blanks は各ワーカーで測って足し込む
+    with metrics.stage('read_all'):
+        if jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+                results = list(executor.map(_parse_qa_task, tasks))
+        else:
+            results = [_parse_qa_task(task) for task in tasks]
+
+    all_outputs = {}
+    result_iter = iter(results)
+    for subject_name, files in plan:
+        print(f"\nProcessing: {subject_name}")
+
+        # サブカテゴリごとにファイルを処理
+        subcategory_questions = {}
+        for subcategory_num, filename, file_path in files:
+            questions, enc, elapsed, snapshot = next(result_iter)
+            print(f"  Reading: {filename}")
+            if questions is None:
+                continue
+
+            if file_cache is not None:
+                file_cache[file_path] = questions
+            metrics.merge(snapshot)
+            metrics.count('files')
+            metrics.count('questions', len(questions))
+            metrics.count('bytes_in', os.path.getsize(file_path))
+
+            print(f"    Encoding: {enc}")
+            if subcategory_num not in subcategory_questions:
+                subcategory_questions[subcategory_num] = {}
+            subcategory_questions[subcategory_num].update(questions)
+            print(f"    Parsed {len(questions)} questions ({elapsed * 1000:.1f} ms)")
+            if timings is not None:
+                timings.append((subject_name, filename, len(questions), elapsed))
+
+        # サブカテゴリごとにJSONファイルを出力
+        outputs = build_subject_outputs(subject_name, subcategory_questions, last_updated)
+        for output_filename, output_data in outputs.items():
+            output_path = os.path.join(output_dir, output_filename)
+            with metrics.stage('write'):
+                record = write_qa_json(output_data, output_path, compact)
+            metrics.count('bytes_out', record['written'])
+            if size_records is not None:
+                size_records.append(record)
+
+            print(f"  Created: {output_filename} ({len(output_data['questions'])} questions)")
+        all_outputs.update(outputs)
+
+    return all_outputs
+
+
+def process_subject(subject_name, qa_folder_name, jobs=1, compact=False):
+    """科目を処理してJSONファイルを生成"""
+    return convert_subjects({subject_name: qa_folder_name}, jobs, compact=compact)
+
+
+def merge_subject_outputs(subject_name, output_dir=None, compact=False):
+    """出力先の 科目_N.json を merge_qa_files と同じ方法で 科目.json に統合する"""
+    from merge_qa_files import merge_subject
+
+    output_dir = Path(output_dir or OUTPUT_DIR)
+    files = []
+    for path in output_dir.glob(f"{subject_name}_*.json"):
+        number = path.stem.rsplit('_', 1)[1]
+        if number.isdigit():
+            files.append((int(number), path))
+    files.sort()
+    return merge_subject(subject_name, [(str(n), path) for n, path in files],
+                         output_dir / f"{subject_name}.json", compact)
+
+
+# --watch: ソースフォルダをポーリングし、変更されたファイルだけを読み直す
+WATCH_INTERVAL = 0.2
+WATCH_DEBOUNCE = 0.3
+
+
+def scan_sources(subject_folders, source_base=None):
+    """{パス: (科目, サブカテゴリ番号, (サイズ, 更新時刻))} を返す"""
+    found = {}
+    for subject_name, qa_folder_name in subject_folders.items():
+        qa_folder_path = os.path.join(source_base or SOURCE_BASE, subject_name, qa_folder_name)
+        try:
+            entries = list(os.scandir(qa_folder_path))
+        except OSError:
+            continue
+        for entry in entries:
+            subcategory_num = get_subcategory_num_from_filename(entry.name)
+            if not entry.name.endswith('.txt') or not subcategory_num:
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            found[entry.path] = (subject_name, subcategory_num, (st.st_size, st.st_mtime_ns))
+    return found
+
+
+def update_changed_sources(changed, sources, previous, file_cache, output_dir=None, with_blanks=False,
+                           compact=False, merge=False):
+    """changed のファイルを読み直し、影響するサブカテゴリの出力（と統合ファイル）だけを書き直す
+
+    sources は現在の scan_sources()、previous は前回のもの（削除されたファイルの所属を引く）。
+    書き出したファイル名のリストを返す"""
+    output_dir = output_dir or OUTPUT_DIR
+    affected = set()
+    for path in sorted(changed):
+        info = sources.get(path) or previous.get(path)
+        if info is None:
+            continue
+        subject_name, subcategory_num, _ = info
+        affected.add((subject_name, subcategory_num))
+        if path not in sources:
+            file_cache.pop(path, None)
+            print(f"  🗑️ 削除: {os.path.basename(path)}")
+            continue
+        try:
+            file_cache[path] = parse_qa_file(path, subcategory_num, with_blanks)[0]
+        except (OSError, UnicodeDecodeError) as e:
+            # 保存の途中などで読めない場合は前回の内容を使い、次の変更を待つ
+            print(f"  ⚠️ 読み込めません: {os.path.basename(path)} ({e})")
+
+    last_updated = datetime.now().strftime("%Y-%m-%d")
+    written = []
+    for subject_name, subcategory_num in sorted(affected):
+        # convert_subjects と同じく、同じサブカテゴリのファイルをファイル名順にまとめる
+        questions = {}
+        for path in sorted(p for p, (s, n, _) in sources.items() if s == subject_name and n == subcategory_num):
+            questions.update(file_cache.get(path, {}))
+        outputs = build_subject_outputs(subject_name, {subcategory_num: questions}, last_updated)
+        if not outputs:
+            print(f"  ⚠️ {subject_name}_{subcategory_num}.json: 問題が無くなったため更新しません")
+            continue
+        for output_filename, output_data in outputs.items():
+            write_qa_json(output_data, os.path.join(output_dir, output_filename), compact)
+            written.append(output_filename)
+            print(f"  ✅ {output_filename} ({len(output_data['questions'])} questions)")
+
+    if merge:
+        for subject_name in sorted({s for s, _ in affected}):
+            result = merge_subject_outputs(subject_name, output_dir, compact)
+            written.append(f"{subject_name}.json")
+            print(f"  ✅ {subject_name}.json ({result['questions']} questions)")
+    return written
+
+
+def watch_subjects(subject_folders, source_base=None, output_dir=None, file_cache=None, with_blanks=False,
+                   compact=False, merge=False, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE):
+    """ソースフォルダを監視し、保存が debounce 秒途切れたら変更分だけを変換する（Ctrl+C で終了）
+
+    file_cache は convert_subjects(file_cache=...) で作った {パス: 問題}"""
+    file_cache = {} if file_cache is None else file_cache
+    sources = scan_sources(subject_folders, source_base)
+    for path, (_, subcategory_num, _) in sources.items():
+        if path not in file_cache:
+            file_cache[path] = parse_qa_file(path, subcategory_num, with_blanks)[0]
+
+    print(f"\n👀 監視中: {len(sources)} files (Ctrl+C で終了)")
+    previous = sources
+    pending = set()
+    last_change = None
+    try:
+        while True:
+            time.sleep(interval)
+            current = scan_sources(subject_folders, source_base)
+            if current != sources:
+                pending.update(p for p in current.keys() | sources.keys() if current.get(p) != sources.get(p))
+                sources = current
+                last_change = time.perf_counter()
+                continue
+            if pending and time.perf_counter() - last_change >= debounce:
+                print(f"\n🔄 {len(pending)} files changed")
+                update_changed_sources(pending, sources, previous, file_cache, output_dir, with_blanks,
+                                       compact, merge)
+                print(f"  ({(time.perf_counter() - last_change) * 1000:.0f} ms after the last change)")
+                previous = sources
+                pending = set()
+    except KeyboardInterrupt:
+        print("\n監視を終了しました")
+
+
+def print_timing_summary(timings, wall_time):
+    """ファイルごとの処理時間を遅い順に表示する"""
+    if not timings:
+        return
+    print("\n=== Timing summary ===")
+    for subject_name, filename, count, elapsed in sorted(timings, key=lambda t: t[3], reverse=True):
+        print(f"  {elapsed * 1000:9.1f} ms  {count:5d} questions  {subject_name}/{filename}")
+    total = sum(t[3] for t in timings)
+    print(f"  files: {len(timings)}  sum: {total:.2f}s  wall: {wall_time:.2f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="一問一答テキストファイルをJSONファイルに変換する")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="並列プロセス数（既定: CPU数、1で逐次実行）")
+    parser.add_argument("--source", default=SOURCE_BASE, help="一問一答ソースのルートフォルダ")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="JSONの出力先フォルダ")
+    parser.add_argument("--blanks", action="store_true", help="用語辞書にもとづいて回答に{{}}の空欄を追加する")
+    parser.add_argument("--compact", action="store_true",
+                        help="キー順を揃えた最小化JSONと .gz / .br を書き出す")
+    parser.add_argument("--merge", action="store_true",
+                        help="変換した科目を merge_qa_files と同じ 科目.json にも統合する")
+    parser.add_argument("--watch", action="store_true",
+                        help="変換後もソースフォルダを監視し、変更されたファイルの分だけ変換し直す")
+    parser.add_argument("--poll-interval", type=float, default=WATCH_INTERVAL,
+                        help=f"--watch でフォルダを調べる間隔（秒、既定: {WATCH_INTERVAL}）")
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE,
+                        help=f"--watch で保存が続く間は待つ秒数（既定: {WATCH_DEBOUNCE}）")
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
 
 
 def main():
     """メイン処理"""
+    args = parse_args()
+
     # 出力ディレクトリの確認
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    # 科目ごとの一問一答フォルダ名
-    subject_folders = {
-        "刑事訴訟法": "一問一答刑事訴訟法",
-        "民法": "一問一答民法",
-        "刑法": "一問一答刑法",
-        "民事訴訟法": "一問一答民事訴訟法",
-        "商法": "一問一答商法",
-        "行政法": "一問一答行政法",
-    }
-    
-    for subject_name, qa_folder_name in subject_folders.items():
-        process_subject(subject_name, qa_folder_name)
-    
+    os.makedirs(args.output, exist_ok=True)
+
+    metrics = metrics_from_args('convert_qa_files', args)
+    jobs = max(1, args.jobs)
+    if args.profile and jobs > 1:
+        # cProfile はこのプロセスの中しか見えないので、ワーカーを使わずに実行する
+        print("--profile のため -j 1 で実行します")
+        jobs = 1
+
+    start = time.perf_counter()
+    timings = []
+    size_records = []
+    file_cache = {}
+    outputs = convert_subjects(SUBJECT_FOLDERS, jobs, args.source, args.output, timings, args.blanks,
+                               args.compact, size_records, metrics, file_cache)
+    if args.merge:
+        for subject_name in sorted({data['subject'] for data in outputs.values()}):
+            print(f"\n📚 {subject_name} を統合中...")
+            merge_subject_outputs(subject_name, args.output, args.compact)
+    print_timing_summary(timings, time.perf_counter() - start)
+    print_size_report(size_records)
+    if metrics.enabled:
+        metrics.finish(args.metrics_out)
+
     print("\n=== Conversion complete! ===")
 
+    if args.watch:
+        watch_subjects(SUBJECT_FOLDERS, args.source, args.output, file_cache, args.blanks, args.compact,
+                       args.merge, args.poll_interval, args.debounce)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Q&Aバンクとケースのメタデータを D1 / SQLite に一括投入するスクリプト
+
+public/data/qa/*_*.json (convert_qa_files.py の出力)        → qa_questions テーブル
+public/cases/**/*.js (js_to_txt_converter.parse_js_module)  → cases テーブル
+
+テーブル定義は workers-api/schema.sql。2種類の出力を作る。
+・data/d1/qa_questions.sql, data/d1/cases.sql
+    複数行の INSERT をまとめた SQL ファイル。1文が D1 の上限（100KB）を超えないように分ける。
+    先頭で DELETE するので、何度流しても全件入れ直しになる。
+        npx wrangler d1 execute <DB名> --remote --file data/d1/qa_questions.sql
+    （D1 は SQL ファイル内の BEGIN / COMMIT を受け付けないので書かない）
+・data/d1/local.sqlite
+    schema.sql で作ったローカルの SQLite に、1トランザクション + executemany で投入する。
+
+--check-sql を付けると、書き出した SQL ファイルを空の SQLite に流し込み、
+executemany で入れた内容と一致するかを確かめる。
+
+使い方:
+    python scripts/d1_bulk_load.py               # SQL ファイルとローカル SQLite を作る
+    python scripts/d1_bulk_load.py --check-sql   # さらに SQL ファイルを検証する
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from shard_qa_banks import QA_DIR, find_banks, iter_bank_questions  # noqa: E402
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+CASES_DIR = ROOT / "public" / "cases"
+SCHEMA_PATH = ROOT / "workers-api" / "schema.sql"
+OUTPUT_DIR = ROOT / "data" / "d1"
+LOCAL_DB_NAME = "local.sqlite"
+
+# D1 の SQL 文1つあたりの上限は 100,000 バイト
+MAX_STATEMENT_BYTES = 100_000
+
+QA_COLUMNS = ("subject", "qa_id", "subcategory", "subcategory_name", "rank",
+              "question", "answer", "extra", "updated_at")
+CASE_COLUMNS = ("case_id", "subject", "title", "citation", "rank", "tags",
+                "qa_count", "quiz_count", "updated_at")
+TABLES = {
+    "qa_questions": QA_COLUMNS,
+    "cases": CASE_COLUMNS,
+}
+
+_QA_FIELDS = ('rank', 'question', 'answer')
+
+
+def _dump(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+# ---------------------------------------------------------------------------
+# 行の読み出し
+# ---------------------------------------------------------------------------
+
+def iter_qa_rows(qa_dir=None):
+    """Q&Aバンクを qa_questions の行として返す（問題IDは統合後のバンクと同じ "サブカテゴリ-番号"）"""
+    for subject, files in find_banks(qa_dir or QA_DIR).items():
+        for qid, qa, subcategory, names, updated in iter_bank_questions(files):
+            extra = {k: v for k, v in qa.items() if k not in _QA_FIELDS}
+            yield (subject, qid, subcategory, names.get(subcategory), qa.get('rank'),
+                   qa.get('question'), qa.get('answer'), _dump(extra), updated or None)
+
+
+def _has_content(qa):
+    return any(qa.get(key) for key in ('question', 'answer'))
+
+
+def iter_case_rows(cases_dir=None):
+    """ケースモジュール (index.js を除く) を cases の行として返す"""
+    from js_to_txt_converter import parse_js_module
+
+    cases_dir = Path(cases_dir or CASES_DIR)
+    for path in sorted(cases_dir.rglob("*.js")):
+        if path.name == "index.js":
+            continue
+        content = path.read_text(encoding='utf-8')
+        if not content.strip():
+            continue
+        data = parse_js_module(content)
+        relative = path.relative_to(cases_dir)
+        updated = datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d")
+        # questionsAndAnswers が空でも空のレコードが1つ返るので、中身のあるものだけ数える
+        qa_count = sum(1 for qa in data['questionsAndAnswers'] if _has_content(qa))
+        yield (relative.with_suffix('').as_posix(), relative.parts[0] if len(relative.parts) > 1 else '',
+               data['title'] or None, data['citation'] or None, data['rank'] or None,
+               _dump(data['tags']), qa_count, len(data['quiz']), updated)
+
+
+# ---------------------------------------------------------------------------
+# SQL ファイル
+# ---------------------------------------------------------------------------
+
+def sql_literal(value):
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def iter_insert_statements(table, columns, rows, max_bytes=MAX_STATEMENT_BYTES):
+    """rows を max_bytes 以下の複数行 INSERT 文に分けて返す"""
+    head = f"INSERT INTO {table} ({', '.join(columns)}) VALUES\n".encode('utf-8')
+    values = []
+    size = len(head)
+    for row in rows:
+        value = ('(' + ', '.join(sql_literal(v) for v in row) + ')').encode('utf-8')
+        if len(head) + len(value) + 2 > max_bytes:
+            raise ValueError(f"{table}: 1行だけで {max_bytes} バイトを超えます ({row[:2]})")
+        # 区切りの ",\n" と末尾の ";\n" の分も数える
+        if values and size + len(value) + 2 > max_bytes:
+            yield head + b',\n'.join(values) + b';\n'
+            values = []
+            size = len(head)
+        values.append(value)
+        size += len(value) + 2
+    if values:
+        yield head + b',\n'.join(values) + b';\n'
+
+
+def write_sql_file(path, table, columns, rows, max_bytes=MAX_STATEMENT_BYTES):
+    """全件入れ直し用の SQL ファイルを書き出し、(文の数, 最大の文のバイト数, ファイルのバイト数) を返す"""
+    tmp_path = f"{path}.tmp"
+    statements = 0
+    largest = 0
+    with open(tmp_path, 'wb') as f:
+        f.write(f"DELETE FROM {table};\n".encode('utf-8'))
+        for statement in iter_insert_statements(table, columns, rows, max_bytes):
+            f.write(statement)
+            statements += 1
+            largest = max(largest, len(statement))
+    os.replace(tmp_path, path)
+    return statements, largest, os.path.getsize(path)
+
+
+# ---------------------------------------------------------------------------
+# ローカル SQLite
+# ---------------------------------------------------------------------------
+
+def create_database(db_path, schema_path=None):
+    conn = sqlite3.connect(db_path)
+    with open(schema_path or SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    return conn
+
+
+def load_table(conn, table, columns, rows):
+    """1トランザクションで表を入れ直し、件数を返す"""
+    placeholders = ', '.join('?' for _ in columns)
+    with conn:
+        conn.execute(f"DELETE FROM {table}")
+        cursor = conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+    return cursor.rowcount
+
+
+def check_sql_files(conn, sql_paths, schema_path=None):
+    """SQL ファイルを空の SQLite に流し込み、conn の内容と比べてエラーメッセージのリストを返す"""
+    errors = []
+    check = create_database(':memory:', schema_path)
+    try:
+        for table, path in sql_paths.items():
+            # 回答中の \r\n をそのまま比べるため、改行を変換せずに読む
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                check.executescript(f.read())
+            columns = ', '.join(TABLES[table])
+            query = f"SELECT {columns} FROM {table} ORDER BY {TABLES[table][0]}, {TABLES[table][1]}"
+            expected = conn.execute(query).fetchall()
+            loaded = check.execute(query).fetchall()
+            if loaded != expected:
+                errors.append(f"{table}: SQL ファイルの内容 ({len(loaded)}件) が "
+                              f"executemany の内容 ({len(expected)}件) と一致しません")
+    finally:
+        check.close()
+    return errors
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Q&Aバンクとケースのメタデータを D1 / SQLite に一括投入する")
+    parser.add_argument("--qa-dir", default=QA_DIR, help="Q&A JSONのフォルダ")
+    parser.add_argument("--cases-dir", default=CASES_DIR, help="ケースモジュールのフォルダ")
+    parser.add_argument("--schema", default=SCHEMA_PATH, help="テーブル定義 (schema.sql)")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="SQL ファイルとローカル SQLite の出力先")
+    parser.add_argument("--max-statement-bytes", type=int, default=MAX_STATEMENT_BYTES,
+                        help=f"INSERT 文1つの上限バイト数（既定: {MAX_STATEMENT_BYTES}）")
+    parser.add_argument("--check-sql", action="store_true",
+                        help="書き出した SQL ファイルを空の SQLite に流して内容を照合する")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    rows = {
+        "qa_questions": list(iter_qa_rows(args.qa_dir)),
+        "cases": list(iter_case_rows(args.cases_dir)),
+    }
+    print(f"📂 読み込み: Q&A {len(rows['qa_questions'])}問, ケース {len(rows['cases'])}件 "
+          f"({time.perf_counter() - start:.2f}s)")
+
+    sql_paths = {}
+    for table, table_rows in rows.items():
+        started = time.perf_counter()
+        path = out_dir / f"{table}.sql"
+        statements, largest, size = write_sql_file(path, table, TABLES[table], table_rows,
+                                                   args.max_statement_bytes)
+        sql_paths[table] = path
+        print(f"  📝 {path.name}: INSERT {statements}文, 最大 {largest / 1024:.1f} KB/文, "
+              f"計 {size / 1024:.1f} KB ({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+    db_path = out_dir / LOCAL_DB_NAME
+    conn = create_database(db_path, args.schema)
+    try:
+        for table, table_rows in rows.items():
+            started = time.perf_counter()
+            count = load_table(conn, table, TABLES[table], table_rows)
+            print(f"  ✅ {db_path.name} {table}: {count}件 ({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+        failed = False
+        if args.check_sql:
+            print("\n🔍 SQL ファイルを検証中...")
+            errors = check_sql_files(conn, sql_paths, args.schema)
+            for message in errors:
+                print(f"  ⚠️ {message}")
+            if not errors:
+                print("  ✅ OK")
+            failed = bool(errors)
+    finally:
+        conn.close()
+
+    print(f"\n✅ 完了 ({time.perf_counter() - start:.2f}s): {out_dir}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+一問一答テキストの文字コード判定
+
+ファイルはバイト列として1回だけ読み込み、BOM・UTF-8 として正しいバイト列か・
+Shift_JIS (cp932) / EUC-JP の2バイト文字としての整合性をバイト単位で調べて
+文字コードを決めてから、1回だけデコードする。
+判定結果は (パス, サイズ, 更新時刻) をキーにキャッシュする。
+"""
+
+import codecs
+import mmap
+import os
+import re
+
+# BOM は長いものから判定する（UTF-32LE の BOM は UTF-16LE の BOM を含む）
+_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# 各文字コードで正しい非ASCII文字のバイト列
+_UTF8_SEQ = re.compile(
+    rb'[\xc2-\xdf][\x80-\xbf]'
+    rb'|\xe0[\xa0-\xbf][\x80-\xbf]|[\xe1-\xec\xee\xef][\x80-\xbf]{2}|\xed[\x80-\x9f][\x80-\xbf]'
+    rb'|\xf0[\x90-\xbf][\x80-\xbf]{2}|[\xf1-\xf3][\x80-\xbf]{3}|\xf4[\x80-\x8f][\x80-\xbf]{2}'
+)
+_SJIS_SEQ = re.compile(rb'[\x81-\x9f\xe0-\xfc][\x40-\x7e\x80-\xfc]|[\xa1-\xdf]')
+_EUC_SEQ = re.compile(rb'\x8f[\xa1-\xfe]{2}|\x8e[\xa1-\xdf]|[\xa1-\xfe]{2}')
+_ASCII_BYTES = bytes(range(0x80))
+# 非ASCII文字を含み、かつ全体が UTF-8 として正しい行
+_UTF8_LINE = re.compile(
+    rb'(?m)^[\x00-\x09\x0b-\x7f]*(?:(?:' + _UTF8_SEQ.pattern + rb')[\x00-\x09\x0b-\x7f]*)+$'
+)
+
+# (パス, サイズ, 更新時刻) -> 文字コード
+_ENCODING_CACHE = {}
+
+
+def _count_high(raw):
+    """0x80 以上のバイト数"""
+    return len(raw.translate(None, _ASCII_BYTES))
+
+
+def _invalid_high_bytes(raw, seq_pattern):
+    """seq_pattern で説明できない 0x80 以上のバイト数"""
+    return _count_high(seq_pattern.sub(b'', raw))
+
+
+def _utf16_without_bom(raw):
+    """BOM なし UTF-16 を NUL バイトの位置から推定する
+
+    Shift_JIS / EUC-JP / UTF-8 の日本語テキストに NUL は現れないので、NUL があれば
+    UTF-16 とみなす。改行や数字などの ASCII 文字は LE なら奇数位置、BE なら偶数位置に
+    NUL を作るので、多い方を採る"""
+    sample = raw[:65536]
+    if len(sample) < 2 or b'\x00' not in sample:
+        return None
+    even = sample[0::2].count(0)
+    odd = sample[1::2].count(0)
+    return 'utf-16-le' if odd >= even else 'utf-16-be'
+
+
+def _new_stats():
+    return {'high': 0, 'utf8_invalid': 0, 'utf8_lines': 0, 'other_lines': 0,
+            'sjis_invalid': 0, 'euc_invalid': 0, 'sjis_chars': 0, 'sjis_kana': 0}
+
+
+def _add_stats(stats, chunk):
+    """改行位置で区切ったバイト列の統計を stats に加える"""
+    high = _count_high(chunk)
+    if not high:
+        return
+    stats['high'] += high
+    utf8_invalid = _invalid_high_bytes(chunk, _UTF8_SEQ)
+    stats['utf8_invalid'] += utf8_invalid
+    if utf8_invalid == 0:
+        stats['utf8_lines'] += 1
+        return
+
+    # UTF-8 として正しくない行がある。正しい行も混ざっているか（混在の判定用）
+    stats['other_lines'] += 1
+    if _UTF8_LINE.search(chunk):
+        stats['utf8_lines'] += 1
+
+    rest, matched = _SJIS_SEQ.subn(b'', chunk)
+    removed = len(chunk) - len(rest)
+    stats['sjis_invalid'] += _count_high(rest)
+    # 一致したのは2バイト文字 (2バイト) か半角カナ (1バイト)
+    stats['sjis_chars'] += matched
+    stats['sjis_kana'] += 2 * matched - removed
+    stats['euc_invalid'] += _invalid_high_bytes(chunk, _EUC_SEQ)
+
+
+def _decide(stats):
+    if stats['utf8_invalid'] == 0:
+        return 'utf-8'
+
+    # UTF-8 として正しい行とそうでない行が混在していれば、行単位で切り替える
+    if stats['utf8_lines'] and stats['other_lines']:
+        return 'mixed'
+
+    sjis_invalid = stats['sjis_invalid']
+    euc_invalid = stats['euc_invalid']
+    if sjis_invalid == 0 and euc_invalid == 0:
+        # EUC-JP の2バイト文字は Shift_JIS の半角カナ2文字としても読めてしまう。
+        # 半角カナばかりになるなら EUC-JP とみなす
+        kana = stats['sjis_kana']
+        return 'euc_jp' if kana > stats['sjis_chars'] - kana else 'cp932'
+    if euc_invalid < sjis_invalid:
+        return 'euc_jp'
+    return 'cp932'
+
+
+def _sniff_header(head):
+    """BOM と UTF-16 を先頭のバイト列だけで判定する"""
+    for bom, enc in _BOMS:
+        if head.startswith(bom):
+            return enc
+    return _utf16_without_bom(head)
+
+
+def sniff_encoding(raw):
+    """バイト列から文字コードを判定する
+
+    'utf-8', 'utf-8-sig', 'utf-16', 'utf-16-le', 'utf-16-be', 'utf-32',
+    'cp932', 'euc_jp' または 'mixed'（UTF-8 と cp932 の混在）を返す"""
+    enc = _sniff_header(raw[:65536])
+    if enc:
+        return enc
+    stats = _new_stats()
+    _add_stats(stats, raw)
+    return _decide(stats)
+
+
+def sniff_file_encoding(file_path, block_size=256 * 1024, max_blocks=16):
+    """ファイル全体を読み込まずに文字コードを判定する
+
+    ファイルをメモリマップし、改行位置で区切った block_size 程度のブロックごとに
+    統計を取る。block_size * max_blocks を超えるファイルは、先頭から末尾まで
+    等間隔に選んだ max_blocks 個のブロックで判定するので、巨大なファイルでも
+    判定時間とメモリ使用量は一定に保たれる"""
+    st = os.stat(file_path)
+    key = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+    enc = _ENCODING_CACHE.get(key)
+    if enc is not None:
+        return enc
+    if st.st_size == 0:
+        return 'utf-8'
+
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        enc = _sniff_header(mm[:65536])
+        if enc is None:
+            stats = _new_stats()
+            size = len(mm)
+            blocks = -(-size // block_size)
+            stride = max(1, blocks // max_blocks)
+            for index in range(0, blocks, stride):
+                start = index * block_size
+                if start:
+                    # 改行の直後から始めれば、どの文字コードでも文字の途中にならない
+                    nl = mm.find(b'\n', start, start + block_size)
+                    if nl == -1:
+                        continue
+                    start = nl + 1
+                end = min(start + block_size, size)
+                if end < size:
+                    nl = mm.rfind(b'\n', start, end)
+                    if nl != -1:
+                        end = nl + 1
+                _add_stats(stats, mm[start:end])
+            enc = _decide(stats)
+    _ENCODING_CACHE[key] = enc
+    return enc
+
+
+def _decode_mixed(raw):
+    """行単位で UTF-8 / cp932 を切り替えてデコードする"""
+    parts = []
+    for line in raw.splitlines(keepends=True):
+        if _invalid_high_bytes(line, _UTF8_SEQ) == 0:
+            parts.append(line.decode('utf-8'))
+        else:
+            parts.append(line.decode('cp932', errors='replace'))
+    return ''.join(parts)
+
+
+def decode_bytes(raw, encoding=None):
+    """バイト列を1回だけデコードして (テキスト, 文字コード) を返す
+
+    判定した文字コードで正しくデコードできないバイトは置換し、
+    その場合は文字コード名に '-replace' を付けて返す"""
+    enc = encoding or sniff_encoding(raw)
+    if enc == 'mixed':
+        return _decode_mixed(raw), enc
+    text = raw.decode(enc, errors='replace')
+    replaced = text.count('\ufffd')
+    if enc.startswith('utf-8'):
+        # 元から U+FFFD が書かれている分は置換ではない
+        replaced -= raw.count(b'\xef\xbf\xbd')
+    if replaced > 0:
+        return text, f'{enc}-replace'
+    return text, enc
+
+
+def read_text(file_path):
+    """ファイルを1回だけ読み込み、(テキスト, 文字コード) を返す"""
+    with open(file_path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        raw = f.read()
+    key = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+    enc = _ENCODING_CACHE.get(key)
+    if enc is None:
+        enc = sniff_encoding(raw)
+        _ENCODING_CACHE[key] = enc
+    return decode_bytes(raw, enc)
+
+
+# バイト列のまま \n で行に区切れる文字コード（\n が2バイト文字の途中に現れない）
+_LINE_SAFE = ('utf-8', 'utf-8-sig', 'cp932', 'euc_jp', 'mixed')
+
+
+def _split_lines(text):
+    return text.replace('\r\n', '\n').replace('\r', '\n').rstrip('\n').split('\n')
+
+
+def iter_lines(file_path, encoding=None, status=None):
+    """ファイルを少しずつデコードしながら1行ずつ返す（改行文字は含めない）
+
+    改行は \r\n / \r / \n のいずれも区切りとして扱う。文字コードを省略すると
+    sniff_file_encoding で判定する。ファイル全体をメモリに載せることはない。
+
+    大きなファイルの判定は一部のブロックだけで行うので、判定した文字コードで
+    デコードできない行があり得る。その行は UTF-8 / cp932 として正しければそちらで読み
+    （文字コードは 'mixed' になる）、どちらでもなければ置換して '-replace' を付ける。
+    status に辞書を渡すと、読み終えた時点の文字コード（decode_bytes と同じ表記）を
+    status['encoding'] に、置換した行数を status['replaced_lines'] に入れる"""
+    enc = encoding or sniff_file_encoding(file_path)
+    if status is None:
+        status = {}
+    status['encoding'] = enc
+    status['replaced_lines'] = 0
+
+    if enc not in _LINE_SAFE:
+        # UTF-16 / UTF-32 はテキストとして読み、置換された文字を数える
+        with open(file_path, 'r', encoding=enc, errors='replace', newline=None) as f:
+            for line in f:
+                if '\ufffd' in line:
+                    status['replaced_lines'] += 1
+                yield line.rstrip('\n')
+        if status['replaced_lines']:
+            status['encoding'] = f'{enc}-replace'
+        return
+
+    line_enc = 'utf-8' if enc == 'mixed' else enc
+    switched = enc == 'mixed'
+    with open(file_path, 'rb') as f:
+        for raw_line in f:
+            try:
+                text = raw_line.decode(line_enc)
+            except UnicodeDecodeError:
+                if _invalid_high_bytes(raw_line, _UTF8_SEQ) == 0:
+                    text = raw_line.decode('utf-8')
+                    switched = True
+                else:
+                    try:
+                        text = raw_line.decode('cp932')
+                        switched = True
+                    except UnicodeDecodeError:
+                        text = raw_line.decode('cp932' if enc == 'mixed' else line_enc, errors='replace')
+                        status['replaced_lines'] += 1
+            yield from _split_lines(text)
+
+    label = 'mixed' if switched else enc
+    status['encoding'] = f'{label}-replace' if status['replaced_lines'] else label
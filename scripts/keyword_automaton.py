@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Aho-Corasick 法による複数キーワードの一括検索
+
+キーワード辞書から一度だけオートマトンを構築し、テキストを1回走査するだけで
+すべてのキーワードの出現位置を列挙する。辞書が数千語になっても走査時間は
+テキスト長と一致件数にしか依存しない。
+"""
+
+from collections import deque
+
+
+class KeywordAutomaton:
+    """キーワード -> 付加データ の辞書から作る Aho-Corasick オートマトン"""
+
+    def __init__(self, keywords):
+        """keywords は (キーワード, 付加データ) の反復可能オブジェクト。
+        同じキーワードが複数回現れた場合は最初のものを使う"""
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self.size = 0
+
+        for keyword, payload in keywords:
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            if not self._out[state]:
+                self._out[state] = ((len(keyword), payload),)
+                self.size += 1
+
+        # 幅優先で失敗遷移を張り、失敗先の出力を引き継ぐ
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                fallback = self._goto[f].get(ch, 0)
+                self._fail[nxt] = fallback if fallback != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text):
+        """(開始位置, 終了位置, 付加データ) を終了位置順にすべて返す（重なりを含む）"""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            if nxt is None:
+                state = 0
+                continue
+            state = nxt
+            if out[state]:
+                end = i + 1
+                for length, payload in out[state]:
+                    matches.append((end - length, end, payload))
+        return matches
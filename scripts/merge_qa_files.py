@@ -3,24 +3,287 @@
 Q&Aサブカテゴリファイルを科目ごとに統合するスクリプト
 
 民法_1.json, 民法_2.json, ... → 民法.json に統合
+
+各サブカテゴリの問題番号はどれも "1" から始まるため、統合後のIDは
+qaLoader.js と同じ「サブカテゴリ-番号」形式 (例: "3-12") にする。
+convert_qa_files の出力のように既に "3-12" の形になっているIDはそのまま使う
+（data/qa-progress やクライアントが参照しているIDを変えない）。
+入力は1問ずつ読み込み、出力も1問ずつ書き出すので、メモリ使用量は
+最大の1問分（と重複検出用のハッシュ索引）に抑えられる。
+--compact のときは qa_output.write_qa_json と同じく全オブジェクトのキーを自然順に揃えるため、
+問題は1ファイル分ずつ IDの自然順に並べ替えてから書き出す（統合後のIDは "サブカテゴリ-" で
+始まり、ファイルはサブカテゴリ順に読むので、ファイルごとに並べれば全体も自然順になる）。
 """
 
+import argparse
+import hashlib
 import json
 import os
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+from qa_output import dumps_compact, dumps_pretty, finish_output, natural_key, print_size_report
+from run_metrics import NULL_METRICS, add_metrics_arguments, metrics_from_args
+
 # パス設定
 QA_DIR = Path(r"C:\Users\PC_User\Desktop\Atashinchi-study\public\data\qa")
 
-def merge_qa_files():
+
+class JsonObjectStream:
+    """JSONオブジェクトをファイルから少しずつ読むリーダー
+
+    iter_members() はメンバーのキーを1つずつ返す。呼び出し側はキーを受け取るたびに
+    read_value() か入れ子の iter_members() で値を読み進める"""
+
+    def __init__(self, fp, chunk_size=64 * 1024):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        # 読み終えた部分を捨ててから継ぎ足す
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf += chunk
+        return True
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("JSONが途中で終わっています")
+
+    def _expect(self, ch):
+        if self._peek() != ch:
+            raise ValueError(f"'{ch}' が必要な位置に '{self._peek()}' があります")
+        self._pos += 1
+
+    def read_value(self):
+        """次の値を1つ読んで返す"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # 数値などはバッファ末尾で切れている可能性があるので読み足して確かめる
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def iter_members(self):
+        """オブジェクトのキーを順に返す"""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(':')
+            yield key
+            ch = self._peek()
+            self._pos += 1
+            if ch == '}':
+                return
+            if ch != ',':
+                raise ValueError(f"',' または '}}' が必要な位置に '{ch}' があります")
+
+
+def _read_header(file_path):
+    """questions 以外のフィールドを読む（questions に達したら読むのをやめる）"""
+    header = {}
+    with open(file_path, 'r', encoding='utf-8') as f:
+        stream = JsonObjectStream(f)
+        for key in stream.iter_members():
+            if key == 'questions':
+                break
+            header[key] = stream.read_value()
+    return header
+
+
+def _iter_questions(file_path):
+    """questions の (ID, 問題) を1問ずつ返す"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        stream = JsonObjectStream(f)
+        for key in stream.iter_members():
+            if key != 'questions':
+                stream.read_value()
+                continue
+            for qid in stream.iter_members():
+                yield qid, stream.read_value()
+
+
+class _BankWriter:
+    """統合ファイルを1メンバーずつ書き出す
+
+    json.dump(indent=2) と同じ書式か、compact なら最小化JSONで書く。
+    どちらの場合も整形版のバイト数を pretty_size に数える"""
+
+    def __init__(self, out, compact=False):
+        self._out = out
+        self._compact = compact
+        self._counts = []
+        self.pretty_size = 0
+
+    def _emit(self, compact_text, pretty_text):
+        self.pretty_size += len(pretty_text.encode('utf-8'))
+        self._out.write(compact_text if self._compact else pretty_text)
+
+    def _key(self, key):
+        first = self._counts[-1] == 0
+        self._counts[-1] += 1
+        text = json.dumps(key, ensure_ascii=False)
+        self._emit(('' if first else ',') + text + ':',
+                   ('\n' if first else ',\n') + '  ' * len(self._counts) + text + ': ')
+
+    def begin_object(self, key=None):
+        if key is not None:
+            self._key(key)
+        self._emit('{', '{')
+        self._counts.append(0)
+
+    def member(self, key, value):
+        self._key(key)
+        pretty = dumps_pretty(value).replace('\n', '\n' + '  ' * len(self._counts))
+        # dumps_compact は値の中の全オブジェクトを canonicalize する
+        self._emit(dumps_compact(value) if self._compact else pretty, pretty)
+
+    def end_object(self):
+        count = self._counts.pop()
+        self._emit('}', '\n' + '  ' * len(self._counts) + '}' if count else '}')
+
+
+def _content_key(qa):
+    """内容の同一性判定用のハッシュ"""
+    text = f"{qa.get('question', '')}\0{qa.get('answer', '')}"
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+
+def merged_question_id(subcategory_id, qid):
+    """統合後のID（番号だけのIDにはサブカテゴリを付け、既に "サブカテゴリ-" で始まるものはそのまま）"""
+    qid = str(qid)
+    if qid.startswith(f"{subcategory_id}-"):
+        return qid
+    return f"{subcategory_id}-{qid}"
+
+
+def merge_subject(subject, files, output_path, compact=False, metrics=NULL_METRICS):
+    """1科目分を統合して書き出し、統計を返す
+
+    files は (サブカテゴリ番号, パス) のリスト。IDが衝突した問題は "_2" などを
+    付けて残し、同じ内容の問題は重複として報告する。
+    compact なら全体を canonicalize した最小化JSONと .gz / .br を書き出す。
+    metrics には header / merge（うち read）/ finish の時間と件数を記録する"""
+    subcategories = {}
+    with metrics.stage('header'):
+        for subcategory_id, file_path in files:
+            header = _read_header(file_path)
+            subcategories.update(header.get('subcategories', {}))
+
+    header = {
+        "subject": subject,
+        "version": "1.0",
+        "lastUpdated": datetime.now().strftime("%Y-%m-%d"),
+        "subcategories": subcategories,
+    }
+
+    id_index = {}        # 統合後ID -> (ファイル名, 元のID)
+    content_index = {}   # 内容ハッシュ -> 統合後ID
+    collisions = []
+    duplicates = []
+    errors = []
+    count = 0
+
+    keys = list(header) + ['questions']
+    if compact:
+        keys.sort(key=natural_key)
+
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with metrics.stage('merge'), open(tmp_path, 'w', encoding='utf-8') as out:
+        writer = _BankWriter(out, compact)
+        writer.begin_object()
+        for key in keys:
+            if key != 'questions':
+                writer.member(key, header[key])
+                continue
+
+            writer.begin_object('questions')
+            for subcategory_id, file_path in files:
+                print(f"  📖 読み込み中: {file_path.name}")
+                pending = []
+                metrics.count('files')
+                metrics.count('bytes_in', os.path.getsize(file_path))
+                try:
+                    for qid, qa in metrics.timed_iter(_iter_questions(file_path), 'read'):
+                        merged_id = merged_question_id(subcategory_id, qid)
+                        if merged_id in id_index:
+                            suffix = 2
+                            while f"{merged_id}_{suffix}" in id_index:
+                                suffix += 1
+                            renamed = f"{merged_id}_{suffix}"
+                            collisions.append((merged_id, id_index[merged_id], (file_path.name, qid), renamed))
+                            merged_id = renamed
+                        id_index[merged_id] = (file_path.name, qid)
+
+                        digest = _content_key(qa)
+                        if digest in content_index:
+                            duplicates.append((merged_id, content_index[digest]))
+                        else:
+                            content_index[digest] = merged_id
+
+                        if compact:
+                            pending.append((merged_id, qa))
+                        else:
+                            writer.member(merged_id, qa)
+                        count += 1
+                except Exception as e:
+                    errors.append((file_path.name, str(e)))
+                    print(f"    ⚠️ エラー: {e}")
+                pending.sort(key=lambda item: natural_key(item[0]))
+                for merged_id, qa in pending:
+                    writer.member(merged_id, qa)
+            writer.end_object()
+        writer.end_object()
+    os.replace(tmp_path, output_path)
+
+    with metrics.stage('finish'):
+        size = finish_output(str(output_path), writer.pretty_size, compact)
+    metrics.count('questions', count)
+    metrics.count('bytes_out', size['written'])
+    return {
+        "questions": count,
+        "collisions": collisions,
+        "duplicates": duplicates,
+        "errors": errors,
+        "size": size,
+    }
+
+
+def merge_qa_files(qa_dir=None, compact=False, metrics=NULL_METRICS):
     """サブカテゴリファイルを科目ごとに統合"""
-    
+    qa_dir = Path(qa_dir or QA_DIR)
+
     # 科目ごとにファイルをグループ化
     subject_files = defaultdict(list)
-    
-    for file in QA_DIR.glob("*_*.json"):
+
+    for file in qa_dir.glob("*_*.json"):
         # ファイル名から科目名を抽出（例: 民法_1.json → 民法）
         name = file.stem  # 民法_1
         parts = name.rsplit('_', 1)
@@ -28,58 +291,49 @@ def merge_qa_files():
             subject = parts[0]  # 民法
             subcategory_id = parts[1]  # 1
             subject_files[subject].append((int(subcategory_id), file))
-    
+
     print(f"📂 検出された科目: {list(subject_files.keys())}")
-    
+
+    results = {}
     for subject, files in subject_files.items():
         # サブカテゴリ番号でソート
         files.sort(key=lambda x: x[0])
-        
+
         print(f"\n📚 {subject} を統合中...")
-        
-        # 統合データの初期化
-        merged_data = {
-            "subject": subject,
-            "version": "1.0",
-            "lastUpdated": datetime.now().strftime("%Y-%m-%d"),
-            "subcategories": {},
-            "questions": {}
-        }
-        
-        for subcategory_id, file_path in files:
-            print(f"  📖 読み込み中: {file_path.name}")
-            
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # サブカテゴリ情報を追加
-                if 'subcategories' in data:
-                    merged_data['subcategories'].update(data['subcategories'])
-                
-                # 質問を追加
-                if 'questions' in data:
-                    for qid, qa in data['questions'].items():
-                        merged_data['questions'][qid] = qa
-                        
-            except Exception as e:
-                print(f"    ⚠️ エラー: {e}")
-        
-        # 統合ファイルを保存
-        output_path = QA_DIR / f"{subject}.json"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(merged_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"  ✅ 保存完了: {output_path.name} ({len(merged_data['questions'])}問)")
+
+        output_path = qa_dir / f"{subject}.json"
+        result = merge_subject(subject, [(str(n), path) for n, path in files], output_path, compact, metrics)
+        results[subject] = result
+
+        for merged_id, (first_file, first_id), (file_name, qid), renamed in result['collisions']:
+            print(f"    ⚠️ ID衝突: {merged_id} ({first_file} #{first_id} と {file_name} #{qid}) → {renamed}")
+        for merged_id, original_id in result['duplicates']:
+            print(f"    🔁 同一内容: {merged_id} = {original_id}")
+
+        print(f"  ✅ 保存完了: {output_path.name} ({result['questions']}問, "
+              f"ID衝突 {len(result['collisions'])}件, 同一内容 {len(result['duplicates'])}件)")
+
+    print_size_report([result['size'] for result in results.values()])
+    return results
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Q&Aサブカテゴリファイルを科目ごとに統合する")
+    parser.add_argument("--qa-dir", default=QA_DIR, help="Q&A JSONのフォルダ")
+    parser.add_argument("--compact", action="store_true",
+                        help="キー順を揃えた最小化JSONと .gz / .br を書き出す")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    metrics = metrics_from_args('merge_qa_files', args)
+
     print("=" * 50)
     print("Q&Aファイル統合スクリプト")
     print("=" * 50)
-    
-    merge_qa_files()
-    
+
+    merge_qa_files(args.qa_dir, args.compact, metrics)
+    if metrics.enabled:
+        metrics.finish(args.metrics_out)
+
     print("\n" + "=" * 50)
     print("✅ 統合完了！")
     print("=" * 50)
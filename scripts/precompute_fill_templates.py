@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+穴埋めドリルのテンプレートを一括で事前生成するスクリプト
+
+public/data/qa の全問題について、Lv1 / Lv2 / Lv3 のテンプレート
+（data/qa-progress の fillDrill.templates と同じ {text, blanks: [{id, label, answer}]}）を作り、
+data/fill-templates.json に書き出す。
+
+    Lv1 : 回答に少なめの空欄（約150文字に1つ、1〜4個）
+    Lv2 : 回答に多めの空欄（約60文字に1つ、2〜10個）
+    Lv3 : 問題文 + 回答全体を1つの記述欄にしたもの
+Lv1 / Lv2 の空欄は convert_qa_files.add_blanks_to_answer_disabled（カギ括弧 → 用語辞書 →
+番号付き項目）で選ぶ。判例の年月日（最判昭45.6.24 など）を含む語は空欄にしない。
+番号付き項目は番号を除いて最初の読点・句点・括弧の手前までとし、20文字を超えるものは空欄にしない
+（「②証拠の収集保全を指す。」のように文ごと空欄になるのを避ける）。
+回答に既に {{ }} があるときは、その空欄をそのまま使う。空欄を1つも作れなかったレベルと、
+候補が少なく Lv1 と同じになった Lv2 は書き出さない（サーバーはそのレベルだけAIで生成する）。
+
+テンプレートは「問題文 + 回答」の SHA-1 をキーにして保存する。前回の出力を読み込み、
+キーが同じ問題は作り直さない（用語辞書か生成方法が変わったときだけ全件作り直す）。
+同じ文面の問題はテンプレートを共有する。
+
+server.js の /api/qa-fill/generate は、再生成 (forceRefresh) でなく参考資料 (referenceMaterial) も
+無ければ同じキーでこのファイルを引き、見つかればAIを呼ばずにそのテンプレートを返す。
+
+使い方:
+    python scripts/precompute_fill_templates.py          # 変わった問題だけ生成する
+    python scripts/precompute_fill_templates.py --force  # 全件作り直す
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from convert_qa_files import BLANK_TERMS_DIR, add_blanks_to_answer_disabled  # noqa: E402
+from shard_qa_banks import QA_DIR, find_banks, iter_bank_questions  # noqa: E402
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+OUTPUT_PATH = ROOT / "data" / "fill-templates.json"
+TEMPLATES_FORMAT = 1
+# テンプレートの作り方を変えたら上げる（全件作り直しになる）
+GENERATOR_VERSION = 2
+
+# レベル: (何文字に1つ空欄にするか, 最少, 最多)
+BLANK_LEVELS = {
+    1: (150, 1, 4),
+    2: (60, 2, 10),
+}
+ESSAY_LEVEL = 3
+# 番号付き項目（①〜③）を空欄にするときの最大文字数
+NUMBERED_BLANK_MAX = 20
+
+# 判例の引用（最決平10.12.18, 最大判昭50.4.30, 大判大5.6.1 など）。番号付き項目は40文字で
+# 切れて日付が途中で終わることがあるので、裁判所の略称か元号+数字があれば除く
+CASE_DATE_PATTERN = re.compile(r'(?:最高?裁?|最?大|高|地)[判決]|[明大昭平令][治正和成]?(?:元|\d+)[.．・年]\d')
+# server.js と同じ空欄の取り出し方
+BLANK_PATTERN = re.compile(r'\{\{([^}]+)\}\}')
+
+
+def content_key(question, answer):
+    """server.js と同じ「問題文 \\0 回答」の SHA-1"""
+    return hashlib.sha1(f"{question or ''}\0{answer or ''}".encode('utf-8')).hexdigest()
+
+
+def generator_fingerprint(terms_dir=None):
+    """生成結果を左右するもの（生成方法の版・レベル設定・用語辞書）のハッシュ"""
+    h = hashlib.sha1(repr((GENERATOR_VERSION, sorted(BLANK_LEVELS.items()), NUMBERED_BLANK_MAX)).encode('utf-8'))
+    for path in sorted(Path(terms_dir or BLANK_TERMS_DIR).glob("*.txt")):
+        h.update(path.name.encode('utf-8'))
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def make_template(text):
+    blanks = []
+    for n, match in enumerate(BLANK_PATTERN.finditer(text), 1):
+        blanks.append({"id": f"B{n}", "label": f"({n})", "answer": match.group(1).strip()})
+    return {"text": text, "blanks": blanks}
+
+
+def build_templates(question, answer):
+    """1問分の {レベル: テンプレート}"""
+    templates = {}
+    for level, (chars, low, high) in BLANK_LEVELS.items():
+        count = min(high, max(low, len(answer) // chars))
+        template = make_template(add_blanks_to_answer_disabled(answer, question, max_blanks=count,
+                                                               exclude=CASE_DATE_PATTERN,
+                                                               max_numbered_length=NUMBERED_BLANK_MAX))
+        # 前のレベルと同じになったら書き出さない（AIで作った方が練習になる）
+        if template['blanks'] and template not in templates.values():
+            templates[str(level)] = template
+    # 記述欄の中に } があると空欄の区切りと紛れるので全角にする
+    plain = answer.replace('{{', '').replace('}}', '').replace('}', '｝').strip()
+    templates[str(ESSAY_LEVEL)] = make_template(f"{question}\n{{{{{plain}}}}}" if question else f"{{{{{plain}}}}}")
+    return templates
+
+
+def load_previous(path, fingerprint):
+    """前回の出力のテンプレート（生成方法か用語辞書が変わっていれば空）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('format') != TEMPLATES_FORMAT or data.get('generator') != fingerprint:
+        return {}
+    return data.get('templates', {})
+
+
+def precompute(qa_dir=None, previous=None):
+    """({問題ID: キー}, {キー: テンプレート}, 統計) を返す"""
+    previous = previous or {}
+    questions = {}
+    templates = {}
+    stats = {"questions": 0, "generated": 0, "reused": 0, "shared": 0, "empty": 0}
+    for subject, files in find_banks(qa_dir or QA_DIR).items():
+        for qid, qa, _, _, _ in iter_bank_questions(files):
+            stats['questions'] += 1
+            question = qa.get('question') or ''
+            answer = qa.get('answer') or ''
+            if not answer.strip():
+                # server.js は回答が空のとき専用の表示を返すので作らない
+                stats['empty'] += 1
+                continue
+            key = content_key(question, answer)
+            questions[f"{subject}/{qid}"] = key
+            if key in templates:
+                stats['shared'] += 1
+            elif key in previous:
+                templates[key] = previous[key]
+                stats['reused'] += 1
+            else:
+                templates[key] = build_templates(question, answer)
+                stats['generated'] += 1
+    return questions, templates, stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="穴埋めドリルのテンプレートを一括で事前生成する")
+    parser.add_argument("--qa-dir", default=QA_DIR, help="Q&A JSONのフォルダ")
+    parser.add_argument("--out", default=OUTPUT_PATH, help="テンプレートの JSON")
+    parser.add_argument("--force", action="store_true", help="前回の結果を使わず全件作り直す")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    fingerprint = generator_fingerprint()
+    previous = {} if args.force else load_previous(args.out, fingerprint)
+
+    questions, templates, stats = precompute(args.qa_dir, previous)
+    dropped = len(set(previous) - set(templates))
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{out}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "format": TEMPLATES_FORMAT,
+            "generator": fingerprint,
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "levels": [str(level) for level in (*BLANK_LEVELS, ESSAY_LEVEL)],
+            "questions": questions,
+            "templates": templates,
+        }, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, out)
+
+    blanks = sum(len(t['blanks']) for entry in templates.values() for t in entry.values())
+    print(f"✅ {stats['questions']}問: 生成 {stats['generated']}, 再利用 {stats['reused']}, "
+          f"同一文面 {stats['shared']}, 回答なし {stats['empty']}"
+          + (f", 削除 {dropped}" if dropped else ""))
+    levels = sum(len(entry) for entry in templates.values())
+    print(f"📝 {out}: {len(templates)}問 {levels}レベル分, 空欄 {blanks}個, "
+          f"{os.path.getsize(out) / 1024:.1f} KB ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+public/data/qa に書き出すQ&A JSONの共通出力処理
+
+通常は従来どおり indent=2 で書き出す。compact=True のときは
+・キーを自然順 ("1-2" < "1-10") に並べ替えた最小化JSON
+・その .gz / .br（静的配信用の事前圧縮ファイル）
+を書き出し、整形版と比べたサイズを記録する。
+"""
+
+import gzip
+import json
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # brotli が無ければ .br は作らない
+    brotli = None
+
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+_DIGITS = re.compile(r'(\d+)')
+_CHUNK_SIZE = 64 * 1024
+
+
+def natural_key(key):
+    """数字部分を数値として比べるソートキー"""
+    return tuple((0, int(part), '') if part.isdigit() else (1, 0, part)
+                 for part in _DIGITS.split(str(key)) if part)
+
+
+def canonicalize(value):
+    """オブジェクトのキーを自然順に並べ替えた値を返す"""
+    if isinstance(value, dict):
+        return {k: canonicalize(value[k]) for k in sorted(value, key=natural_key)}
+    if isinstance(value, list):
+        return [canonicalize(v) for v in value]
+    return value
+
+
+def dumps_pretty(value):
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def dumps_compact(value):
+    return json.dumps(canonicalize(value), ensure_ascii=False, separators=(',', ':'))
+
+
+def _replace_atomic(path, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _gzip_file(src_path, dst_path):
+    def write(out):
+        # mtime=0 にして、同じ内容なら同じ .gz になるようにする
+        with open(src_path, 'rb') as src, \
+                gzip.GzipFile(filename='', mode='wb', fileobj=out, compresslevel=9, mtime=0) as gz:
+            for chunk in iter(lambda: src.read(_CHUNK_SIZE), b''):
+                gz.write(chunk)
+    _replace_atomic(dst_path, write)
+
+
+def _brotli_file(src_path, dst_path):
+    def write(out):
+        compressor = brotli.Compressor(quality=11)
+        with open(src_path, 'rb') as src:
+            for chunk in iter(lambda: src.read(_CHUNK_SIZE), b''):
+                out.write(compressor.process(chunk))
+        out.write(compressor.finish())
+    _replace_atomic(dst_path, write)
+
+
+def remove_compressed(path):
+    """古い .gz / .br が残っていると整形版と食い違うので削除する"""
+    for suffix in COMPRESSED_SUFFIXES:
+        sibling = f"{path}{suffix}"
+        if os.path.exists(sibling):
+            os.remove(sibling)
+
+
+def precompress(path):
+    """path の .gz と（brotli があれば）.br を作り、{拡張子: サイズ} を返す"""
+    sizes = {}
+    _gzip_file(path, f"{path}.gz")
+    sizes['.gz'] = os.path.getsize(f"{path}.gz")
+    if brotli is not None:
+        _brotli_file(path, f"{path}.br")
+        sizes['.br'] = os.path.getsize(f"{path}.br")
+    elif os.path.exists(f"{path}.br"):
+        os.remove(f"{path}.br")
+    return sizes
+
+
+def finish_output(path, pretty_size, compact):
+    """書き出し済みの path を仕上げて、サイズ記録を返す
+
+    compact なら事前圧縮ファイルを作り、そうでなければ古いものを消す"""
+    record = {
+        "file": os.path.basename(path),
+        "pretty": pretty_size,
+        "written": os.path.getsize(path),
+        ".gz": None,
+        ".br": None,
+    }
+    if compact:
+        record.update(precompress(path))
+    else:
+        remove_compressed(path)
+    return record
+
+
+def write_qa_json(data, path, compact=False):
+    """Q&A JSONを書き出し、サイズ記録を返す"""
+    pretty = dumps_pretty(data)
+    text = dumps_compact(data) if compact else pretty
+    _replace_atomic(path, lambda f: f.write(text.encode('utf-8')))
+    return finish_output(path, len(pretty.encode('utf-8')), compact)
+
+
+def _format_size(size):
+    return '-' if size is None else f"{size / 1024:8.1f} KB"
+
+
+def print_size_report(records):
+    """ファイルごとの整形版・出力・.gz・.br のサイズを表示する"""
+    if not records:
+        return
+    print("\n=== Size report ===")
+    print(f"  {'file':<24} {'indent=2':>11} {'written':>11} {'.gz':>11} {'.br':>11}")
+    totals = {"pretty": 0, "written": 0, ".gz": 0, ".br": 0}
+    for record in records:
+        print(f"  {record['file']:<24} {_format_size(record['pretty']):>11} "
+              f"{_format_size(record['written']):>11} {_format_size(record['.gz']):>11} "
+              f"{_format_size(record['.br']):>11}")
+        for key in totals:
+            totals[key] += record[key] or 0
+    has = {key: any(r[key] is not None for r in records) for key in ('.gz', '.br')}
+    print(f"  {'total':<24} {_format_size(totals['pretty']):>11} {_format_size(totals['written']):>11} "
+          f"{_format_size(totals['.gz'] if has['.gz'] else None):>11} "
+          f"{_format_size(totals['.br'] if has['.br'] else None):>11}")
+    if has['.gz'] and totals['pretty']:
+        smallest = min(v for k, v in totals.items() if k != 'pretty' and (k not in has or has[k]))
+        print(f"  転送量: {totals['pretty'] / 1024:.1f} KB → {smallest / 1024:.1f} KB "
+              f"({smallest / totals['pretty'] * 100:.1f}%)")
+    if any(r['.gz'] is not None for r in records) and brotli is None:
+        print("  ※ brotli モジュールが無いため .br は作成していません (pip install brotli)")
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+data/qa-progress の穴埋めドリル進捗を1つの SQLite ファイルにまとめるスクリプト
+
+data/qa-progress/*.json → data/qa-progress.sqlite
+
+進捗ファイルには2つの形がある。
+・qaProgressStore.js の形: {"version": 1, "relativePath": ..., "updatedAt": ..., "qa": {ID: 進捗}}
+  （ファイル名は relativePath の "/" を "__" にしたもの。qa-standalone__民法__1-1.json など）
+・server.js の /api/qa-progress/save の形: [{"id": ..., "fillDrill": ..., ...}, ...]
+  （ファイル名は relativePath の "/" を "_" にしたもの。qa-standalone_民法_1-1.json など）
+
+どちらも1問ごとの行 (progress) に分ける。容量の大半を占める fillDrill.templates は
+テンプレートごとに generatedAt などが違うので丸ごとでは重ならない。そこで
+・ファイルごとの情報（qaId, moduleId, moduleTitle, relativePath, generatedAt, isStandalone）は行に残し、
+・中身はハッシュをキーにした templates テーブルに1回だけ保存する。レベルやファイルをまたいで
+  同じになる question・canonicalAnswer・canonicalBlanks はそれぞれ別の値とし、
+  残り（blanks, inlineBody, text, sections など）はテンプレートごとに1つの値にまとめる。
+行には問題ID・状態・最終更新日・テンプレートの項目の並びとハッシュを列として持たせ、
+残り（attempts など）は最小化JSONで持つ。
+テンプレートの値と行の JSON 本体は zlib で圧縮して BLOB に入れる（標準ライブラリだけで読める）。
+
+--export を付けると、元と同じファイル名・同じ形・同じバイト列の JSON に書き戻す
+（qaProgressStore.js も server.js もそのまま読める）。
+
+使い方:
+    python scripts/qa_progress_store.py                    # 取り込み → 照合 → 容量と読み込み時間を表示
+    python scripts/qa_progress_store.py --verify-only      # 既存のDBを照合して表示するだけ
+    python scripts/qa_progress_store.py --export 出力先     # DBから JSON に書き戻す
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+ROOT = Path(__file__).resolve().parent.parent
+PROGRESS_DIR = ROOT / "data" / "qa-progress"
+DB_PATH = ROOT / "data" / "qa-progress.sqlite"
+
+SCHEMA_VERSION = 2
+SHAPE_DOC = 'doc'
+SHAPE_LIST = 'list'
+
+# テンプレートのうちファイルごとに違う情報（templates テーブルには入れず行に残す）
+TEMPLATE_METADATA_KEYS = frozenset(
+    ('qaId', 'moduleId', 'moduleTitle', 'relativePath', 'generatedAt', 'isStandalone'))
+# レベルやファイルをまたいで同じ値になる中身（テンプレートの残りとは別に1件ずつ保存する）
+TEMPLATE_SHARED_KEYS = frozenset(('question', 'canonicalAnswer', 'canonicalBlanks'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    shape TEXT NOT NULL,
+    relative_path TEXT,
+    head TEXT
+);
+CREATE TABLE IF NOT EXISTS templates (
+    hash TEXT PRIMARY KEY,
+    body BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS progress (
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    position INTEGER NOT NULL,
+    qa_id TEXT,
+    status TEXT,
+    last_updated TEXT,
+    template_refs TEXT,
+    body BLOB NOT NULL,
+    PRIMARY KEY (file_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS progress_qa_id ON progress (qa_id);
+"""
+
+
+def _dump(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _dumps_file(data):
+    """qaProgressStore.js / server.js と同じ JSON.stringify(data, null, 2) 相当"""
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def _pack(text):
+    return zlib.compress(text.encode('utf-8'), 9)
+
+
+def _unpack(blob):
+    return zlib.decompress(blob).decode('utf-8')
+
+
+def template_hash(body):
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()
+
+
+def _relative_path(name, data):
+    if isinstance(data, dict) and data.get('relativePath'):
+        return data['relativePath']
+    return Path(name).stem
+
+
+def split_progress(file_name, data):
+    """1ファイル分の JSON を (shape, head, [(qa_id, 進捗)]) に分ける
+
+    head は qa を空にした文書（キーの順序を保つため丸ごと持つ）"""
+    if isinstance(data, list):
+        return SHAPE_LIST, None, [(str(item.get('id', '')) if isinstance(item, dict) else None, item)
+                                  for item in data]
+    if isinstance(data, dict) and isinstance(data.get('qa'), dict):
+        head = dict(data)
+        head['qa'] = {}
+        return SHAPE_DOC, head, list(data['qa'].items())
+    raise ValueError(f"{file_name}: 進捗ファイルの形式ではありません")
+
+
+def _store_value(values, value):
+    body = _dump(value)
+    digest = template_hash(body)
+    values[digest] = body
+    return digest
+
+
+def _extract_templates(item):
+    """fillDrill.templates の中身を取り出した進捗と、(テンプレートの参照, {ハッシュ: 値}) を返す
+
+    進捗にはレベルごとにファイルごとの情報だけを残す。参照は {レベル: {"content": ハッシュ, "keys": [...]}} で、
+    keys は元のキーの順に、共通の中身なら [キー, ハッシュ]、それ以外はキーだけ
+    （ファイルごとの情報なら進捗から、残りは content から戻す）"""
+    fill_drill = item.get('fillDrill') if isinstance(item, dict) else None
+    templates = fill_drill.get('templates') if isinstance(fill_drill, dict) else None
+    if not isinstance(templates, dict):
+        return item, {}, {}
+    refs = {}
+    values = {}
+    slim_templates = {}
+    for level, template in templates.items():
+        if not isinstance(template, dict):
+            slim_templates[level] = template
+            continue
+        keys = []
+        metadata = {}
+        content = {}
+        for key, value in template.items():
+            if key in TEMPLATE_SHARED_KEYS:
+                keys.append([key, _store_value(values, value)])
+                continue
+            (metadata if key in TEMPLATE_METADATA_KEYS else content)[key] = value
+            keys.append(key)
+        refs[level] = {"content": _store_value(values, content), "keys": keys}
+        slim_templates[level] = metadata
+    slim = dict(item)
+    slim['fillDrill'] = dict(fill_drill, templates=slim_templates)
+    return slim, refs, values
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def migrate(progress_dir=None, db_path=None):
+    """進捗 JSON をすべて DB に取り込み、統計を返す（DB は作り直す）"""
+    progress_dir = Path(progress_dir or PROGRESS_DIR)
+    db_path = Path(db_path or DB_PATH)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = Path(f"{db_path}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    stats = {"files": 0, "questions": 0, "templates": 0, "values": 0, "value_bytes": 0,
+             "unique_values": 0, "unique_value_bytes": 0, "skipped": []}
+    conn = connect(tmp_path)
+    try:
+        with conn:
+            conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            for path in sorted(progress_dir.glob("*.json")):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    shape, head, items = split_progress(path.name, data)
+                except ValueError as e:
+                    stats['skipped'].append((path.name, str(e)))
+                    continue
+
+                cursor = conn.execute(
+                    "INSERT INTO files (name, shape, relative_path, head) VALUES (?, ?, ?, ?)",
+                    (path.name, shape, _relative_path(path.name, data),
+                     _dump(head) if head is not None else None))
+                file_id = cursor.lastrowid
+                rows = []
+                for position, (qa_id, item) in enumerate(items):
+                    slim, refs, values = _extract_templates(item)
+                    stats['templates'] += len(refs)
+                    for ref in refs.values():
+                        for digest in [ref['content']] + [key[1] for key in ref['keys'] if isinstance(key, list)]:
+                            stats['values'] += 1
+                            stats['value_bytes'] += len(values[digest].encode('utf-8'))
+                    conn.executemany("INSERT OR IGNORE INTO templates VALUES (?, ?)",
+                                     [(digest, _pack(body)) for digest, body in values.items()])
+                    is_dict = isinstance(item, dict)
+                    rows.append((
+                        file_id, position, qa_id,
+                        item.get('status') if is_dict else None,
+                        item.get('lastUpdated') if is_dict else None,
+                        _dump(refs) if refs else None,
+                        _pack(_dump(slim)),
+                    ))
+                conn.executemany("INSERT INTO progress VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                stats['files'] += 1
+                stats['questions'] += len(rows)
+            stats['unique_values'] = conn.execute("SELECT COUNT(*) FROM templates").fetchone()[0]
+            stats['unique_value_bytes'] = sum(
+                len(zlib.decompress(body)) for (body,) in conn.execute("SELECT body FROM templates"))
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return stats
+
+
+def _restore_item(body, template_refs, values):
+    item = json.loads(_unpack(body))
+    if template_refs:
+        slim_templates = item['fillDrill']['templates']
+        for level, ref in json.loads(template_refs).items():
+            metadata = slim_templates[level]
+            content = json.loads(values[ref['content']])
+            template = {}
+            for key in ref['keys']:
+                if isinstance(key, list):
+                    template[key[0]] = json.loads(values[key[1]])
+                else:
+                    template[key] = metadata[key] if key in metadata else content[key]
+            slim_templates[level] = template
+    return item
+
+
+def load_all(db_path=None):
+    """DB からすべての進捗を読み、{ファイル名: 元の JSON と同じ値} を返す"""
+    conn = sqlite3.connect(db_path or DB_PATH)
+    try:
+        # 値は共有されるので展開は1回だけにし、行ごとに JSON から作り直す（呼び出し側で書き換えても影響しない）
+        values = {digest: _unpack(body) for digest, body in conn.execute("SELECT hash, body FROM templates")}
+        files = {}
+        for file_id, name, shape, head in conn.execute("SELECT id, name, shape, head FROM files ORDER BY id"):
+            files[file_id] = (name, shape, json.loads(head) if head is not None else [])
+        for file_id, qa_id, body, template_refs in conn.execute(
+                "SELECT file_id, qa_id, body, template_refs FROM progress ORDER BY file_id, position"):
+            _, shape, data = files[file_id]
+            item = _restore_item(body, template_refs, values)
+            if shape == SHAPE_DOC:
+                data['qa'][qa_id] = item
+            else:
+                data.append(item)
+    finally:
+        conn.close()
+    return {name: data for name, _, data in files.values()}
+
+
+def export(db_path=None, out_dir=None):
+    """DB の進捗を元のファイル名・形の JSON に書き戻し、ファイル数を返す"""
+    out_dir = Path(out_dir or PROGRESS_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    documents = load_all(db_path)
+    for name, data in documents.items():
+        path = out_dir / name
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(_dumps_file(data))
+        os.replace(tmp_path, path)
+    return len(documents)
+
+
+def verify(progress_dir=None, db_path=None):
+    """DB から書き戻した JSON を元のファイルとバイト単位で照合し、エラーメッセージのリストを返す"""
+    progress_dir = Path(progress_dir or PROGRESS_DIR)
+    documents = load_all(db_path)
+    errors = []
+    for path in sorted(progress_dir.glob("*.json")):
+        data = documents.pop(path.name, None)
+        if data is None:
+            errors.append(f"{path.name}: DB にありません")
+        elif _dumps_file(data).encode('utf-8') != path.read_bytes():
+            errors.append(f"{path.name}: 書き戻した内容が元のファイルと一致しません")
+    for name in documents:
+        errors.append(f"{name}: 元のファイルがありません")
+    return errors
+
+
+def _best_of(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _load_json_files(progress_dir):
+    result = {}
+    for path in sorted(progress_dir.glob("*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            result[path.name] = json.load(f)
+    return result
+
+
+def print_report(progress_dir=None, db_path=None):
+    """ディスク容量と全件読み込みの時間を JSON ファイル群と DB で比べる"""
+    progress_dir = Path(progress_dir or PROGRESS_DIR)
+    db_path = Path(db_path or DB_PATH)
+    json_paths = sorted(progress_dir.glob("*.json"))
+    json_bytes = sum(p.stat().st_size for p in json_paths)
+    db_bytes = db_path.stat().st_size
+
+    conn = sqlite3.connect(db_path)
+    try:
+        template_bytes = conn.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM templates").fetchone()[0]
+        row_bytes = conn.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM progress").fetchone()[0]
+    finally:
+        conn.close()
+
+    json_time = _best_of(lambda: _load_json_files(progress_dir))
+    db_time = _best_of(lambda: load_all(db_path))
+
+    print("\n=== Size report ===")
+    print(f"  JSON ファイル: {len(json_paths)}個, {json_bytes / 1024:.1f} KB")
+    print(f"  SQLite       : {db_bytes / 1024:.1f} KB ({db_bytes / json_bytes * 100:.1f}%) "
+          f"[テンプレートの値 {template_bytes / 1024:.1f} KB, 進捗行 {row_bytes / 1024:.1f} KB]")
+    print(f"  全件読み込み : JSON {json_time * 1000:.1f} ms → SQLite {db_time * 1000:.1f} ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Q&A進捗の JSON を1つの SQLite ファイルにまとめる")
+    parser.add_argument("--progress-dir", default=PROGRESS_DIR, help="進捗 JSON のフォルダ")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite ファイルのパス")
+    parser.add_argument("--verify-only", action="store_true", help="取り込まずに既存の DB を照合する")
+    parser.add_argument("--export", metavar="DIR", help="DB から進捗 JSON を書き戻すフォルダ")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if args.export:
+        count = export(args.db, args.export)
+        print(f"✅ {count}ファイルを書き戻しました: {args.export}")
+        return 0
+
+    if not args.verify_only:
+        print(f"📂 取り込み中: {args.progress_dir}")
+        stats = migrate(args.progress_dir, args.db)
+        print(f"  ✅ {stats['files']}ファイル, {stats['questions']}問, テンプレート {stats['templates']}件 "
+              f"(中身 {stats['values']}件 {stats['value_bytes'] / 1024:.1f} KB → "
+              f"重複を除いて {stats['unique_values']}件 {stats['unique_value_bytes'] / 1024:.1f} KB)")
+        for name, message in stats['skipped']:
+            print(f"  ⚠️ スキップ: {name} ({message})")
+
+    print("\n🔍 検証中...")
+    errors = verify(args.progress_dir, args.db)
+    for message in errors[:20]:
+        print(f"  - {message}")
+    print(f"  {'⚠️ ' + str(len(errors)) + '件の不一致' if errors else '✅ OK'}")
+
+    print_report(args.progress_dir, args.db)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Q&Aバンク間の重複・類似問題の検出
+
+public/data/qa の全問題（問題文 + 回答）を文字 trigram の集合にし、MinHash-LSH で
+似ている組の候補だけを取り出して比べる。全組の総当たり (O(n²)) はしない。
+
+・「について説明しなさい」のような定型文の trigram で似ていると判定しないよう、
+  --max-df（既定 5%）を超える問題に現れる trigram は除く（TF-IDF の IDF の代わり）。
+
+・MinHash は One Permutation Hashing（ハッシュ1回で bins 個の最小値を取る）に
+  rotation による空き bin の補完を組み合わせたもの。NumPy / SciPy は使わない。
+・署名を bands 個の帯に分け、どれかの帯が一致した問題どうしを候補にする。
+  問題が集中した大きなバケツは、署名順に並べて前後 WINDOW 件だけと比べる（計算量を抑えるため）。
+・候補の類似度は各 bin の下位8ビット (b-bit minwise hashing) の一致率で推定する。
+  署名を1つの整数に詰めておき、XOR してゼロのバイトを数えるだけで比べられる。
+  重複の判定だけは trigram 集合の Jaccard 係数で確かめる。
+
+出力 (data/qa-similarity.json):
+    duplicates : Jaccard 係数が --threshold 以上の組
+    related    : 問題ごとの類似問題 上位 --top 件（推定類似度が --related-min 以上）
+問題の ID は「科目/サブカテゴリ-番号」（例: "刑法/共犯-3"）。
+
+--synthetic N を付けると、bench_corpus の合成データ N 問（一部は既存の問題を少し書き換えた
+重複）で実行時間と、仕込んだ重複をどれだけ見つけたかを確かめる（10万問で約3分・約1GB）。
+
+使い方:
+    python scripts/qa_similarity.py                     # 重複・類似問題を調べる
+    python scripts/qa_similarity.py --threshold 0.5 --top 10
+    python scripts/qa_similarity.py --synthetic 100000  # 10万問の合成データで計測
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from search_index import iter_runs  # noqa: E402
+from shard_qa_banks import QA_DIR, find_banks, iter_bank_questions  # noqa: E402
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+OUTPUT_PATH = ROOT / "data" / "qa-similarity.json"
+RESULT_FORMAT = 1
+
+SHINGLE = 3
+DEFAULT_BINS = 128
+DEFAULT_BANDS = 32
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_TOP = 5
+DEFAULT_RELATED_MIN = 0.2
+DEFAULT_MAX_DF = 0.05
+
+# これより大きいバケツは全組ではなく署名順の前後 WINDOW 件と比べる
+MAX_BUCKET = 64
+WINDOW = 8
+# 推定類似度がしきい値からこれ以上低い組は Jaccard 係数を計算しない
+ESTIMATE_MARGIN = 0.1
+
+_MASK32 = 0xFFFFFFFF
+_GOLDEN = 0x9E3779B1
+
+
+def shingles(text):
+    """句読点・空白で区切った文字列ごとの trigram の集合（3文字未満の区切りはそのまま）"""
+    grams = set()
+    for run in iter_runs(text):
+        if len(run) < SHINGLE:
+            grams.add(run)
+        else:
+            grams.update(run[i:i + SHINGLE] for i in range(len(run) - SHINGLE + 1))
+    return grams
+
+
+def _hash(gram):
+    # crc32 は実行ごとに変わらない。奇数の乗算で上位ビットまで混ぜる
+    return (zlib.crc32(gram.encode('utf-8')) * _GOLDEN) & _MASK32
+
+
+def minhash(grams, bins=DEFAULT_BINS):
+    """One Permutation Hashing の署名（bins 個の整数のタプル）。grams が空なら None"""
+    mins = [None] * bins
+    for gram in grams:
+        h = _hash(gram)
+        b = h % bins
+        v = h // bins
+        m = mins[b]
+        if m is None or v < m:
+            mins[b] = v
+    # 空の bin は右隣（循環）で最初に値のある bin から、距離に応じてずらした値を借りる
+    span = _MASK32 // bins + 1
+    signature = list(mins)
+    nearest = None
+    distance = 0
+    for j in range(2 * bins - 1, -1, -1):
+        k = j % bins
+        if mins[k] is not None:
+            nearest = mins[k]
+            distance = 0
+        else:
+            distance += 1
+            if j < bins:
+                if nearest is None:
+                    return None
+                signature[k] = nearest + distance * span
+    return tuple(signature)
+
+
+def pack(signature):
+    """署名の各 bin の下位8ビットを1つの整数に詰める"""
+    if signature is None:
+        return None
+    return int.from_bytes(bytes(v & 0xFF for v in signature), 'little')
+
+
+def _matches_for(similarity, bins):
+    """推定類似度 similarity に相当する、下位8ビットが一致する bin の数"""
+    # 異なる bin でも 1/256 の確率で下位8ビットが一致する
+    return (similarity * (1 - 1 / 256) + 1 / 256) * bins
+
+
+def _estimate(matches, bins):
+    return max(0.0, (matches / bins - 1 / 256) / (1 - 1 / 256))
+
+
+def jaccard(a, b):
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def common_shingles(texts, max_df=DEFAULT_MAX_DF):
+    """max_df を超える割合の文書に現れる trigram の集合"""
+    df = Counter()
+    for text in texts:
+        df.update(shingles(text))
+    limit = max(1, max_df * len(texts))
+    return {gram for gram, count in df.items() if count > limit}
+
+
+def find_similar(ids, texts, threshold=DEFAULT_THRESHOLD, top=DEFAULT_TOP,
+                 related_min=DEFAULT_RELATED_MIN, bins=DEFAULT_BINS, bands=DEFAULT_BANDS,
+                 max_df=DEFAULT_MAX_DF):
+    """(重複の組のリスト, {ID: 類似問題のリスト}, 統計) を返す"""
+    if bins % bands:
+        raise ValueError(f"bins ({bins}) は bands ({bands}) で割り切れる必要があります")
+    rows = bins // bands
+    n = len(texts)
+    stats = {"questions": n}
+
+    start = time.perf_counter()
+    common = common_shingles(texts, max_df) if max_df < 1 else set()
+    stats['common_shingles'] = len(common)
+
+    def grams_of(text):
+        grams = shingles(text)
+        # 定型文だけの問題は、除く前の trigram で比べる
+        return grams - common or grams
+
+    signatures = [minhash(grams_of(text), bins) for text in texts]
+    packed = [pack(signature) for signature in signatures]
+    stats['minhash_seconds'] = time.perf_counter() - start
+
+    # 帯ごとのバケツ。bucket_of[帯][i] は i が入ったバケツ（2件以上のときだけ）、
+    # position[帯][i] は大きなバケツの中での位置
+    start = time.perf_counter()
+    bucket_of = []
+    position = []
+    oversized = 0
+    for band in range(bands):
+        lo = band * rows
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            if signature is not None:
+                buckets.setdefault(signature[lo:lo + rows], []).append(i)
+        members_of = [None] * n
+        positions = [0] * n
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) > MAX_BUCKET:
+                oversized += 1
+                members.sort(key=signatures.__getitem__)
+                for p, i in enumerate(members):
+                    positions[i] = p
+            for i in members:
+                members_of[i] = members
+        bucket_of.append(members_of)
+        position.append(positions)
+    stats['lsh_seconds'] = time.perf_counter() - start
+    stats['oversized_buckets'] = oversized
+
+    start = time.perf_counter()
+    duplicate_min = _matches_for(threshold - ESTIMATE_MARGIN, bins)
+    related_floor = _matches_for(related_min, bins)
+    grams_cache = {}
+
+    def grams(i):
+        g = grams_cache.get(i)
+        if g is None:
+            g = grams_cache[i] = grams_of(texts[i])
+        return g
+
+    duplicates = []
+    related = {}
+    compared = 0
+    for i, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        candidates = set()
+        for band in range(bands):
+            members = bucket_of[band][i]
+            if members is None:
+                continue
+            if len(members) <= MAX_BUCKET:
+                candidates.update(members)
+            else:
+                p = position[band][i]
+                candidates.update(members[max(0, p - WINDOW):p + WINDOW + 1])
+        candidates.discard(i)
+        compared += len(candidates)
+        bits = packed[i]
+        scored = [((bits ^ packed[j]).to_bytes(bins, 'little').count(0), j) for j in candidates]
+
+        best = heapq.nlargest(top, (item for item in scored if item[0] >= related_floor))
+        if best:
+            related[ids[i]] = [[ids[j], round(_estimate(score, bins), 3)] for score, j in best]
+        for score, j in scored:
+            if j > i and score >= duplicate_min:
+                exact = jaccard(grams(i), grams(j))
+                if exact >= threshold:
+                    duplicates.append({"a": ids[i], "b": ids[j], "similarity": round(exact, 3),
+                                       "estimated": round(_estimate(score, bins), 3)})
+    duplicates.sort(key=lambda d: (-d['similarity'], d['a'], d['b']))
+    stats['compare_seconds'] = time.perf_counter() - start
+    stats['candidate_pairs'] = compared
+    return duplicates, related, stats
+
+
+# ---------------------------------------------------------------------------
+# 入力
+# ---------------------------------------------------------------------------
+
+def load_questions(qa_dir=None):
+    """(ID のリスト, 本文のリスト, {ID: 問題文}) を返す"""
+    ids, texts, questions = [], [], {}
+    for subject, files in find_banks(qa_dir or QA_DIR).items():
+        for qid, qa, _, _, _ in iter_bank_questions(files):
+            key = f"{subject}/{qid}"
+            ids.append(key)
+            texts.append(f"{qa.get('question', '')}\n{qa.get('answer', '')}")
+            questions[key] = qa.get('question', '')
+    return ids, texts, questions
+
+
+def _mutate(rng, text, edits):
+    """text の数か所の文字を差し替えた、ほぼ同じ文を返す"""
+    chars = list(text)
+    for _ in range(edits):
+        chars[rng.randrange(len(chars))] = rng.choice('のはがをにでとも')
+    return ''.join(chars)
+
+
+def synthetic_questions(count, seed, duplicate_rate=0.01):
+    """bench_corpus の文面で count 問を作る。duplicate_rate の割合は既存の問題を少し書き換えた重複
+
+    (ID のリスト, 本文のリスト, {ID: 問題文}, 仕込んだ重複の組の集合) を返す"""
+    from bench_corpus import generate_qa_text
+    from convert_qa_files import parse_qa_content
+
+    rng = random.Random(f"{seed}:similarity:{count}")
+    ids, texts, questions = [], [], {}
+    planted = set()
+    originals = count - int(count * duplicate_rate)
+    number = 0
+    while len(ids) < originals:
+        number += 1
+        batch = min(1000, originals - len(ids))
+        for qid, qa in parse_qa_content(generate_qa_text(rng, batch), number).items():
+            key = f"合成/{qid}"
+            ids.append(key)
+            texts.append(f"{qa['question']}\n{qa['answer']}")
+            questions[key] = qa['question']
+    for n in range(count - originals):
+        source = rng.randrange(originals)
+        question, answer = texts[source].split('\n', 1)
+        key = f"合成重複/{n + 1}"
+        ids.append(key)
+        texts.append(f"{_mutate(rng, question, 1)}\n{_mutate(rng, answer, 3)}")
+        questions[key] = question
+        planted.add((ids[source], key))
+    return ids, texts, questions, planted
+
+
+def _write_json(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Q&Aバンク間の重複・類似問題を検出する")
+    parser.add_argument("--qa-dir", default=QA_DIR, help="Q&A JSONのフォルダ")
+    parser.add_argument("--out", default=OUTPUT_PATH, help="結果の JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"重複とみなす Jaccard 係数（既定: {DEFAULT_THRESHOLD}）")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help=f"問題ごとの類似問題の件数（既定: {DEFAULT_TOP}）")
+    parser.add_argument("--related-min", type=float, default=DEFAULT_RELATED_MIN,
+                        help=f"類似問題に含める推定類似度の下限（既定: {DEFAULT_RELATED_MIN}）")
+    parser.add_argument("--max-df", type=float,
+                        help=f"この割合を超える問題に現れる trigram を除く"
+                             f"（既定: {DEFAULT_MAX_DF}、--synthetic では 1 = 除かない）")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS, help="MinHash 署名の長さ")
+    parser.add_argument("--bands", type=int, default=DEFAULT_BANDS, help="LSH の帯の数（bins を割り切る数）")
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="Q&Aバンクの代わりに合成データ N 問で計測する")
+    parser.add_argument("--seed", type=int, default=20240401, help="合成データの乱数の種")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    planted = None
+    max_df = args.max_df
+    if max_df is None:
+        # 合成データは40語ほどの組み合わせなので、ほとんどの trigram が定型扱いになってしまう
+        max_df = 1.0 if args.synthetic else DEFAULT_MAX_DF
+    if args.synthetic:
+        ids, texts, questions, planted = synthetic_questions(args.synthetic, args.seed)
+        source = f"合成データ {len(ids)}問（重複 {len(planted)}組を含む）"
+    else:
+        ids, texts, questions = load_questions(args.qa_dir)
+        source = f"{args.qa_dir}: {len(ids)}問"
+    print(f"📂 {source} ({time.perf_counter() - start:.2f}s)")
+
+    duplicates, related, stats = find_similar(ids, texts, args.threshold, args.top, args.related_min,
+                                              args.bins, args.bands, max_df)
+    elapsed = time.perf_counter() - start
+    print(f"🔍 除いた定型 trigram {stats['common_shingles']}種, MinHash {stats['minhash_seconds']:.2f}s, "
+          f"LSH {stats['lsh_seconds']:.2f}s, 比較 {stats['compare_seconds']:.2f}s (候補 {stats['candidate_pairs']}組, "
+          f"大きなバケツ {stats['oversized_buckets']}個)")
+
+    if planted is not None:
+        found = {(d['a'], d['b']) for d in duplicates}
+        hits = len(planted & found)
+        print(f"\n✅ 仕込んだ重複 {len(planted)}組のうち {hits}組を検出 "
+              f"({hits / len(planted) * 100 if planted else 0:.1f}%), 検出した重複 {len(duplicates)}組")
+    else:
+        print(f"\n📋 重複の可能性 {len(duplicates)}組 (Jaccard ≥ {args.threshold})")
+        for d in duplicates[:20]:
+            print(f"  {d['similarity']:.2f}  {d['a']} ⇔ {d['b']}")
+            print(f"        {questions[d['a']][:40]}")
+            print(f"        {questions[d['b']][:40]}")
+        if len(duplicates) > 20:
+            print(f"  ...ほか {len(duplicates) - 20}組")
+        print(f"📋 類似問題: {len(related)}問に1件以上")
+
+        _write_json(args.out, {
+            "format": RESULT_FORMAT,
+            "params": {"threshold": args.threshold, "top": args.top, "related_min": args.related_min,
+                       "max_df": max_df, "bins": args.bins, "bands": args.bands, "shingle": SHINGLE},
+            "stats": stats,
+            "duplicates": duplicates,
+            "related": related,
+        })
+        print(f"📝 結果: {args.out}")
+
+    print(f"\n✅ 完了 ({elapsed:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+変換スクリプトの実行メトリクス（--profile / --metrics-out）
+
+ステージごとの処理時間と回数、入出力バイト数・ファイル数・問題数などのカウンタ、
+ピーク RSS を集め、JSON に書き出す。ステージは入れ子にでき、外側のステージの
+時間には内側のステージの時間も含まれる。
+
+profile=True のときはステージごとに cProfile を取り、<出力名>.<ステージ>.prof に書き出す
+（入れ子のステージは外側のプロファイルに含まれる）。cProfile / pstats はそのときだけ import する。
+
+どちらのオプションも付けない場合は NULL_METRICS を使う。stage() や timed_iter() は
+何もしないので、計測のための処理は実行時間にほとんど影響しない。
+"""
+
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+METRICS_FORMAT = 1
+PROFILE_TOP = 15
+
+
+def peak_rss():
+    """(自プロセス, 子プロセス) のピーク RSS をバイト数で返す（取れないものは None）"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        # ru_maxrss は macOS ではバイト、Linux では KB
+        unit = 1 if sys.platform == 'darwin' else 1024
+        return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit)
+    if sys.platform == 'win32':
+        return _windows_peak_working_set(), None
+    return None, None
+
+
+def _windows_peak_working_set():
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    try:
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+    except (AttributeError, OSError):
+        return None
+    return counters.PeakWorkingSetSize
+
+
+class RunMetrics:
+    """1回の実行分のメトリクス"""
+
+    enabled = True
+
+    def __init__(self, script, profile=False):
+        self.script = script
+        self.profile = profile
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self.stages = {}
+        self.counters = Counter()
+        self._start = time.perf_counter()
+        self._profiles = {}
+        self._profiling = False
+
+    @contextmanager
+    def stage(self, name):
+        profiler = None
+        if self.profile and not self._profiling:
+            profiler = self._profiles.get(name)
+            if profiler is None:
+                import cProfile
+                profiler = self._profiles[name] = cProfile.Profile()
+            self._profiling = True
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+            self.add_time(name, elapsed)
+
+    def add_time(self, name, seconds, calls=1):
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {"seconds": 0.0, "calls": 0}
+        entry['seconds'] += seconds
+        entry['calls'] += calls
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def timed_iter(self, iterable, name):
+        """iterable から次の要素を取り出す時間を name のステージとして数える"""
+        iterator = iter(iterable)
+        total = 0.0
+        calls = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    total += time.perf_counter() - start
+                    return
+                total += time.perf_counter() - start
+                calls += 1
+                yield item
+        finally:
+            self.add_time(name, total, calls)
+
+    def timed_call(self, func, name):
+        """func を呼ぶたびに、その時間を name のステージとして数える関数を返す"""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(name, time.perf_counter() - start)
+        return wrapper
+
+    def snapshot(self):
+        """ワーカープロセスから親に渡すための値"""
+        return {"stages": self.stages, "counters": dict(self.counters)}
+
+    def merge(self, snapshot):
+        """ワーカープロセスの snapshot() を足し込む"""
+        if not snapshot:
+            return
+        for name, entry in snapshot['stages'].items():
+            self.add_time(name, entry['seconds'], entry['calls'])
+        self.counters.update(snapshot['counters'])
+
+    def report(self):
+        rss, children_rss = peak_rss()
+        return {
+            "format": METRICS_FORMAT,
+            "script": self.script,
+            "argv": sys.argv[1:],
+            "started": self.started,
+            "wall_seconds": time.perf_counter() - self._start,
+            "peak_rss_bytes": rss,
+            "peak_rss_children_bytes": children_rss,
+            "stages": self.stages,
+            "counters": dict(self.counters),
+        }
+
+    def _profile_base(self, metrics_out):
+        if metrics_out:
+            root, ext = os.path.splitext(str(metrics_out))
+            return root if ext.lower() == '.json' else str(metrics_out)
+        return self.script
+
+    def finish(self, metrics_out=None):
+        """サマリーを表示し、metrics_out と（profile なら）.prof を書き出して report() を返す"""
+        report = self.report()
+        if self.profile:
+            base = self._profile_base(metrics_out)
+            report['profiles'] = {}
+            for name, profiler in self._profiles.items():
+                path = f"{base}.{name}.prof"
+                profiler.dump_stats(path)
+                report['profiles'][name] = path
+        if metrics_out:
+            tmp_path = f"{metrics_out}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, metrics_out)
+        self.print_summary(report)
+        if metrics_out:
+            print(f"📝 メトリクス: {metrics_out}")
+        return report
+
+    def print_summary(self, report):
+        print(f"\n=== Metrics ({self.script}) ===")
+        print(f"  {'stage':<16} {'seconds':>10} {'calls':>8}")
+        for name, entry in report['stages'].items():
+            print(f"  {name:<16} {entry['seconds']:10.3f} {entry['calls']:8d}")
+        print(f"  {'wall':<16} {report['wall_seconds']:10.3f}")
+        for name, value in sorted(report['counters'].items()):
+            print(f"  {name:<16} {value:>10}")
+        if report['peak_rss_bytes'] is not None:
+            children = report['peak_rss_children_bytes']
+            extra = f" (子プロセス {children / (1024 * 1024):.1f} MB)" if children else ""
+            print(f"  peak RSS: {report['peak_rss_bytes'] / (1024 * 1024):.1f} MB{extra}")
+        if self._profiles:
+            import pstats
+        for name, profiler in self._profiles.items():
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP)
+            print(f"\n--- cProfile: {name} ({report['profiles'][name]}) ---")
+            print(out.getvalue().strip())
+
+
+class NullMetrics:
+    """計測しないときの RunMetrics の代わり"""
+
+    enabled = False
+    profile = False
+
+    def stage(self, name):
+        return nullcontext()
+
+    def add_time(self, name, seconds, calls=1):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def timed_iter(self, iterable, name):
+        return iterable
+
+    def timed_call(self, func, name):
+        return func
+
+    def snapshot(self):
+        return None
+
+    def merge(self, snapshot):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument("--profile", action="store_true",
+                        help="ステージごとに cProfile を取り、.prof を書き出して上位の関数を表示する")
+    parser.add_argument("--metrics-out", metavar="PATH",
+                        help="ステージごとの時間・バイト数・件数・ピークRSSを JSON で書き出す")
+
+
+def metrics_from_args(script, args):
+    """--profile / --metrics-out のどちらかがあれば RunMetrics、なければ NULL_METRICS"""
+    if args.profile or args.metrics_out:
+        return RunMetrics(script, profile=args.profile)
+    return NULL_METRICS
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Q&A とケース本文の n-gram 転置インデックス
+
+public/data/qa のQ&A（問題文・回答）と、public/cases のケースモジュールから
+js_to_txt_converter.parse_js_module で取り出したストーリー・解説・演習問題を
+文字 bigram / trigram に分解して索引を作る。形態素解析の辞書は使わない。
+
+索引ファイルは1つのバイナリで、
+    マジック / 文書表(JSON) / 語彙（前方一致圧縮） / ポスティング（文書番号の差分を可変長整数で符号化）
+の順に並ぶ。検索は BM25 で採点し、検索語の n-gram をすべて含む文書を上位に並べる。
+
+使い方:
+    python scripts/search_index.py                      # 索引を作る
+    python scripts/search_index.py --query 物上代位      # 検索する（索引が無ければ作る）
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from shard_qa_banks import QA_DIR, find_banks, iter_bank_questions  # noqa: E402
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+CASES_DIR = ROOT / "public" / "cases"
+INDEX_PATH = ROOT / "data" / "search-index.bin"
+
+MAGIC = b'QASEARCH1\n'
+GRAM_SIZES = (2, 3)
+
+_TAG = re.compile(r'<[^>]+>')
+_SEPARATORS = re.compile(r'[\W_]+')
+_TITLE_LENGTH = 60
+
+# BM25 のパラメータ
+_K1 = 1.2
+_B = 0.75
+
+
+def normalize(text):
+    """全角英数の統一・小文字化と、HTMLタグ・空欄マーカー {{ }} の除去"""
+    text = _TAG.sub(' ', text).replace('{{', '').replace('}}', '')
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def iter_runs(text):
+    """句読点・空白などで区切った文字列を返す"""
+    for run in _SEPARATORS.split(normalize(text)):
+        if run:
+            yield run
+
+
+def ngrams(text):
+    """text の bigram / trigram を出現順に返す（1文字だけの区切りはそのまま返す）"""
+    grams = []
+    for run in iter_runs(text):
+        if len(run) < GRAM_SIZES[0]:
+            grams.append(run)
+            continue
+        for n in GRAM_SIZES:
+            grams.extend(run[i:i + n] for i in range(len(run) - n + 1))
+    return grams
+
+
+def _encode_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varint(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+# ---------------------------------------------------------------------------
+# 文書の収集
+# ---------------------------------------------------------------------------
+
+def iter_qa_documents(qa_dir=None):
+    """(種別, 参照ID, タイトル, 本文) を返す。参照IDは qaLoader.js の「科目.サブカテゴリ-番号」形式"""
+    for subject, files in find_banks(qa_dir).items():
+        for qid, qa, _, _, _ in iter_bank_questions(files):
+            question = qa.get('question', '')
+            text = f"{question}\n{qa.get('answer', '')}\n{qa.get('explanation', '') or ''}"
+            yield 'qa', f"{subject}.{qid}", question[:_TITLE_LENGTH], text
+
+
+def _case_text(data):
+    parts = [data['title'], data['citation']]
+    for item in data['story']:
+        parts.extend((item['text'], item['dialogue'], item['title'], item['description'], item['content']))
+    parts.append(data['explanation'])
+    for quiz in data['quiz']:
+        parts.extend((quiz['title'], quiz['background']))
+        for sub in quiz['subProblems']:
+            parts.extend((sub['title'], sub['problem'], sub['hint'], sub['modelAnswer']))
+            parts.extend(sub['points'])
+    return '\n'.join(p for p in parts if p)
+
+
+def iter_case_documents(cases_dir=None):
+    """ケースモジュール (index.js を除く) を (種別, 参照ID, タイトル, 本文) で返す"""
+    from js_to_txt_converter import parse_js_module
+
+    cases_dir = Path(cases_dir or CASES_DIR)
+    for path in sorted(cases_dir.rglob("*.js")):
+        if path.name == "index.js":
+            continue
+        content = path.read_text(encoding='utf-8')
+        if not content.strip():
+            continue
+        data = parse_js_module(content)
+        ref = path.relative_to(cases_dir).with_suffix('').as_posix()
+        yield 'case', ref, data['title'] or ref, _case_text(data)
+
+
+# ---------------------------------------------------------------------------
+# 索引の作成
+# ---------------------------------------------------------------------------
+
+def build_index(documents, index_path=None):
+    """documents から索引ファイルを書き出し、統計を返す"""
+    index_path = Path(index_path or INDEX_PATH)
+    docs = []
+    lengths = []
+    postings = {}
+    for doc_id, (kind, ref, title, text) in enumerate(documents):
+        grams = ngrams(text)
+        docs.append([kind, ref, title])
+        lengths.append(len(grams))
+        for gram, tf in Counter(grams).items():
+            entry = postings.get(gram)
+            if entry is None:
+                postings[gram] = [doc_id, tf]
+            else:
+                entry.append(doc_id)
+                entry.append(tf)
+
+    header = json.dumps({"docs": docs, "lengths": lengths, "grams": list(GRAM_SIZES)},
+                        ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    out = bytearray(MAGIC)
+    _encode_varint(out, len(header))
+    out.extend(header)
+
+    terms = sorted(postings)
+    _encode_varint(out, len(terms))
+    previous = b''
+    for term in terms:
+        encoded = term.encode('utf-8')
+        shared = 0
+        limit = min(len(previous), len(encoded))
+        while shared < limit and previous[shared] == encoded[shared]:
+            shared += 1
+        _encode_varint(out, shared)
+        _encode_varint(out, len(encoded) - shared)
+        out.extend(encoded[shared:])
+        previous = encoded
+
+        entry = postings[term]
+        block = bytearray()
+        last = 0
+        for i in range(0, len(entry), 2):
+            _encode_varint(block, entry[i] - last)
+            _encode_varint(block, entry[i + 1])
+            last = entry[i]
+        _encode_varint(out, len(entry) // 2)
+        _encode_varint(out, len(block))
+        out.extend(block)
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(out)
+    os.replace(tmp_path, index_path)
+    return {"docs": len(docs), "terms": len(terms), "bytes": len(out)}
+
+
+# ---------------------------------------------------------------------------
+# 検索
+# ---------------------------------------------------------------------------
+
+class SearchIndex:
+    """索引ファイルを読み込んで検索する
+
+    語彙は読み込み時に展開するが、ポスティングはバイト列のまま持ち、
+    検索に使う語の分だけ復号する"""
+
+    def __init__(self, data):
+        if not data.startswith(MAGIC):
+            raise ValueError("検索索引のファイル形式が違います")
+        pos = len(MAGIC)
+        size, pos = _decode_varint(data, pos)
+        header = json.loads(data[pos:pos + size].decode('utf-8'))
+        pos += size
+        self.docs = header['docs']
+        self._lengths = header['lengths']
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        self._data = data
+
+        # 語 -> (文書頻度, ポスティング開始位置, バイト長)
+        terms = {}
+        count, pos = _decode_varint(data, pos)
+        previous = b''
+        for _ in range(count):
+            shared, pos = _decode_varint(data, pos)
+            length, pos = _decode_varint(data, pos)
+            encoded = previous[:shared] + data[pos:pos + length]
+            pos += length
+            df, pos = _decode_varint(data, pos)
+            size, pos = _decode_varint(data, pos)
+            terms[encoded.decode('utf-8')] = (df, pos, size)
+            pos += size
+            previous = encoded
+        self._terms = terms
+
+    @classmethod
+    def load(cls, index_path=None):
+        with open(index_path or INDEX_PATH, 'rb') as f:
+            return cls(f.read())
+
+    def postings(self, term):
+        """term の (文書番号, 出現回数) のリスト"""
+        entry = self._terms.get(term)
+        if entry is None:
+            return []
+        _, pos, size = entry
+        data = self._data
+        end = pos + size
+        result = []
+        doc_id = 0
+        while pos < end:
+            delta, pos = _decode_varint(data, pos)
+            tf, pos = _decode_varint(data, pos)
+            doc_id += delta
+            result.append((doc_id, tf))
+        return result
+
+    def _query_groups(self, query):
+        """検索語を (索引の語のリスト, いずれか1つでよいか) に分解する
+
+        3文字以上の区切りは trigram、2文字は bigram をすべて要求する。
+        1文字の区切りは、その文字で始まる bigram のどれかを含めばよい"""
+        groups = []
+        for run in iter_runs(query):
+            if len(run) >= 3:
+                groups.append(([run[i:i + 3] for i in range(len(run) - 2)], False))
+            elif len(run) == 2:
+                groups.append(([run], False))
+            else:
+                groups.append(([t for t in self._terms if len(t) <= 2 and t.startswith(run)], True))
+        return groups
+
+    def search(self, query, limit=10, kind=None):
+        """query を含む文書を採点順に返す
+
+        返り値は {"kind", "ref", "title", "score", "matched"} のリスト。
+        matched は検索語の n-gram をすべて含むかどうかで、True の文書が先に並ぶ。
+        kind に 'qa' / 'case' を渡すとその種別だけを返す"""
+        n_docs = len(self.docs)
+        scores = {}
+        matched = {}
+        required = 0
+        for terms, any_of in self._query_groups(query):
+            if any_of:
+                required += 1
+                seen = set()
+                for term in terms:
+                    for doc_id, score in self._score_term(term, n_docs):
+                        scores[doc_id] = scores.get(doc_id, 0.0) + score
+                        seen.add(doc_id)
+                for doc_id in seen:
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+                continue
+            for term in terms:
+                required += 1
+                for doc_id, score in self._score_term(term, n_docs):
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        results = []
+        for doc_id, score in scores.items():
+            if kind and self.docs[doc_id][0] != kind:
+                continue
+            results.append((matched[doc_id] >= required, score, doc_id))
+        results.sort(key=lambda r: (not r[0], -r[1], r[2]))
+        return [{"kind": self.docs[d][0], "ref": self.docs[d][1], "title": self.docs[d][2],
+                 "score": round(s, 4), "matched": m} for m, s, d in results[:limit]]
+
+    def _score_term(self, term, n_docs):
+        entry = self._terms.get(term)
+        if entry is None:
+            return []
+        df = entry[0]
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        avg = self._avg_length or 1.0
+        lengths = self._lengths
+        return [(doc_id, idf * tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * lengths[doc_id] / avg)))
+                for doc_id, tf in self.postings(term)]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Q&A とケース本文の n-gram 検索索引を作る・検索する")
+    parser.add_argument("--qa-dir", default=QA_DIR, help="Q&A JSONのフォルダ")
+    parser.add_argument("--cases-dir", default=CASES_DIR, help="ケースモジュールのフォルダ")
+    parser.add_argument("--index", default=INDEX_PATH, help="索引ファイルのパス")
+    parser.add_argument("-q", "--query", action="append", default=[], help="検索語（複数指定可）")
+    parser.add_argument("-n", "--limit", type=int, default=10, help="表示件数")
+    parser.add_argument("--kind", choices=["qa", "case"], help="検索対象の種別")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    if not args.query or not os.path.exists(args.index):
+        start = time.perf_counter()
+
+        def documents():
+            yield from iter_qa_documents(args.qa_dir)
+            yield from iter_case_documents(args.cases_dir)
+
+        stats = build_index(documents(), args.index)
+        print(f"✅ 索引を作成: {args.index}")
+        print(f"  文書 {stats['docs']}件, 語 {stats['terms']}個, {stats['bytes'] / 1024:.1f} KB "
+              f"({time.perf_counter() - start:.2f}s)")
+
+    if not args.query:
+        return
+
+    start = time.perf_counter()
+    index = SearchIndex.load(args.index)
+    print(f"📖 索引を読み込み ({(time.perf_counter() - start) * 1000:.1f} ms)")
+    for query in args.query:
+        start = time.perf_counter()
+        results = index.search(query, args.limit, args.kind)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n🔍 {query} ({len(results)}件, {elapsed:.1f} ms)")
+        for result in results:
+            mark = ' ' if result['matched'] else '~'
+            print(f"  {mark}{result['score']:8.3f}  [{result['kind']}] {result['ref']}  {result['title']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Q&Aバンクを固定サイズのシャードに分割するスクリプト
+
+public/data/qa/民法_1.json, 民法_2.json, ... → public/data/qa-shards/民法/000.json, 001.json, ... + index.json
+
+問題IDは qaLoader.js と同じ「サブカテゴリ-番号」形式 (例: "3-12")。統合後の 民法.json と同じく、
+convert_qa_files.py の出力のように既に "サブカテゴリ-" が付いているIDはそのまま使う
+（merge_qa_files.merged_question_id）。
+シャードはそれ自体が {ID: 問題} の最小化JSONで、index.json には
+ID → [シャード番号, バイトオフセット, バイト長, ランク, サブカテゴリ] を記録する。
+オフセットと長さは問題オブジェクト部分のUTF-8バイト範囲を指すので、
+フロントエンドはシャード全体を取得しても、Range リクエストで1問だけ取得してもよい。
+
+シャードは public/data/qa の外に置く（/api/qa-files が qa 直下の *.json を
+すべてQ&Aバンクとして扱うため）。
+
+使い方:
+    python scripts/shard_qa_banks.py                # 分割して検証
+    python scripts/shard_qa_banks.py --verify-only  # 既存のシャードを検証するだけ
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from merge_qa_files import merged_question_id
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+ROOT = Path(__file__).resolve().parent.parent
+QA_DIR = ROOT / "public" / "data" / "qa"
+SHARD_DIR = ROOT / "public" / "data" / "qa-shards"
+
+DEFAULT_SHARD_SIZE = 16 * 1024
+INDEX_FORMAT = 1
+INDEX_FIELDS = ["shard", "offset", "length", "rank", "subcategory"]
+
+_SHARD_NAME = re.compile(r'^\d{3,}\.json$')
+
+
+def _bank_sort_key(subcategory):
+    """qaLoader.js と同じ並び順（数字のサブカテゴリが先、それ以外は名前順）"""
+    if subcategory.isdigit():
+        return (0, int(subcategory), '')
+    return (1, 0, subcategory)
+
+
+def find_banks(qa_dir=None):
+    """{科目: [(サブカテゴリ, パス), ...]} を返す（統合済みの 民法.json などは除く）"""
+    qa_dir = Path(qa_dir or QA_DIR)
+    banks = defaultdict(list)
+    for path in qa_dir.glob("*_*.json"):
+        subject, subcategory = path.stem.split('_', 1)
+        banks[subject].append((subcategory, path))
+    for files in banks.values():
+        files.sort(key=lambda item: _bank_sort_key(item[0]))
+    return dict(sorted(banks.items()))
+
+
+def iter_bank_questions(files):
+    """(問題ID, 問題, サブカテゴリ, サブカテゴリ名の辞書, 最終更新日) を順に返す
+
+    問題IDは統合後のバンクと同じ（番号だけのIDにはサブカテゴリを付け、付いているものはそのまま）"""
+    for subcategory, path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        names = data.get('subcategories', {})
+        updated = data.get('lastUpdated', '')
+        for qid, qa in data.get('questions', {}).items():
+            yield merged_question_id(subcategory, qid), qa, subcategory, names, updated
+
+
+def _dump(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _write_bytes(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def shard_subject(subject, files, out_dir, shard_size=DEFAULT_SHARD_SIZE):
+    """1科目分のシャードと index.json を書き出し、統計を返す"""
+    subject_dir = Path(out_dir) / subject
+    subject_dir.mkdir(parents=True, exist_ok=True)
+
+    subcategories = {}
+    last_updated = ''
+    entries = {}
+    shards = []
+    buf = bytearray()
+
+    def flush():
+        name = f"{len(shards):03d}.json"
+        buf.extend(b'}')
+        _write_bytes(subject_dir / name, bytes(buf))
+        shards.append({"file": name, "bytes": len(buf)})
+        buf.clear()
+
+    for qid, qa, subcategory, names, updated in iter_bank_questions(files):
+        subcategories.update(names)
+        last_updated = max(last_updated, updated)
+        if qid in entries:
+            print(f"  ⚠️ ID重複のためスキップ: {subject} {qid}")
+            continue
+
+        key = _dump(qid)
+        value = _dump(qa)
+        # 1問だけで shard_size を超える場合は、その問題だけのシャードになる
+        if buf and len(buf) + len(key) + len(value) + 2 > shard_size:
+            flush()
+        buf.extend(b',' if buf else b'{')
+        buf.extend(key)
+        buf.extend(b':')
+        entries[qid] = [len(shards), len(buf), len(value), qa.get('rank'), subcategory]
+        buf.extend(value)
+    if buf:
+        flush()
+
+    # 前回の実行で作られた余分なシャードを削除する
+    written = {s['file'] for s in shards}
+    for path in subject_dir.iterdir():
+        if _SHARD_NAME.match(path.name) and path.name not in written:
+            path.unlink()
+
+    index = {
+        "format": INDEX_FORMAT,
+        "subject": subject,
+        "lastUpdated": last_updated,
+        "subcategories": subcategories,
+        "shards": shards,
+        "fields": INDEX_FIELDS,
+        "questions": entries,
+    }
+    index_bytes = _dump(index)
+    _write_bytes(subject_dir / "index.json", index_bytes)
+
+    return {
+        "questions": len(entries),
+        "shards": len(shards),
+        "shard_bytes": sum(s['bytes'] for s in shards),
+        "index_bytes": len(index_bytes),
+        "largest_shard": max((s['bytes'] for s in shards), default=0),
+    }
+
+
+def verify_subject(subject, files, out_dir):
+    """シャードと index.json を元のバンクと照合し、エラーメッセージのリストを返す"""
+    subject_dir = Path(out_dir) / subject
+    errors = []
+    try:
+        with open(subject_dir / "index.json", 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        return [f"index.json を読み込めません: {e}"]
+
+    shard_bytes = []
+    for number, shard in enumerate(index['shards']):
+        try:
+            raw = (subject_dir / shard['file']).read_bytes()
+        except OSError as e:
+            errors.append(f"{shard['file']} を読み込めません: {e}")
+            raw = b''
+        if len(raw) != shard['bytes']:
+            errors.append(f"{shard['file']}: サイズが index と一致しません ({len(raw)} != {shard['bytes']})")
+        shard_bytes.append(raw)
+
+    fields = {name: i for i, name in enumerate(index.get('fields', INDEX_FIELDS))}
+    entries = index['questions']
+    seen = set()
+    for qid, qa, subcategory, _, _ in iter_bank_questions(files):
+        if qid in seen:
+            continue
+        seen.add(qid)
+        entry = entries.get(qid)
+        if entry is None:
+            errors.append(f"{qid}: index にありません")
+            continue
+        number = entry[fields['shard']]
+        offset = entry[fields['offset']]
+        length = entry[fields['length']]
+        if not 0 <= number < len(shard_bytes):
+            errors.append(f"{qid}: シャード番号 {number} が範囲外です")
+            continue
+        try:
+            loaded = json.loads(shard_bytes[number][offset:offset + length].decode('utf-8'))
+        except ValueError as e:
+            errors.append(f"{qid}: バイト範囲を読み込めません ({e})")
+            continue
+        if loaded != qa:
+            errors.append(f"{qid}: 内容が元のバンクと一致しません")
+        if entry[fields['rank']] != qa.get('rank') or entry[fields['subcategory']] != subcategory:
+            errors.append(f"{qid}: ランク・サブカテゴリが元のバンクと一致しません")
+
+    for qid in entries.keys() - seen:
+        errors.append(f"{qid}: 元のバンクにない問題が index にあります")
+
+    # シャード全体としても JSON として読めること
+    total = 0
+    for shard, raw in zip(index['shards'], shard_bytes):
+        try:
+            total += len(json.loads(raw.decode('utf-8')))
+        except ValueError as e:
+            errors.append(f"{shard['file']}: JSON として読み込めません ({e})")
+    if total != len(entries):
+        errors.append(f"シャード内の問題数 {total} が index の {len(entries)} と一致しません")
+    return errors
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Q&Aバンクをシャードに分割し、バイトオフセットの索引を作る")
+    parser.add_argument("--qa-dir", default=QA_DIR, help="Q&A JSONのフォルダ")
+    parser.add_argument("--out", default=SHARD_DIR, help="シャードの出力先フォルダ")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                        help=f"シャード1つの目安バイト数（既定: {DEFAULT_SHARD_SIZE}）")
+    parser.add_argument("--verify-only", action="store_true", help="分割せずに既存のシャードを検証する")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    banks = find_banks(args.qa_dir)
+    print(f"📂 検出された科目: {list(banks)}")
+
+    if not args.verify_only:
+        for subject, files in banks.items():
+            stats = shard_subject(subject, files, args.out, args.shard_size)
+            print(f"  ✅ {subject}: {stats['questions']}問 → シャード {stats['shards']}個 "
+                  f"(計 {stats['shard_bytes'] / 1024:.1f} KB, 最大 {stats['largest_shard'] / 1024:.1f} KB, "
+                  f"index {stats['index_bytes'] / 1024:.1f} KB)")
+
+    print("\n🔍 検証中...")
+    failed = 0
+    for subject, files in banks.items():
+        errors = verify_subject(subject, files, args.out)
+        if errors:
+            failed += 1
+            print(f"  ⚠️ {subject}: {len(errors)}件の不一致")
+            for message in errors[:20]:
+                print(f"    - {message}")
+        else:
+            print(f"  ✅ {subject}: OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,101 @@
 # -*- coding: utf-8 -*-
+"""
+encoding_detect の動作確認
+
+引数なしで実行すると、UTF-8 / UTF-16 / cp932 / EUC-JP / 混在ファイルのサンプルで
+判定結果を確認し、判定に使われない位置に cp932 の行がある大きな UTF-8 ファイルを
+iter_lines で読んで正しく読めるか・'mixed' と報告されるかを確かめたうえで、
+既定のソースファイルを読み込んで先頭を出力する。
+ファイルを引数に渡すと、そのファイルの判定結果を表示する。
+"""
+import os
 import sys
+import tempfile
+
+from encoding_detect import iter_lines, read_text, sniff_file_encoding
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 file_path = r'C:\Users\PC_User\Documents\予備試験\行政法\一問一答行政法\1.1-86.txt'
 output_path = r'C:\Users\PC_User\Desktop\Atashinchi-study\scripts\test_gyousei.txt'
 
-# 複数のエンコーディングを試す
-encodings = ['utf-8', 'utf-8-sig', 'utf-16', 'utf-16-le', 'utf-16-be', 'cp932', 'shift_jis', 'euc_jp']
+SAMPLE = "1.A　行政行為の公定力とは何か。\n取消訴訟以外では効力を否定できない効力をいう。\n2. B　ｶﾅ交じり①\n"
+
+# (サンプル名, バイト列, 期待する文字コード)
+SAMPLES = [
+    ('utf-8', SAMPLE.encode('utf-8'), 'utf-8'),
+    ('utf-8-sig', SAMPLE.encode('utf-8-sig'), 'utf-8-sig'),
+    ('utf-16 (BOM)', SAMPLE.encode('utf-16'), 'utf-16'),
+    ('utf-16-le (BOMなし)', SAMPLE.encode('utf-16-le'), 'utf-16-le'),
+    ('utf-16-be (BOMなし)', SAMPLE.encode('utf-16-be'), 'utf-16-be'),
+    ('cp932', SAMPLE.encode('cp932'), 'cp932'),
+    ('euc_jp', SAMPLE.replace('①', '').encode('euc_jp'), 'euc_jp'),
+    ('混在 (utf-8 + cp932)',
+     SAMPLE.encode('utf-8') + SAMPLE.encode('cp932'), 'mixed'),
+]
+
+
+def check_samples():
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, raw, expected in SAMPLES:
+            path = os.path.join(tmp, 'sample.txt')
+            with open(path, 'wb') as f:
+                f.write(raw)
+            content, enc = read_text(path)
+            expected_text = SAMPLE * 2 if expected == 'mixed' else raw.decode(expected)
+            ok = enc == expected and content == expected_text
+            failures += not ok
+            print(f'{name}: {"SUCCESS" if ok else "FAIL"} ({enc})')
+    return failures
 
-for enc in encodings:
-    try:
-        with open(file_path, 'r', encoding=enc) as f:
-            content = f.read()
-        print(f'{enc}: SUCCESS')
-        # 最初の500文字を出力
-        with open(output_path, 'w', encoding='utf-8') as out:
+
+def check_streaming():
+    """判定のブロックの間にある cp932 の行・どの文字コードでも読めない行を iter_lines が報告するか"""
+    failures = 0
+    # 約 10 MB。sniff_file_encoding は 256KB のブロックを1つおきに間引いて判定する
+    filler = SAMPLE * 80000
+    cases = [
+        ('ストリーム: 途中に cp932', SAMPLE.encode('cp932'), SAMPLE, 'mixed'),
+        ('ストリーム: 読めないバイト', b'\x81 \n', None, 'utf-8-replace'),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, middle, expected_middle, expected_enc in cases:
+            path = os.path.join(tmp, 'large.txt')
+            half = filler.encode('utf-8')
+            # 2つ目のブロック（判定されない）の中に置く
+            with open(path, 'wb') as f:
+                f.write(half[:300 * 1024].rsplit(b'\n', 1)[0] + b'\n')
+                f.write(middle)
+                f.write(half)
+            sniffed = sniff_file_encoding(path)
+            status = {}
+            lines = list(iter_lines(path, status=status))
+            ok = sniffed == 'utf-8' and status['encoding'] == expected_enc
+            if expected_middle is not None:
+                ok = ok and '\n'.join(expected_middle.rstrip('\n').split('\n')) in '\n'.join(lines)
+            failures += not ok
+            print(f'{name}: {"SUCCESS" if ok else "FAIL"} (判定 {sniffed} → {status["encoding"]})')
+    return failures
+
+
+def show_file(path, out_path=None):
+    content, enc = read_text(path)
+    print(f'{path}: {enc}')
+    if out_path:
+        # 最初の3000文字を出力
+        with open(out_path, 'w', encoding='utf-8') as out:
             out.write(f'=== Encoding: {enc} ===\n')
             out.write(content[:3000])
-        break
-    except Exception as e:
-        print(f'{enc}: {e}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            show_file(path)
+        sys.exit(0)
+
+    failed = check_samples() + check_streaming()
+    if os.path.exists(file_path):
+        show_file(file_path, output_path)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+js_to_txt_converter の起動時間の確認
+
+次の2つを別プロセスで繰り返し実行し、最小値が予算内かを確かめる。
+    python -c "import js_to_txt_converter"
+    python js_to_txt_converter.py <ケース.js> --no-manifest   (一時フォルダのコピーを変換)
+時間は何もしない `python -c pass` との差で比べる（インタプリタ自体の起動時間はマシン次第なので）。
+あわせて、import しただけでは tkinter / windnd / multiprocessing が読み込まれないことも確かめる。
+
+予算を超えたか、GUI のモジュールが読み込まれていれば終了コード 1 を返す。
+
+使い方:
+    python scripts/test_import_time.py
+    python scripts/test_import_time.py --repeat 10 --import-budget 80 --cli-budget 200
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CASES_DIR = ROOT / "public" / "cases"
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+# `python -c pass` を差し引いたミリ秒
+IMPORT_BUDGET_MS = 100
+CLI_BUDGET_MS = 250
+DEFAULT_REPEAT = 5
+
+# import js_to_txt_converter で読み込まれてはいけないモジュール
+LAZY_MODULES = ('tkinter', '_tkinter', 'windnd', 'multiprocessing', 'cProfile', 'pstats')
+
+
+def best_time(cmd, repeat, cwd=None):
+    """cmd を repeat 回実行して最短のミリ秒を返す"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def loaded_lazy_modules():
+    """import js_to_txt_converter の直後に読み込まれている LAZY_MODULES を返す"""
+    code = ("import sys, js_to_txt_converter; "
+            f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True)
+    return result.stdout.split()
+
+
+def sample_case():
+    for path in sorted(CASES_DIR.rglob("*.js")):
+        if path.name != "index.js" and path.stat().st_size:
+            return path
+    return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="js_to_txt_converter の起動時間を確認する")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="繰り返し回数（最小値を採る）")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_MS,
+                        help=f"import の予算 ms（既定: {IMPORT_BUDGET_MS}）")
+    parser.add_argument("--cli-budget", type=float, default=CLI_BUDGET_MS,
+                        help=f"1ファイル変換の予算 ms（既定: {CLI_BUDGET_MS}）")
+    parser.add_argument("--case", help="変換に使うケースモジュール（既定: public/cases の先頭）")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    repeat = max(1, args.repeat)
+    failed = False
+
+    loaded = loaded_lazy_modules()
+    if loaded:
+        print(f"⚠️ import だけで読み込まれている: {', '.join(loaded)}")
+        failed = True
+    else:
+        print(f"✅ import 時に読み込まれない: {', '.join(LAZY_MODULES)}")
+
+    case = Path(args.case) if args.case else sample_case()
+    if case is None:
+        print(f"❌ ケースモジュールが見つかりません: {CASES_DIR}")
+        return 1
+
+    bare = best_time([sys.executable, "-c", "pass"], repeat)
+    imported = best_time([sys.executable, "-c", "import js_to_txt_converter"], repeat, cwd=ROOT)
+    with tempfile.TemporaryDirectory(prefix="import-time-") as tmp:
+        js_path = Path(tmp) / case.name
+        shutil.copyfile(case, js_path)
+        cli = best_time([sys.executable, str(ROOT / "js_to_txt_converter.py"), str(js_path), "--no-manifest"],
+                        repeat)
+
+    print(f"\n⏱️ python -c pass: {bare:.1f} ms（{repeat}回の最小値）")
+    for label, elapsed, budget in (("import js_to_txt_converter", imported, args.import_budget),
+                                   (f"js_to_txt_converter.py {case.name}", cli, args.cli_budget)):
+        over = elapsed - bare
+        ok = over <= budget
+        failed = failed or not ok
+        print(f"  {'✅' if ok else '⚠️'} {label}: {elapsed:.1f} ms (+{over:.1f} ms / 予算 {budget:.0f} ms)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
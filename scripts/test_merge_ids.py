@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+merge_qa_files の統合後IDの確認
+
+bench_corpus の合成一問一答を convert_qa_files で変換し（IDは "サブカテゴリ-番号"）、
+その出力を merge_subject_outputs で統合して、
+    ・変換時のIDがそのまま残る（"1-1-12" のように二重に付かない）
+    ・問題の中身が変わらない
+    ・shard_qa_banks.iter_bank_questions（シャード・検索索引・D1 など）のIDも統合後と同じになる
+    ・番号だけのID（既存の public/data/qa の形式）には "サブカテゴリ-" が付く
+    ・最終的なIDが重なれば衝突として "_2" が付く
+ことを確かめる。失敗があれば終了コード 1 を返す。
+
+使い方:
+    python scripts/test_merge_ids.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from bench_corpus import write_corpus
+from convert_qa_files import build_subject_outputs, merge_subject_outputs, parse_qa_file
+from d1_bulk_load import iter_qa_rows
+from merge_qa_files import merge_subject
+from qa_output import write_qa_json
+from shard_qa_banks import find_banks, iter_bank_questions
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+SUBJECT = "民法"
+
+
+def check(name, ok, detail=""):
+    print(f'{name}: {"SUCCESS" if ok else "FAIL"}{f" ({detail})" if detail else ""}')
+    return 0 if ok else 1
+
+
+def check_converter_round_trip(tmp):
+    """convert_qa_files の出力を統合してもIDと中身が変わらないか"""
+    write_corpus(tmp / "corpus", 1)
+    source_dir = tmp / "corpus" / "qa-source" / SUBJECT
+    out_dir = tmp / "qa"
+    out_dir.mkdir()
+
+    expected = {}
+    subcategories = {}
+    for path in sorted(source_dir.rglob("*.txt")):
+        number = path.stem.split('.')[0]
+        questions = parse_qa_file(str(path), number)[0]
+        subcategories.setdefault(number, {}).update(questions)
+    for file_name, data in build_subject_outputs(SUBJECT, subcategories, "2024-01-01").items():
+        write_qa_json(data, str(out_dir / file_name))
+        expected.update(data['questions'])
+
+    # merge_subject_outputs は --merge と同じ経路（内部で merge_subject を使う）
+    result = merge_subject_outputs(SUBJECT, out_dir)
+    with open(out_dir / f"{SUBJECT}.json", 'r', encoding='utf-8') as f:
+        merged = json.load(f)['questions']
+    failures = check("変換出力のIDがそのまま残る", list(merged) == list(expected),
+                     f"{len(merged)}問, 例: {next(iter(merged), '')}")
+    failures += check("問題の中身が変わらない", merged == expected)
+    failures += check("衝突なし", not result['collisions'], f"{len(result['collisions'])}件")
+    # 統合前のファイル（IDは "1-12" の形）を直接読むものも同じIDになる
+    bank_ids = [qid for qid, *_ in iter_bank_questions(find_banks(out_dir)[SUBJECT])]
+    failures += check("シャード等のIDが統合後と同じ", bank_ids == list(merged), f"例: {next(iter(bank_ids), '')}")
+    row_ids = [row[1] for row in iter_qa_rows(out_dir)]
+    failures += check("D1 の行のIDが統合後と同じ", row_ids == list(merged), f"例: {next(iter(row_ids), '')}")
+    return failures
+
+
+def check_bare_ids(tmp):
+    """番号だけのIDに名前空間が付き、最終的なIDで衝突を検出するか"""
+    qa = {"rank": "A", "question": "問", "answer": "答"}
+    bare = tmp / "bare_1.json"
+    prefixed = tmp / "bare_2.json"
+    write_qa_json({"subject": SUBJECT, "subcategories": {"1": "一"}, "questions": {"1": qa, "2": qa}}, str(bare))
+    # "1-1" はサブカテゴリ2の番号だけのIDではなく、既に付いている別のIDとして扱う
+    write_qa_json({"subject": SUBJECT, "subcategories": {"2": "二"},
+                   "questions": {"1": qa, "2-1": qa}}, str(prefixed))
+    result = merge_subject(SUBJECT, [("1", bare), ("2", prefixed)], tmp / "bare.json")
+    with open(tmp / "bare.json", 'r', encoding='utf-8') as f:
+        keys = list(json.load(f)['questions'])
+    failures = check("番号だけのIDに名前空間", keys == ["1-1", "1-2", "2-1", "2-1_2"], ', '.join(keys))
+    failures += check("最終的なIDで衝突を検出", [c[0] for c in result['collisions']] == ["2-1"])
+    bank_ids = [qid for qid, *_ in iter_bank_questions([("1", bare), ("2", prefixed)])]
+    failures += check("シャード等のIDも同じ規則", bank_ids == ["1-1", "1-2", "2-1", "2-1"], ', '.join(bank_ids))
+    return failures
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="merge-ids-") as tmp:
+        tmp = Path(tmp)
+        failures = check_converter_round_trip(tmp) + check_bare_ids(tmp)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
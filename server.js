@@ -11,6 +11,7 @@ import { GoogleGenAI } from "@google/genai";
 import path from 'path';
 import fs from 'fs/promises';
 import fssync from 'fs';
+import crypto from 'crypto';
 import cors from 'cors';
 import helmet from 'helmet';
 import compression from 'compression';
@@ -256,8 +257,10 @@ app.use(helmet({
     }
 }));
 
-// 圧縮とCORS
-app.use(compression());
+// 圧縮とCORS（事前圧縮済みファイルを返すレスポンスは圧縮しない）
+app.use(compression({
+    filter: (req, res) => !res.locals.precompressed && compression.filter(req, res)
+}));
 app.use(cors());
 
 // ★★★ 認証設定 ★★★
@@ -633,6 +636,64 @@ app.get('/api/subfolders/:category', async (req, res) => {
     }
 });
 
+// ★★★ Q&Aバンクは scripts/qa_output.py が書き出した .br / .gz があればそれを返す（実行時の圧縮なし） ★★★
+const PRECOMPRESSED_ENCODINGS = [['br', '.br'], ['gzip', '.gz']];
+
+app.get('/data/qa/:file', (req, res, next) => {
+    const fileName = req.params.file;
+    if (!fileName.endsWith('.json') || fileName.includes('..') || /[\\/]/.test(fileName)) {
+        return next();
+    }
+    const jsonPath = path.join(QA_DATA_DIR, fileName);
+    let jsonStat;
+    try {
+        jsonStat = fssync.statSync(jsonPath);
+    } catch (error) {
+        return next();
+    }
+    res.vary('Accept-Encoding');
+    for (const [encoding, suffix] of PRECOMPRESSED_ENCODINGS) {
+        if (req.acceptsEncodings(encoding) !== encoding) {
+            continue;
+        }
+        let compressedStat;
+        try {
+            compressedStat = fssync.statSync(jsonPath + suffix);
+        } catch (error) {
+            continue;
+        }
+        // JSON の方が新しければ圧縮ファイルは古いので使わない
+        if (compressedStat.mtimeMs < jsonStat.mtimeMs) {
+            continue;
+        }
+        res.locals.precompressed = true;
+        res.set('Content-Type', 'application/json; charset=utf-8');
+        res.set('Content-Encoding', encoding);
+        return res.sendFile(jsonPath + suffix);
+    }
+    next();
+});
+
+// ★★★ ケース目録（scripts/build_case_catalogue.py の出力）。未作成なら空の目録を返す ★★★
+app.get('/case-bundle/catalogue.json', (req, res) => {
+    const cataloguePath = path.join(process.cwd(), 'public', 'case-bundle', 'catalogue.json');
+    res.set('Cache-Control', 'no-cache');
+    if (!fssync.existsSync(cataloguePath)) {
+        return res.json({ format: 1, chunks: {}, cases: [] });
+    }
+    res.sendFile(cataloguePath);
+});
+
+// ★★★ アセットマニフェスト（scripts/build_asset_manifest.py の出力）。無ければ空（ブラウザは元のパスで読む） ★★★
+app.get('/assets/manifest.json', (req, res) => {
+    const manifestPath = path.join(process.cwd(), 'public', 'assets', 'manifest.json');
+    res.set('Cache-Control', 'no-cache');
+    if (!fssync.existsSync(manifestPath)) {
+        return res.json({ format: 1, assets: {} });
+    }
+    res.sendFile(manifestPath);
+});
+
 // 認証が必要なAPIエンドポイント用のミドルウェア
 // app.use(requireAuth); // 全体適用を無効化
 
@@ -643,6 +704,10 @@ app.use(express.static('public', {
             res.set('Content-Type', 'image/x-icon');
             res.set('Cache-Control', 'public, max-age=86400');
         }
+        // ★★★ scripts/build_asset_manifest.py / build_case_catalogue.py が出力した内容ハッシュ付きのファイルは変わらないので長期キャッシュ ★★★
+        if (/[\\/](assets|case-bundle)[\\/]/.test(path) && !path.endsWith('.json')) {
+            res.set('Cache-Control', 'public, max-age=31536000, immutable');
+        }
     }
 }));
 
@@ -1463,6 +1528,30 @@ app.get('/api/qa-files', async (req, res) => {
     }
 });
 
+// ★★★ 事前生成した穴埋めテンプレート（scripts/precompute_fill_templates.py の出力） ★★★
+// キーは「問題文 \0 回答」の SHA-1。ファイルが更新されたら読み直す
+const FILL_TEMPLATES_FILE = path.join(process.cwd(), 'data', 'fill-templates.json');
+let precomputedFillTemplates = { mtimeMs: 0, templates: {} };
+
+async function findPrecomputedFillTemplate(qaData, level) {
+    try {
+        const stat = await fs.stat(FILL_TEMPLATES_FILE);
+        if (stat.mtimeMs !== precomputedFillTemplates.mtimeMs) {
+            const data = JSON.parse(await fs.readFile(FILL_TEMPLATES_FILE, 'utf8'));
+            precomputedFillTemplates = { mtimeMs: stat.mtimeMs, templates: data.templates || {} };
+        }
+    } catch (error) {
+        if (error.code !== 'ENOENT') {
+            console.warn('⚠️ 事前生成テンプレートの読み込みに失敗:', error.message);
+        }
+        return null;
+    }
+    const key = crypto.createHash('sha1')
+        .update(`${qaData.question || ''}\0${qaData.answer || ''}`, 'utf8')
+        .digest('hex');
+    return precomputedFillTemplates.templates[key]?.[String(level)] || null;
+}
+
 // ★★★ Q&A穴埋めテンプレート生成API ★★★
 app.post('/api/qa-fill/generate', async (req, res) => {
     console.log('========================================');
@@ -1488,6 +1577,21 @@ app.post('/api/qa-fill/generate', async (req, res) => {
             });
         }
 
+        // ★★★ 再生成でなく、参考資料も無ければ事前生成したテンプレートを返す ★★★
+        // 事前生成は回答だけから作るので、参考資料（ケースの資料・Q&Aの解説）があるときはAIで作る。
+        // historySnapshot は毎回送られてくるがプロンプトには使っていないので判定に含めない
+        if (!forceRefresh && !referenceMaterial) {
+            const precomputed = await findPrecomputedFillTemplate(qaData, level);
+            if (precomputed) {
+                console.log(`📦 事前生成テンプレートを使用: Q${qaId} Lv${level} (空欄${precomputed.blanks.length}個)`);
+                return res.json({
+                    success: true,
+                    template: precomputed,
+                    precomputed: true
+                });
+            }
+        }
+
         // ★★★ 参考資料がある場合はプロンプトに含める ★★★
         const referenceSection = referenceMaterial ? `
 【★★★ 重要：参考資料・解説 ★★★】
@@ -43,8 +43,37 @@ CREATE TABLE IF NOT EXISTS user_settings (
     FOREIGN KEY (username) REFERENCES users(username)
 );
 
+-- Q&Aバンク（public/data/qa の内容。scripts/d1_bulk_load.py で一括投入）
+CREATE TABLE IF NOT EXISTS qa_questions (
+    subject TEXT NOT NULL,
+    qa_id TEXT NOT NULL,
+    subcategory TEXT NOT NULL,
+    subcategory_name TEXT,
+    rank TEXT,
+    question TEXT,
+    answer TEXT,
+    extra TEXT DEFAULT '{}',
+    updated_at TEXT,
+    PRIMARY KEY (subject, qa_id)
+);
+
+-- ケースモジュールのメタデータ（public/cases の内容。scripts/d1_bulk_load.py で一括投入）
+CREATE TABLE IF NOT EXISTS cases (
+    case_id TEXT PRIMARY KEY,
+    subject TEXT NOT NULL,
+    title TEXT,
+    citation TEXT,
+    rank TEXT,
+    tags TEXT DEFAULT '[]',
+    qa_count INTEGER DEFAULT 0,
+    quiz_count INTEGER DEFAULT 0,
+    updated_at TEXT
+);
+
 -- インデックス
 CREATE INDEX IF NOT EXISTS idx_qa_progress_username ON qa_progress(username);
 CREATE INDEX IF NOT EXISTS idx_qa_progress_module ON qa_progress(module_id);
 CREATE INDEX IF NOT EXISTS idx_study_records_username ON study_records(username);
 CREATE INDEX IF NOT EXISTS idx_study_records_date ON study_records(date);
+CREATE INDEX IF NOT EXISTS idx_qa_questions_subcategory ON qa_questions(subject, subcategory);
+CREATE INDEX IF NOT EXISTS idx_cases_subject ON cases(subject);